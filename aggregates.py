@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Running aggregate statistics over stored test results.
+The result store updates these tables in the same transaction that saves a
+result, so each new test costs a constant number of row updates and reading
+the statistics never scans the history. Scores keep a count, mean and sum of
+squared deviations (Welford) per kind and model, plus a fixed-width histogram
+that serves as a quantile sketch with an error of at most one bin width.
+"""
+
+import math
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import VALIDATION_THRESHOLDS
+
+# Quantile sketch resolution: scores lie in [0, 1], so quantiles are exact to 0.01
+SCORE_BINS = 100
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS aggregate_scores (
+    kind TEXT NOT NULL,
+    model TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    mean REAL NOT NULL,
+    m2 REAL NOT NULL,
+    minimum REAL NOT NULL,
+    maximum REAL NOT NULL,
+    passed INTEGER NOT NULL,
+    PRIMARY KEY (kind, model)
+);
+
+CREATE TABLE IF NOT EXISTS aggregate_score_bins (
+    kind TEXT NOT NULL,
+    model TEXT NOT NULL,
+    bin INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (kind, model, bin)
+);
+
+CREATE TABLE IF NOT EXISTS aggregate_elements (
+    kind TEXT NOT NULL,
+    model TEXT NOT NULL,
+    element TEXT NOT NULL,
+    tests INTEGER NOT NULL,
+    present INTEGER NOT NULL,
+    PRIMARY KEY (kind, model, element)
+);
+"""
+
+# Welford's update; SET expressions see the row as it was before the update
+UPDATE_SCORES = """
+INSERT INTO aggregate_scores (kind, model, count, mean, m2, minimum, maximum, passed)
+VALUES (?, ?, 1, ?, 0, ?, ?, ?)
+ON CONFLICT (kind, model) DO UPDATE SET
+    count = count + 1,
+    mean = mean + (excluded.mean - mean) / (count + 1),
+    m2 = m2 + (excluded.mean - mean) * (excluded.mean - (mean + (excluded.mean - mean) / (count + 1))),
+    minimum = MIN(minimum, excluded.minimum),
+    maximum = MAX(maximum, excluded.maximum),
+    passed = passed + excluded.passed
+"""
+
+UPDATE_BINS = """
+INSERT INTO aggregate_score_bins (kind, model, bin, count) VALUES (?, ?, ?, 1)
+ON CONFLICT (kind, model, bin) DO UPDATE SET count = count + 1
+"""
+
+UPDATE_ELEMENTS = """
+INSERT INTO aggregate_elements (kind, model, element, tests, present) VALUES (?, ?, ?, 1, ?)
+ON CONFLICT (kind, model, element) DO UPDATE SET
+    tests = tests + 1,
+    present = present + excluded.present
+"""
+
+# Inverse of UPDATE_SCORES for one result; the last result of a model deletes its row instead.
+# Minimum and maximum cannot be un-merged and keep the extremes seen so far.
+REMOVE_SCORES = """
+UPDATE aggregate_scores SET
+    count = count - 1,
+    mean = (mean * count - :score) / (count - 1),
+    m2 = MAX(m2 - (:score - mean) * (:score - (mean * count - :score) / (count - 1)), 0),
+    passed = MAX(passed - :passed, 0)
+WHERE kind = :kind AND model = :model AND count > 1
+"""
+
+REMOVE_BINS = "UPDATE aggregate_score_bins SET count = count - 1 WHERE kind = ? AND model = ? AND bin = ?"
+
+REMOVE_ELEMENTS = """
+UPDATE aggregate_elements SET tests = tests - 1, present = present - ?
+WHERE kind = ? AND model = ? AND element = ?
+"""
+
+def score_bin(score: float) -> int:
+    return min(max(int(score * SCORE_BINS), 0), SCORE_BINS - 1)
+
+def update(conn: sqlite3.Connection, kind: str, scored: Iterable[Tuple[str, float, Dict[str, int]]]):
+    """Fold (model, quality score, element counts) of new results into the aggregates"""
+    threshold = VALIDATION_THRESHOLDS["min_quality_score"]
+    scored = list(scored)
+    conn.executemany(
+        UPDATE_SCORES,
+        [(kind, model, score, score, score, int(score >= threshold)) for model, score, _ in scored]
+    )
+    conn.executemany(UPDATE_BINS, [(kind, model, score_bin(score)) for model, score, _ in scored])
+    conn.executemany(
+        UPDATE_ELEMENTS,
+        [
+            (kind, model, element, int(count > 0))
+            for model, _, elements in scored
+            for element, count in elements.items()
+        ]
+    )
+
+def remove(conn: sqlite3.Connection, kind: str, scored: Iterable[Tuple[str, float, Dict[str, int]]]):
+    """Take (model, quality score, element counts) of stored results back out of the aggregates
+
+    Used before a result is saved again, so that only the change of its score is applied.
+    """
+    threshold = VALIDATION_THRESHOLDS["min_quality_score"]
+    for model, score, elements in scored:
+        conn.execute("DELETE FROM aggregate_scores WHERE kind = ? AND model = ? AND count <= 1", (kind, model))
+        conn.execute(REMOVE_SCORES, {"kind": kind, "model": model, "score": score, "passed": int(score >= threshold)})
+        conn.execute(REMOVE_BINS, (kind, model, score_bin(score)))
+        conn.executemany(
+            REMOVE_ELEMENTS, [(int(count > 0), kind, model, element) for element, count in elements.items()]
+        )
+    conn.execute("DELETE FROM aggregate_score_bins WHERE kind = ? AND count <= 0", (kind,))
+    conn.execute("DELETE FROM aggregate_elements WHERE kind = ? AND tests <= 0", (kind,))
+
+def rebuild(conn: sqlite3.Connection):
+    """Recompute the aggregates from the stored results (for history saved before them)"""
+    for table in ("aggregate_scores", "aggregate_score_bins", "aggregate_elements"):
+        conn.execute(f"DELETE FROM {table}")
+    elements: Dict[str, Dict[str, int]] = {}
+    for row in conn.execute("SELECT test_id, element, match_count FROM test_elements"):
+        elements.setdefault(row[0], {})[row[1]] = row[2]
+    rows = conn.execute(
+        "SELECT test_id, kind, COALESCE(model, ''), quality_score FROM test_results "
+        "WHERE quality_score IS NOT NULL ORDER BY id"
+    ).fetchall()
+    for kind in {row[1] for row in rows}:
+        update(conn, kind, [
+            (model, score, elements.get(test_id, {}))
+            for test_id, row_kind, model, score in rows if row_kind == kind
+        ])
+
+def _merge(rows: List[sqlite3.Row]) -> Optional[Dict[str, float]]:
+    """Combine per-model running statistics (Chan et al. parallel variance)"""
+    count, mean, m2, minimum, maximum, passed = 0, 0.0, 0.0, math.inf, -math.inf, 0
+    for row in rows:
+        n = count + row["count"]
+        delta = row["mean"] - mean
+        mean += delta * row["count"] / n
+        m2 += row["m2"] + delta * delta * count * row["count"] / n
+        count = n
+        minimum = min(minimum, row["minimum"])
+        maximum = max(maximum, row["maximum"])
+        passed += row["passed"]
+    if not count:
+        return None
+    return {"count": count, "mean": mean, "m2": m2, "minimum": minimum, "maximum": maximum, "passed": passed}
+
+def _quantiles(bins: Dict[int, int], count: int, minimum: float, maximum: float) -> Dict[str, float]:
+    """Quantiles from the histogram, interpolating linearly within a bin and clamped to the observed range"""
+    quantiles = {}
+    for q in QUANTILES:
+        target = q * count
+        cumulative = 0
+        for index in range(SCORE_BINS):
+            in_bin = bins.get(index, 0)
+            if in_bin and cumulative + in_bin >= target:
+                quantile = (index + (target - cumulative) / in_bin) / SCORE_BINS
+                quantiles[f"p{q * 100:g}"] = min(max(quantile, minimum), maximum)
+                break
+            cumulative += in_bin
+    return quantiles
+
+def _summary(merged: Dict[str, float], bins: Dict[int, int]) -> Dict[str, Any]:
+    count = merged["count"]
+    return {
+        "tests": count,
+        "average_quality_score": merged["mean"],
+        "std_quality_score": math.sqrt(merged["m2"] / (count - 1)) if count > 1 else 0.0,
+        "min_quality_score": merged["minimum"],
+        "max_quality_score": merged["maximum"],
+        "pass_rate": merged["passed"] / count,
+        "quantiles": _quantiles(bins, count, merged["minimum"], merged["maximum"])
+    }
+
+def read(conn: sqlite3.Connection, kind: str) -> Dict[str, Any]:
+    """Current statistics of a kind, overall and per model"""
+    rows = conn.execute("SELECT * FROM aggregate_scores WHERE kind = ? ORDER BY model", (kind,)).fetchall()
+    bins: Dict[str, Dict[int, int]] = {}
+    for row in conn.execute("SELECT model, bin, count FROM aggregate_score_bins WHERE kind = ?", (kind,)):
+        bins.setdefault(row["model"], {})[row["bin"]] = row["count"]
+    coverage: Dict[str, Dict[str, List[int]]] = {}
+    for row in conn.execute("SELECT model, element, tests, present FROM aggregate_elements WHERE kind = ?", (kind,)):
+        coverage.setdefault(row["model"], {})[row["element"]] = [row["tests"], row["present"]]
+
+    stats: Dict[str, Any] = {
+        "kind": kind,
+        "pass_threshold": VALIDATION_THRESHOLDS["min_quality_score"],
+        "tests": 0,
+        "models": {},
+        "element_coverage": {}
+    }
+    overall = _merge(rows)
+    if overall is None:
+        return stats
+
+    all_bins: Dict[int, int] = {}
+    for model_bins in bins.values():
+        for index, count in model_bins.items():
+            all_bins[index] = all_bins.get(index, 0) + count
+    stats.update(_summary(overall, all_bins))
+
+    all_coverage: Dict[str, List[int]] = {}
+    for row in rows:
+        model_coverage = coverage.get(row["model"], {})
+        stats["models"][row["model"] or "unknown"] = {
+            **_summary(_merge([row]), bins.get(row["model"], {})),
+            "element_coverage": {
+                element: present / tests for element, (tests, present) in sorted(model_coverage.items())
+            }
+        }
+        for element, (tests, present) in model_coverage.items():
+            totals = all_coverage.setdefault(element, [0, 0])
+            totals[0] += tests
+            totals[1] += present
+    stats["element_coverage"] = {
+        element: present / tests for element, (tests, present) in sorted(all_coverage.items())
+    }
+    return stats
@@ -1,50 +1,241 @@
 #!/usr/bin/env python3
 """
 FastAPI Web Interface for TAM Estimation Prompt Testing Agent
+
+Importing this module still loads FastAPI, Starlette and pydantic (the app object, the
+static asset mount and the route signatures need them), which is most of its import
+time. Templates (Jinja), the result store, the agents and their HTTP clients are
+created on first use.
 """
 
-from fastapi import FastAPI, Request, Form, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
-import uvicorn
+from fastapi import FastAPI, Request, Form, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+import argparse
 import json
+import hashlib
+import time
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 import asyncio
+import functools
+import tempfile
 import threading
+from types import SimpleNamespace
 
-from tam_qwen_agent import QwenTAMAgent, PromptTestResult
-from dcf_agent import DCFAgent, DCFTestResult
-from config import QWEN_CONFIG, GEMINI_CONFIG, AVAILABLE_MODELS, TEST_COMPANIES
+from assets import AssetFiles, asset_url
+from progress import ProgressBroker
+from llm_executor import BoundedExecutor, ExecutorSaturated
+from metrics import (
+    REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE, REQUEST_DURATION, REQUEST_TIMEOUTS,
+    EXECUTOR_QUEUE_DEPTH, EXECUTOR_IN_FLIGHT, EXECUTOR_REJECTED, CACHE_HITS, CACHE_MISSES
+)
+from config import (
+    QWEN_CONFIG, GEMINI_CONFIG, AVAILABLE_MODELS, TEST_COMPANIES, EXPORT_CONFIG, RESPONSE_CONFIG, EXECUTOR_CONFIG
+)
 
 app = FastAPI(title="TAM Prompt Testing Agent", version="1.0.0")
 
-# Setup templates
-templates = Jinja2Templates(directory="templates")
+# Compress large responses (including streamed exports) for gzip-capable clients
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=RESPONSE_CONFIG["gzip_minimum_size"],
+    compresslevel=RESPONSE_CONFIG["gzip_level"]
+)
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="templates"), name="static")
+# Time spent initializing each lazily created subsystem, in seconds
+INIT_TIMINGS: Dict[str, float] = {}
 
-# Initialize the TAM agent
-agent = QwenTAMAgent(
-    api_key=QWEN_CONFIG["api_key"],
-    base_url=QWEN_CONFIG["base_url"],
-    model=QWEN_CONFIG["model"]
-)
+def _lazy(factory):
+    """Run a factory once, on first use, and record how long it took"""
+    lock = threading.Lock()
+    instance = []
 
-# Initialize the DCF agent (default to Qwen)
-dcf_agent = DCFAgent(
-    api_key=QWEN_CONFIG["api_key"],
-    base_url=QWEN_CONFIG["base_url"],
-    model=QWEN_CONFIG["model"]
-)
+    @functools.wraps(factory)
+    def get():
+        if not instance:
+            with lock:
+                if not instance:
+                    start = time.perf_counter()
+                    instance.append(factory())
+                    INIT_TIMINGS[factory.__name__] = time.perf_counter() - start
+        return instance[0]
+
+    return get
+
+@_lazy
+def get_templates():
+    """Jinja templates (imports the Jinja stack on first page render)"""
+    from fastapi.templating import Jinja2Templates
+
+    templates = Jinja2Templates(directory="templates")
+    templates.env.globals["asset_url"] = asset_url
+    return templates
+
+# Serve fingerprinted, precompressed UI assets (run build_assets.py to build them)
+app.mount("/static", AssetFiles(), name="static")
+
+@_lazy
+def get_store():
+    """Shared result store - the source of truth for history across worker processes"""
+    from result_store import ResultStore
+
+    return ResultStore()
+
+# Dedicated, bounded executor for blocking LLM calls
+llm_executor = BoundedExecutor()
+EXECUTOR_QUEUE_DEPTH.set_function(lambda: llm_executor.queue_depth)
+EXECUTOR_IN_FLIGHT.set_function(lambda: llm_executor.in_flight)
+
+@app.middleware("http")
+async def record_request_duration(request: Request, call_next):
+    """Record end-to-end request time per route, up to the last byte of the body
+
+    Streamed exports and reports send their headers early, so the observation is made
+    when the body iterator finishes rather than when call_next returns.
+    """
+    start = time.perf_counter()
+
+    def observe(status: int):
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        REQUEST_DURATION.labels(request.method, path, status).observe(time.perf_counter() - start)
+
+    try:
+        response = await call_next(request)
+    except Exception:
+        observe(500)
+        raise
+    body = response.body_iterator
+
+    async def timed_body():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            observe(response.status_code)
+
+    response.body_iterator = timed_body()
+    return response
+
+# Push test lifecycle events from both agents to dashboard clients
+progress_broker = ProgressBroker()
+
+@_lazy
+def get_agent():
+    """TAM agent (history lives in the store, not in memory)"""
+    from tam_qwen_agent import QwenTAMAgent
+
+    agent = QwenTAMAgent(
+        api_key=QWEN_CONFIG["api_key"],
+        base_url=QWEN_CONFIG["base_url"],
+        model=QWEN_CONFIG["model"],
+        keep_history=False
+    )
+    agent.progress_callback = progress_broker.publish
+    return agent
+
+@_lazy
+def get_dcf_agent():
+    """DCF agent (default to Qwen)"""
+    from dcf_agent import DCFAgent
+
+    dcf_agent = DCFAgent(
+        api_key=QWEN_CONFIG["api_key"],
+        base_url=QWEN_CONFIG["base_url"],
+        model=QWEN_CONFIG["model"],
+        keep_history=False
+    )
+    dcf_agent.progress_callback = progress_broker.publish
+    return dcf_agent
+
+def _agent_for(kind: str, model_config: Dict[str, str]) -> Any:
+    """Dedicated agent for one request or sweep, so concurrent requests cannot switch its model"""
+    if kind == "tam":
+        from tam_qwen_agent import QwenTAMAgent as agent_class
+    else:
+        from dcf_agent import DCFAgent as agent_class
+
+    agent = agent_class(
+        api_key=model_config["api_key"],
+        base_url=model_config["base_url"],
+        model=model_config["model"],
+        keep_history=False
+    )
+    agent.progress_callback = progress_broker.publish
+    return agent
+
+def warm_up():
+    """Initialize every lazy subsystem, e.g. before marking a replica ready"""
+    get_templates()
+    get_store()
+    get_agent()
+    get_dcf_agent()
+
+RESULT_FIELDS = [
+    "test_id", "timestamp", "quality_score", "response_length", "validation_scores",
+    "missing_requirements", "recommendations", "response_preview", "response_truncated",
+    "response_url", "model_used"
+]
+
+def _parse_fields(fields: Optional[str], metrics_key: str) -> Optional[List[str]]:
+    """Parse and validate a comma-separated fields= selection"""
+    if not fields:
+        return None
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in RESULT_FIELDS and field != metrics_key]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return selected
+
+def _build_result_payload(
+    result: Any,
+    model_choice: str,
+    metrics_key: str,
+    fields: Optional[List[str]],
+    preview_chars: int
+) -> Dict[str, Any]:
+    """Build the JSON payload for a test result, serializing only selected fields"""
+    response_length = len(result.response)
+    builders = {
+        "test_id": lambda: result.test_id,
+        "timestamp": lambda: result.timestamp.isoformat(),
+        "quality_score": lambda: result.quality_score,
+        "response_length": lambda: response_length,
+        "validation_scores": lambda: result.validation_scores,
+        "missing_requirements": lambda: result.missing_requirements,
+        "recommendations": lambda: result.recommendations,
+        metrics_key: lambda: getattr(result, metrics_key),
+        "response_preview": lambda: result.response[:preview_chars],
+        "response_truncated": lambda: response_length > preview_chars,
+        "response_url": lambda: f"/results/{result.test_id}/response",
+        "model_used": lambda: model_choice
+    }
+    if fields is None:
+        selected = list(builders)
+    else:
+        selected = ["test_id"] + [field for field in fields if field != "test_id"]
+    return {field: builders[field]() for field in selected}
+
+def _overloaded(error: ExecutorSaturated) -> HTTPException:
+    """Build a fast 503 response for work the executor cannot accept"""
+    EXECUTOR_REJECTED.inc()
+    return HTTPException(
+        status_code=503,
+        detail="Server is at capacity - too many analyses in progress. Please retry later.",
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+def _run_and_store(test_agent: Any, kind: str, company_context: str) -> Any:
+    """Run a test on a worker thread and persist it to the shared store"""
+    result = test_agent.test_prompt(company_context)
+    get_store().save_result(kind, result)
+    return result
 
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     """Home page with TAM testing interface"""
-    return templates.TemplateResponse("index.html", {
-        "request": request,
+    return get_templates().TemplateResponse(request, "index.html", {
         "test_companies": TEST_COMPANIES,
         "available_models": AVAILABLE_MODELS,
         "current_model": "qwen"
@@ -53,55 +244,62 @@ async def home(request: Request):
 @app.get("/dcf", response_class=HTMLResponse)
 async def dcf_home(request: Request):
     """DCF testing interface"""
-    return templates.TemplateResponse("dcf.html", {
-        "request": request,
+    return get_templates().TemplateResponse(request, "dcf.html", {
         "available_models": AVAILABLE_MODELS,
         "current_model": "qwen"
     })
 
+@app.get("/dashboard", response_class=HTMLResponse)
+async def dashboard(request: Request):
+    """Live progress dashboard for running tests and sweeps"""
+    return get_templates().TemplateResponse(request, "dashboard.html", {
+        "available_models": AVAILABLE_MODELS
+    })
+
+@app.websocket("/ws/progress")
+async def progress_updates(websocket: WebSocket):
+    """Stream batched test lifecycle events to a dashboard client"""
+    await progress_broker.connect(websocket)
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        progress_broker.disconnect(websocket)
+
 @app.post("/test-single")
 async def test_single_prompt(
     company_context: str = Form(...),
     model_choice: str = Form("qwen"),
-    verbose: bool = Form(False)
+    verbose: bool = Form(False),
+    fields: Optional[str] = Query(None),
+    preview_chars: int = Query(RESPONSE_CONFIG["preview_chars"], ge=0)
 ):
     """Test TAM prompt with a single company context"""
     try:
+        selected_fields = _parse_fields(fields, "market_metrics")
+
         # Get the selected model configuration
         if model_choice not in AVAILABLE_MODELS:
             raise HTTPException(status_code=400, detail="Invalid model selection")
         
-        model_config = AVAILABLE_MODELS[model_choice]
-        
-        # Update the global agent with selected model
-        agent.api_key = model_config["api_key"]
-        agent.base_url = model_config["base_url"]
-        agent.model = model_config["model"]
+        agent = _agent_for("tam", AVAILABLE_MODELS[model_choice])
         
         # Run test in a separate thread with timeout to avoid blocking
         result = await asyncio.wait_for(
-            asyncio.get_event_loop().run_in_executor(
-                None, agent.test_prompt, company_context
-            ),
+            llm_executor.run(_run_and_store, agent, "tam", company_context),
             timeout=120  # 2 minute timeout
         )
         
         return JSONResponse({
             "success": True,
-            "result": {
-                "test_id": result.test_id,
-                "timestamp": result.timestamp.isoformat(),
-                "quality_score": result.quality_score,
-                "response_length": len(result.response),
-                "validation_scores": result.validation_scores,
-                "missing_requirements": result.missing_requirements,
-                "recommendations": result.recommendations,
-                "market_metrics": result.market_metrics,
-                "response_preview": result.response,
-                "model_used": model_choice
-            }
+            "result": _build_result_payload(result, model_choice, "market_metrics", selected_fields, preview_chars)
         })
+    except HTTPException:
+        raise
+    except ExecutorSaturated as e:
+        raise _overloaded(e)
     except asyncio.TimeoutError:
+        REQUEST_TIMEOUTS.labels("/test-single").inc()
         raise HTTPException(status_code=408, detail="Request timeout - TAM analysis is taking too long to respond. Please try again.")
     except Exception as e:
         print(f"Error in test_single_prompt: {str(e)}")
@@ -111,139 +309,399 @@ async def test_single_prompt(
 async def test_dcf_prompt(
     company_context: str = Form(...),
     model_choice: str = Form("qwen"),
-    verbose: bool = Form(False)
+    verbose: bool = Form(False),
+    fields: Optional[str] = Query(None),
+    preview_chars: int = Query(RESPONSE_CONFIG["preview_chars"], ge=0)
 ):
     """Test DCF prompt with AI model"""
     try:
+        selected_fields = _parse_fields(fields, "financial_metrics")
+
         # Get the selected model configuration
         if model_choice not in AVAILABLE_MODELS:
             raise HTTPException(status_code=400, detail="Invalid model selection")
         
-        model_config = AVAILABLE_MODELS[model_choice]
-        
-        # Update the DCF agent with selected model
-        dcf_agent.api_key = model_config["api_key"]
-        dcf_agent.base_url = model_config["base_url"]
-        dcf_agent.model = model_config["model"]
+        dcf_agent = _agent_for("dcf", AVAILABLE_MODELS[model_choice])
         
         # Run DCF test in a separate thread with timeout
         result = await asyncio.wait_for(
-            asyncio.get_event_loop().run_in_executor(
-                None, dcf_agent.test_prompt, company_context
-            ),
+            llm_executor.run(_run_and_store, dcf_agent, "dcf", company_context),
             timeout=180  # 3 minute timeout for DCF analysis
         )
         
         return JSONResponse({
             "success": True,
-            "result": {
-                "test_id": result.test_id,
-                "timestamp": result.timestamp.isoformat(),
-                "quality_score": result.quality_score,
-                "response_length": len(result.response),
-                "validation_scores": result.validation_scores,
-                "missing_requirements": result.missing_requirements,
-                "recommendations": result.recommendations,
-                "financial_metrics": result.financial_metrics,
-                "response_preview": result.response,
-                "model_used": model_choice
-            }
+            "result": _build_result_payload(result, model_choice, "financial_metrics", selected_fields, preview_chars)
         })
+    except HTTPException:
+        raise
+    except ExecutorSaturated as e:
+        raise _overloaded(e)
     except asyncio.TimeoutError:
+        REQUEST_TIMEOUTS.labels("/test-dcf").inc()
         raise HTTPException(status_code=408, detail="Request timeout - DCF analysis is taking too long to respond. Please try again.")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@_lazy
+def get_journal():
+    """Shared journal of completed sweep tests, for resuming interrupted sweeps"""
+    from run_journal import RunJournal
+
+    return RunJournal()
+
+# Sweeps run for minutes, so they get their own small executor rather than tying up LLM workers
+sweep_executor = BoundedExecutor(max_workers=EXECUTOR_CONFIG["max_sweeps"], max_queue_depth=0)
+
+def _run_sweep(test_agent: Any, kind: str, companies: Optional[List[str]], resume: bool):
+    """Run a comprehensive test on a worker thread, persisting each result as soon as it completes"""
+    store = get_store()
+    run_id = store.start_run(kind, test_agent.model, source="sweep")
+    try:
+        test_agent.run_comprehensive_test(
+            companies, journal=get_journal(), resume=resume,
+            on_result=lambda result: store.save_result(kind, result, run_id)
+        )
+    finally:
+        store.finish_run(run_id)
+
+@app.post("/sweeps", status_code=202)
+async def start_sweep(
+    kind: str = Form("tam"),
+    model_choice: str = Form("qwen"),
+    companies: Optional[str] = Form(None),
+    resume: bool = Form(False)
+):
+    """Start a sweep over company contexts in the background; follow it on /dashboard
+
+    With resume, companies already journaled for the model and prompt version are skipped.
+    """
+    if kind not in ("tam", "dcf"):
+        raise HTTPException(status_code=400, detail="Invalid analysis kind")
+    if model_choice not in AVAILABLE_MODELS:
+        raise HTTPException(status_code=400, detail="Invalid model selection")
+
+    company_list = [line.strip() for line in (companies or "").splitlines() if line.strip()] or None
+    if company_list is None and kind == "tam":
+        company_list = TEST_COMPANIES
+
+    test_agent = _agent_for(kind, AVAILABLE_MODELS[model_choice])
+
+    try:
+        sweep_executor.submit(_run_sweep, test_agent, kind, company_list, resume)
+    except ExecutorSaturated as e:
+        raise _overloaded(e)
+
+    return JSONResponse({
+        "success": True,
+        "kind": kind,
+        "model_used": model_choice,
+        "companies": len(company_list) if company_list else None
+    }, status_code=202)
+
 @app.get("/results/{test_id}")
-async def get_test_result(test_id: str):
+def get_test_result(test_id: str):
     """Get detailed results for a specific test"""
     try:
-        # Find the test result
-        result = None
-        for test_result in agent.test_results:
-            if test_result.test_id == test_id:
-                result = test_result
-                break
-        
+        result = get_store().get_result(test_id)
         if not result:
             raise HTTPException(status_code=404, detail="Test result not found")
         
         return JSONResponse({
             "success": True,
             "result": {
-                "test_id": result.test_id,
-                "timestamp": result.timestamp.isoformat(),
-                "prompt_used": result.prompt_used,
-                "response": result.response,
-                "quality_score": result.quality_score,
-                "validation_scores": result.validation_scores,
-                "missing_requirements": result.missing_requirements,
-                "recommendations": result.recommendations
+                "test_id": result["test_id"],
+                "timestamp": result["timestamp"],
+                "prompt_used": result["prompt_used"],
+                "response": result["response"],
+                "quality_score": result["quality_score"],
+                "validation_scores": result["validation_scores"],
+                "missing_requirements": result["missing_requirements"],
+                "recommendations": result["recommendations"]
             }
         })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/export-results")
-async def export_results():
-    """Export all TAM test results as JSON"""
+@app.get("/results/{test_id}/response", response_class=PlainTextResponse)
+def get_test_response(test_id: str):
+    """Get the full response text for a specific test"""
+    response = get_store().get_response(test_id)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Test result not found")
+    return PlainTextResponse(response)
+
+def _export_etag(kind: str, total: int, end: int, *params: Any) -> str:
+    """Build a weak ETag that changes whenever new results are recorded"""
+    fingerprint = f"{kind}:{total}:{end}:" + ":".join(str(p) for p in params)
+    return f'W/"{hashlib.sha1(fingerprint.encode()).hexdigest()}"'
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Check an If-None-Match header against the current ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    matched = "*" in candidates or etag in candidates or etag[2:] in candidates
+    # A revalidation either hits the client's cached copy (304) or misses and sends the export again
+    (CACHE_HITS if matched else CACHE_MISSES).labels("export_etag").inc()
+    return matched
+
+def _parse_cursor(cursor: Optional[str]) -> int:
+    """Decode an export cursor into a position in the result history"""
+    if cursor is None:
+        return 0
     try:
-        data = []
-        for result in agent.test_results:
-            data.append({
-                "test_id": result.test_id,
-                "timestamp": result.timestamp.isoformat(),
-                "quality_score": result.quality_score,
-                "validation_scores": result.validation_scores,
-                "missing_requirements": result.missing_requirements,
-                "recommendations": result.recommendations,
-                "market_metrics": result.market_metrics,
-                "response_length": len(result.response)
-            })
-        
-        return JSONResponse({
+        position = int(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if position < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return position
+
+def _export_response(
+    request: Request,
+    kind: str,
+    total_key: str,
+    cursor: Optional[str],
+    limit: Optional[int],
+    output_format: str
+) -> Response:
+    """Stream a page (or the whole history) of results as JSON or NDJSON
+
+    Results are read from the store in small batches up to a snapshot of the
+    latest position, so memory stays constant regardless of history size.
+    """
+    store = get_store()
+    total = store.count(kind)
+    end = store.last_position(kind)
+    start = _parse_cursor(cursor)
+    stop = end
+    if limit is not None:
+        limit = max(1, min(limit, EXPORT_CONFIG["max_page_size"]))
+        stop = min(store.page_end(kind, start, limit) or end, end)
+    next_cursor = str(stop) if stop < end else None
+
+    etag = _export_etag(kind, total, end, start, limit, output_format)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = next_cursor
+
+    if output_format == "ndjson":
+        def iter_ndjson() -> Iterator[str]:
+            for record in store.iter_results(kind, start, stop):
+                yield json.dumps(record) + "\n"
+
+        return StreamingResponse(iter_ndjson(), media_type="application/x-ndjson", headers=headers)
+
+    def iter_json() -> Iterator[str]:
+        yield json.dumps({
             "success": True,
             "export_timestamp": datetime.now().isoformat(),
-            "total_tests": len(data),
-            "results": data
-        })
+            total_key: total,
+            "next_cursor": next_cursor
+        })[:-1] + ', "results": ['
+        for i, record in enumerate(store.iter_results(kind, start, stop)):
+            yield ("," if i else "") + json.dumps(record)
+        yield "]}"
+
+    return StreamingResponse(iter_json(), media_type="application/json", headers=headers)
+
+@app.get("/export-results")
+def export_results(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    output_format: str = Query("json", alias="format", pattern="^(json|ndjson)$")
+):
+    """Export TAM test results as JSON or NDJSON, optionally paginated"""
+    try:
+        return _export_response(
+            request, "tam", "total_tests",
+            cursor, limit, output_format
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/export-dcf-results")
-async def export_dcf_results():
-    """Export all DCF test results as JSON"""
+def export_dcf_results(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    output_format: str = Query("json", alias="format", pattern="^(json|ndjson)$")
+):
+    """Export DCF test results as JSON or NDJSON, optionally paginated"""
     try:
-        data = []
-        for result in dcf_agent.test_results:
-            data.append({
-                "test_id": result.test_id,
-                "timestamp": result.timestamp.isoformat(),
-                "quality_score": result.quality_score,
-                "validation_scores": result.validation_scores,
-                "missing_requirements": result.missing_requirements,
-                "recommendations": result.recommendations,
-                "financial_metrics": result.financial_metrics,
-                "response_length": len(result.response)
-            })
-        
-        return JSONResponse({
-            "success": True,
-            "export_timestamp": datetime.now().isoformat(),
-            "total_dcf_tests": len(data),
-            "results": data
-        })
+        return _export_response(
+            request, "dcf", "total_dcf_tests",
+            cursor, limit, output_format
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/report/{kind}")
+def report(kind: str, percentiles: bool = False, by_model: bool = False):
+    """Markdown report over every stored result of a kind"""
+    if kind not in ("tam", "dcf"):
+        raise HTTPException(status_code=404, detail="Unknown analysis kind")
+    test_agent = get_agent() if kind == "tam" else get_dcf_agent()
+    store = get_store()
+
+    # The summary leads the report, so the agent spools the sections once and streams its spool
+    records = (SimpleNamespace(**record) for record in store.iter_results(kind))
+    chunks = test_agent.iter_report(records, percentiles=percentiles, by_model=by_model)
+    return StreamingResponse(chunks, media_type="text/markdown; charset=utf-8")
+
+@app.get("/export-model")
+def export_model(
+    revenue: float = Query(1000.0, gt=0),
+    revenue_growth: float = 0.10,
+    ebit_margin: float = 0.20,
+    capex_pct: float = 0.05,
+    nwc_pct: float = 0.10,
+    depreciation_pct: float = 0.04,
+    tax_rate: float = 0.25,
+    wacc: float = 0.09,
+    terminal_growth: float = 0.025,
+    net_debt: float = 0.0,
+    shares_outstanding: Optional[float] = Query(None, gt=0),
+    years: int = Query(10, ge=1, le=50),
+    grid_steps: int = Query(11, ge=2, le=1000),
+    three_statement: bool = False
+):
+    """Download a DCF (with a WACC x terminal growth sensitivity table) as an .xlsx with live formulas
+
+    With three_statement, a linked three-statement model sharing the revenue, capex, tax and
+    discounting drivers is added.
+    """
+    if wacc <= terminal_growth:
+        raise HTTPException(status_code=400, detail="WACC must exceed terminal growth")
+    import numpy as np
+    import excel_export
+    from dcf_engine import DCFAssumptions
+    from sensitivity import sensitivity_grid
+
+    base = DCFAssumptions(
+        revenue=revenue, revenue_growth=revenue_growth, ebit_margin=ebit_margin, capex_pct=capex_pct,
+        nwc_pct=nwc_pct, tax_rate=tax_rate, wacc=wacc, terminal_growth=terminal_growth,
+        depreciation_pct=depreciation_pct, net_debt=net_debt, shares_outstanding=shares_outstanding
+    )
+    try:
+        workbook = excel_export.new_workbook()
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    out = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    try:
+        dcf = excel_export.write_dcf(workbook, base, years=years)
+        excel_export.write_sensitivity(workbook, sensitivity_grid(base, {
+            "wacc": np.linspace(wacc - 0.02, wacc + 0.02, grid_steps),
+            "terminal_growth": np.linspace(terminal_growth - 0.01, terminal_growth + 0.01, grid_steps)
+        }, years=years), dcf)
+        if three_statement:
+            from three_statement import ThreeStatementAssumptions, ThreeStatementModel
+
+            excel_export.write_three_statement(workbook, ThreeStatementModel(ThreeStatementAssumptions(
+                base_revenue=revenue, revenue_growth=revenue_growth, capex_pct=capex_pct, tax_rate=tax_rate,
+                wacc=wacc, terminal_growth=terminal_growth
+            ), years=years))
+        excel_export.save(workbook, out)
+        out.seek(0)
+    except Exception:
+        out.close()
+        raise
+
+    def chunks() -> Iterator[bytes]:
+        with out:
+            while True:
+                chunk = out.read(64 * 1024)
+                if not chunk:
+                    break
+                yield chunk
+
+    return StreamingResponse(
+        chunks(),
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"Content-Disposition": 'attachment; filename="dcf_model.xlsx"'}
+    )
+
+@app.get("/stats")
+def stats(kind: Optional[str] = Query(None, pattern="^(tam|dcf)$")):
+    """Running aggregate statistics (maintained as results are saved, no history scan)"""
+    store = get_store()
+    if kind is not None:
+        return store.stats(kind)
+    return {"tam": store.stats("tam"), "dcf": store.stats("dcf")}
+
+@app.get("/history")
+def history(
+    kind: Optional[str] = Query(None, pattern="^(tam|dcf)$"),
+    group_by: str = Query("model", pattern="^(model|prompt_version|company_context|run_id|kind)$"),
+    model: Optional[str] = None,
+    company: Optional[str] = None,
+    prompt_version: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None
+):
+    """Quality score history across runs, grouped by model, prompt version, company or run"""
+    filters = {
+        "kind": kind, "model": model, "company": company,
+        "prompt_version": prompt_version, "since": since, "until": until
+    }
+    store = get_store()
+    return {
+        "group_by": group_by,
+        "groups": store.score_summary(group_by=group_by, **filters),
+        "metric_averages": store.metric_averages(group_by=group_by, **filters),
+        "missing_requirements": store.missing_requirement_counts(**filters)
+    }
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return JSONResponse({
         "status": "healthy",
         "model": QWEN_CONFIG["model"],
+        "llm_executor": llm_executor.stats(),
         "timestamp": datetime.now().isoformat()
     })
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus-compatible metrics for this worker process"""
+    return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
 if __name__ == "__main__":
-    uvicorn.run("app:app", host="127.0.0.1", port=8000, reload=True)
+    parser = argparse.ArgumentParser(description="Run the prompt testing web interface")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Host to bind")
+    parser.add_argument("--port", type=int, default=8000, help="Port to bind")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of worker processes (history is shared through the result store)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Report cold-start import and initialization times, then exit")
+    parser.add_argument("--profile-output", type=str, help="Write the startup profile as JSON")
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        import subprocess
+        import sys
+
+        # A fresh interpreter so nothing is already imported
+        command = [sys.executable, "-m", "startup_profiler"]
+        if args.profile_output:
+            command += ["--output", args.profile_output]
+        sys.exit(subprocess.run(command).returncode)
+
+    import uvicorn
+
+    if args.workers > 1:
+        uvicorn.run("app:app", host=args.host, port=args.port, workers=args.workers)
+    else:
+        uvicorn.run("app:app", host=args.host, port=args.port, reload=True)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Serving side of the web UI asset pipeline.
+Resolves logical asset paths to fingerprinted files built by build_assets.py,
+serves precompressed variants and sets long-lived cache headers on them.
+Falls back to the unbuilt source files when no build is present.
+"""
+
+import json
+import mimetypes
+import os
+import stat
+from typing import Dict, Optional
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from config import ASSETS_CONFIG
+
+# Precompressed variants in order of preference
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+_manifest: Optional[Dict[str, str]] = None
+
+def load_manifest() -> Dict[str, str]:
+    """Load the build manifest once (empty when assets have not been built)"""
+    global _manifest
+    if _manifest is None:
+        path = os.path.join(ASSETS_CONFIG["build_dir"], ASSETS_CONFIG["manifest"])
+        try:
+            with open(path) as f:
+                _manifest = json.load(f)
+        except (OSError, ValueError):
+            _manifest = {}
+    return _manifest
+
+def asset_url(path: str) -> str:
+    """URL of an asset, fingerprinted when a build is available"""
+    return "/static/" + load_manifest().get(path, path)
+
+class AssetFiles(StaticFiles):
+    """Static files from the build directory with a fallback to the sources"""
+
+    def __init__(self):
+        directories = [d for d in (ASSETS_CONFIG["build_dir"], ASSETS_CONFIG["source_dir"]) if os.path.isdir(d)]
+        super().__init__(directory=directories[0] if directories else ASSETS_CONFIG["source_dir"])
+        self.all_directories = directories
+        self.fingerprinted = set(load_manifest().values())
+
+    def _cache_control(self, path: str) -> str:
+        if path in self.fingerprinted:
+            return f"public, max-age={ASSETS_CONFIG['immutable_max_age']}, immutable"
+        return "no-cache"
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        if path in self.fingerprinted:
+            for encoding, suffix in ENCODINGS:
+                if encoding not in accept_encoding:
+                    continue
+                full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+                if stat_result and stat.S_ISREG(stat_result.st_mode):
+                    return FileResponse(
+                        full_path,
+                        stat_result=stat_result,
+                        media_type=mimetypes.guess_type(path)[0] or "application/octet-stream",
+                        headers={
+                            "Content-Encoding": encoding,
+                            "Vary": "Accept-Encoding",
+                            "Cache-Control": self._cache_control(path)
+                        }
+                    )
+
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            response.headers["Cache-Control"] = self._cache_control(path)
+            if path in self.fingerprinted:
+                response.headers["Vary"] = "Accept-Encoding"
+        return response
@@ -0,0 +1,148 @@
+// Tests keyed by company and model, updated from batched progress events
+const tests = new Map();
+const completionTimes = [];
+const STATUS_BADGES = {
+    queued: 'bg-secondary',
+    sent: 'bg-info',
+    first_token: 'bg-primary',
+    completed: 'bg-warning text-dark',
+    validated: 'bg-success',
+    failed: 'bg-danger'
+};
+let renderPending = false;
+
+function testKey(event) {
+    return `${event.company}|${event.model}`;
+}
+
+function applyEvent(event) {
+    const key = testKey(event);
+    let test = tests.get(key);
+    if (!test || event.event === 'queued' || (event.event === 'sent' && test.status === 'validated')) {
+        test = { company: event.company, model: event.model, started: event.time };
+        tests.set(key, test);
+    }
+    test.status = event.event;
+    test.updated = event.time;
+    if (event.event === 'sent' && !test.sent) {
+        test.sent = event.time;
+    }
+    if (event.ttfb_seconds !== undefined) {
+        test.ttfb = event.ttfb_seconds;
+    }
+    if (event.latency_seconds !== undefined) {
+        test.latency = event.latency_seconds;
+    }
+    if (event.quality_score !== undefined) {
+        test.score = event.quality_score;
+    }
+    if (event.event === 'validated') {
+        test.finished = event.time;
+        completionTimes.push(event.time);
+    }
+    if (event.event === 'failed') {
+        test.finished = event.time;
+        test.error = event.error;
+    }
+}
+
+function median(values) {
+    if (values.length === 0) return null;
+    const sorted = [...values].sort((a, b) => a - b);
+    const mid = Math.floor(sorted.length / 2);
+    return sorted.length % 2 ? sorted[mid] : (sorted[mid - 1] + sorted[mid]) / 2;
+}
+
+function render() {
+    renderPending = false;
+    const now = Date.now() / 1000;
+    const rows = [...tests.values()];
+    const latencies = rows.filter(t => t.latency !== undefined).map(t => t.latency);
+    const medianLatency = median(latencies);
+    const inProgress = rows.filter(t => !t.finished && t.status !== 'queued');
+
+    // Throughput over the last five minutes
+    const windowStart = now - 300;
+    const recent = completionTimes.filter(t => t >= windowStart);
+    const minutes = Math.max(1, Math.min(5, (now - (recent[0] || now)) / 60));
+
+    document.getElementById('statInProgress').textContent = inProgress.length;
+    document.getElementById('statCompleted').textContent = rows.filter(t => t.status === 'validated').length;
+    document.getElementById('statThroughput').textContent = (recent.length / minutes).toFixed(1);
+    document.getElementById('statLatency').textContent = medianLatency === null ? '-' : medianLatency.toFixed(1);
+
+    document.getElementById('testRows').innerHTML = rows.map(test => {
+        const elapsed = ((test.finished || now) - (test.sent || test.started));
+        // Stragglers: still running and slower than twice the median latency
+        const straggler = !test.finished && test.sent && medianLatency !== null && elapsed > 2 * medianLatency;
+        return `
+            <tr class="${straggler ? 'table-warning' : ''}">
+                <td>${escapeHtml(test.company)}</td>
+                <td><small>${escapeHtml(test.model)}</small></td>
+                <td><span class="badge ${STATUS_BADGES[test.status] || 'bg-secondary'}" title="${escapeHtml(test.error || '')}">${test.status}</span></td>
+                <td>${test.status === 'queued' ? '-' : elapsed.toFixed(1)}</td>
+                <td>${test.ttfb !== undefined ? test.ttfb.toFixed(2) : '-'}</td>
+                <td>${test.latency !== undefined ? test.latency.toFixed(2) : '-'}</td>
+                <td>${test.score !== undefined ? (test.score * 100).toFixed(1) + '%' : '-'}</td>
+            </tr>
+        `;
+    }).join('');
+}
+
+function scheduleRender() {
+    if (!renderPending) {
+        renderPending = true;
+        requestAnimationFrame(render);
+    }
+}
+
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text || '';
+    return div.innerHTML;
+}
+
+function connect() {
+    const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws';
+    const socket = new WebSocket(`${protocol}://${window.location.host}/ws/progress`);
+    const badge = document.getElementById('connectionBadge');
+
+    socket.onopen = () => {
+        badge.className = 'badge bg-success float-end';
+        badge.textContent = 'live';
+    };
+    socket.onmessage = (message) => {
+        const batch = JSON.parse(message.data);
+        batch.events.forEach(applyEvent);
+        if (batch.dropped) {
+            document.getElementById('droppedNotice').textContent = `${batch.dropped} events were dropped under load`;
+        }
+        scheduleRender();
+    };
+    socket.onclose = () => {
+        badge.className = 'badge bg-secondary float-end';
+        badge.textContent = 'reconnecting';
+        setTimeout(connect, 2000);
+    };
+}
+
+// Start a sweep
+document.getElementById('sweepForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+    const status = document.getElementById('sweepStatus');
+    try {
+        const response = await fetch('/sweeps', { method: 'POST', body: new FormData(this) });
+        const data = await response.json();
+        if (response.ok) {
+            status.innerHTML = `<div class="alert alert-success">Sweep started (${data.companies ?? 'default'} companies)</div>`;
+        } else {
+            status.innerHTML = `<div class="alert alert-danger">Error: ${escapeHtml(data.detail)}</div>`;
+        }
+    } catch (error) {
+        status.innerHTML = `<div class="alert alert-danger">Error: ${escapeHtml(error.message)}</div>`;
+    }
+});
+
+// Keep elapsed times and stragglers current between batches
+setInterval(scheduleRender, 1000);
+connect();
@@ -0,0 +1,216 @@
+function selectCompany(company) {
+    document.getElementById('companyContext').value = company;
+    
+    // Update visual selection
+    document.querySelectorAll('.company-option').forEach(option => {
+        option.classList.remove('selected');
+    });
+    event.target.classList.add('selected');
+}
+
+function getScoreClass(score) {
+    if (score >= 0.8) return 'score-excellent';
+    if (score >= 0.6) return 'score-good';
+    return 'score-poor';
+}
+
+async function loadFullResponse(url, button) {
+    button.disabled = true;
+    try {
+        const response = await fetch(url);
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        document.getElementById('fullResponse').textContent = await response.text();
+        button.remove();
+    } catch (error) {
+        button.disabled = false;
+        alert('Error loading full analysis: ' + error.message);
+    }
+}
+
+function formatResults(data) {
+    const scoreClass = getScoreClass(data.quality_score);
+    const modelName = data.model_used === 'gemini' ? 'Gemini 1.5 Pro' : 'Qwen2.5 VL 32B';
+    const modelBadge = data.model_used === 'gemini' ? 'bg-success' : 'bg-info';
+    
+    return `
+        <div class="card">
+            <div class="card-body">
+                <div class="d-flex justify-content-between align-items-center mb-4">
+                    <h4 class="mb-0">TAM Analysis Results</h4>
+                    <span class="badge ${modelBadge} fs-6">${modelName}</span>
+                </div>
+                
+                <!-- Quality Score -->
+                <div class="text-center mb-4">
+                    <div class="quality-score ${scoreClass}">${(data.quality_score * 100).toFixed(1)}%</div>
+                    <p class="text-muted">Overall TAM Quality Score</p>
+                </div>
+                
+                <!-- Key Metrics -->
+                <div class="row mb-4">
+                    <div class="col-md-3">
+                        <div class="metric-card text-center">
+                            <div class="metric-value">${data.response_length.toLocaleString()}</div>
+                            <small>Characters</small>
+                        </div>
+                    </div>
+                    <div class="col-md-3">
+                        <div class="metric-card text-center">
+                            <div class="metric-value">${(data.validation_scores.section_coverage * 100).toFixed(0)}%</div>
+                            <small>Section Coverage</small>
+                        </div>
+                    </div>
+                    <div class="col-md-3">
+                        <div class="metric-card text-center">
+                            <div class="metric-value">${(data.validation_scores.element_coverage * 100).toFixed(0)}%</div>
+                            <small>Element Coverage</small>
+                        </div>
+                    </div>
+                    <div class="col-md-3">
+                        <div class="metric-card text-center">
+                            <div class="metric-value">${data.validation_scores.market_metrics_count || 0}</div>
+                            <small>Market Metrics</small>
+                        </div>
+                    </div>
+                </div>
+                
+                <!-- Progress Bars -->
+                <div class="mb-4">
+                    <h6>TAM Analysis Completeness</h6>
+                    <div class="mb-2">
+                        <div class="d-flex justify-content-between">
+                            <span>Market Calculations</span>
+                            <span>${data.validation_scores.has_calculations ? '✓' : '✗'}</span>
+                        </div>
+                        <div class="progress progress-custom">
+                            <div class="progress-bar progress-bar-custom" style="width: ${data.validation_scores.has_calculations ? 100 : 0}%"></div>
+                        </div>
+                    </div>
+                    <div class="mb-2">
+                        <div class="d-flex justify-content-between">
+                            <span>Market Tables</span>
+                            <span>${data.validation_scores.has_tables ? '✓' : '✗'}</span>
+                        </div>
+                        <div class="progress progress-custom">
+                            <div class="progress-bar progress-bar-custom" style="width: ${data.validation_scores.has_tables ? 100 : 0}%"></div>
+                        </div>
+                    </div>
+                    <div class="mb-2">
+                        <div class="d-flex justify-content-between">
+                            <span>Customer Segmentation</span>
+                            <span>${data.validation_scores.has_segmentation ? '✓' : '✗'}</span>
+                        </div>
+                        <div class="progress progress-custom">
+                            <div class="progress-bar progress-bar-custom" style="width: ${data.validation_scores.has_segmentation ? 100 : 0}%"></div>
+                        </div>
+                    </div>
+                </div>
+                
+                <!-- Market Metrics -->
+                ${data.market_metrics && Object.keys(data.market_metrics).length > 0 ? `
+                    <div class="mb-4">
+                        <h6>Market Metrics Detected</h6>
+                        <div>
+                            ${Object.entries(data.market_metrics).map(([metric, values]) => 
+                                values && values.length > 0 ? `<span class="tam-metric">${metric}: ${values.length}</span>` : ''
+                            ).join('')}
+                        </div>
+                    </div>
+                ` : ''}
+                
+                <!-- Missing Requirements -->
+                ${data.missing_requirements.length > 0 ? `
+                    <div class="mb-4">
+                        <h6 class="text-warning">Missing Requirements (${data.missing_requirements.length})</h6>
+                        <div class="alert alert-warning">
+                            <ul class="mb-0">
+                                ${data.missing_requirements.slice(0, 5).map(req => `<li>${req}</li>`).join('')}
+                                ${data.missing_requirements.length > 5 ? `<li>... and ${data.missing_requirements.length - 5} more</li>` : ''}
+                            </ul>
+                        </div>
+                    </div>
+                ` : '<div class="alert alert-success"><i class="fas fa-check-circle me-2"></i>All TAM requirements met!</div>'}
+                
+                <!-- Recommendations -->
+                ${data.recommendations.length > 0 ? `
+                    <div class="mb-4">
+                        <h6>Recommendations</h6>
+                        <div class="alert alert-info">
+                            <ul class="mb-0">
+                                ${data.recommendations.map(rec => `<li>${rec}</li>`).join('')}
+                            </ul>
+                        </div>
+                    </div>
+                ` : ''}
+                
+                 <!-- Full Response -->
+                 <div class="mt-4">
+                     <h6>Complete TAM Analysis</h6>
+                     <div id="fullResponse" class="bg-light p-4 rounded" style="max-height: 600px; overflow-y: auto; white-space: pre-wrap; font-family: 'Courier New', monospace; font-size: 0.9rem; line-height: 1.4;">
+                         ${data.response_preview}${data.response_truncated ? '...' : ''}
+                     </div>
+                     ${data.response_truncated ? `<button class="btn btn-outline-secondary btn-sm mt-2" onclick="loadFullResponse('${data.response_url}', this)">Show full analysis</button>` : ''}
+                 </div>
+            </div>
+        </div>
+    `;
+}
+
+
+// Single test form submission
+document.getElementById('singleTestForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+    
+    const formData = new FormData(this);
+    const loading = document.querySelector('.loading');
+    const results = document.getElementById('singleResults');
+    
+    loading.style.display = 'block';
+    results.innerHTML = '';
+    
+    try {
+        const response = await fetch('/test-single', {
+            method: 'POST',
+            body: formData
+        });
+        
+        const data = await response.json();
+        
+        if (data.success) {
+            results.innerHTML = formatResults(data.result);
+        } else {
+            results.innerHTML = `<div class="alert alert-danger">Error: ${data.detail}</div>`;
+        }
+    } catch (error) {
+        results.innerHTML = `<div class="alert alert-danger">Error: ${error.message}</div>`;
+    } finally {
+        loading.style.display = 'none';
+    }
+});
+
+
+// Export results
+async function exportResults() {
+    try {
+        const response = await fetch('/export-results');
+        const data = await response.json();
+        
+        if (data.success) {
+            const blob = new Blob([JSON.stringify(data, null, 2)], { type: 'application/json' });
+            const url = window.URL.createObjectURL(blob);
+            const a = document.createElement('a');
+            a.href = url;
+            a.download = `tam_test_results_${new Date().toISOString().split('T')[0]}.json`;
+            document.body.appendChild(a);
+            a.click();
+            window.URL.revokeObjectURL(url);
+            document.body.removeChild(a);
+        } else {
+            alert('Error exporting results: ' + data.detail);
+        }
+    } catch (error) {
+        alert('Error exporting results: ' + error.message);
+    }
+}
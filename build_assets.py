@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Build fingerprinted, precompressed web UI assets for offline deployment.
+Copies every file under the assets directory to the build directory with a
+content hash in its name, rewrites CSS url() references to the fingerprinted
+files, writes gzip (and brotli, when available) variants and a manifest that
+maps logical asset paths to built files.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+from typing import Dict
+
+from config import ASSETS_CONFIG
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Only text assets benefit from precompression
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".svg", ".json", ".ttf", ".txt", ".map"}
+
+CSS_URL_PATTERN = re.compile(r"url\((['\"]?)([^'\")]+)\1\)")
+SOURCE_MAP_PATTERN = re.compile(r"\n?/[/*]# sourceMappingURL=[^\n]*")
+
+def fingerprint_name(path: str, content: bytes) -> str:
+    """Insert a short content hash before the file extension"""
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{digest}{ext}"
+
+def rewrite_css_urls(css: str, css_path: str, manifest: Dict[str, str]) -> str:
+    """Point relative url() references at their fingerprinted files"""
+    base = os.path.dirname(css_path)
+
+    def replace(match: re.Match) -> str:
+        url = match.group(2)
+        if url.startswith(("data:", "http:", "https:", "//", "#")):
+            return match.group(0)
+        path, _, suffix = url.partition("?")
+        target = os.path.normpath(os.path.join(base, path)).replace(os.sep, "/")
+        if target not in manifest:
+            return match.group(0)
+        rewritten = os.path.relpath(manifest[target], base).replace(os.sep, "/")
+        return f"url({rewritten}{'?' + suffix if suffix else ''})"
+
+    return CSS_URL_PATTERN.sub(replace, css)
+
+def write_variants(path: str, content: bytes):
+    """Write a file plus its precompressed variants"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+    if os.path.splitext(path)[1] not in COMPRESSIBLE_EXTENSIONS:
+        return
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(content, quality=11))
+
+def build(source_dir: str = None, build_dir: str = None) -> Dict[str, str]:
+    """Build all assets and return the manifest"""
+    source_dir = source_dir or ASSETS_CONFIG["source_dir"]
+    build_dir = build_dir or ASSETS_CONFIG["build_dir"]
+
+    sources = []
+    for root, _, files in os.walk(source_dir):
+        for name in sorted(files):
+            if name.startswith("."):
+                continue
+            full_path = os.path.join(root, name)
+            sources.append(os.path.relpath(full_path, source_dir).replace(os.sep, "/"))
+
+    if os.path.isdir(build_dir):
+        shutil.rmtree(build_dir)
+
+    # Non-CSS files first so stylesheets can reference their fingerprinted names
+    sources.sort(key=lambda path: (path.endswith(".css"), path))
+    manifest: Dict[str, str] = {}
+    for path in sources:
+        with open(os.path.join(source_dir, path), "rb") as f:
+            content = f.read()
+        if path.endswith((".css", ".js")):
+            text = SOURCE_MAP_PATTERN.sub("", content.decode("utf-8"))
+            if path.endswith(".css"):
+                text = rewrite_css_urls(text, path, manifest)
+            content = text.encode("utf-8")
+        built = fingerprint_name(path, content)
+        write_variants(os.path.join(build_dir, built), content)
+        manifest[path] = built
+
+    with open(os.path.join(build_dir, ASSETS_CONFIG["manifest"]), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description="Build fingerprinted web UI assets")
+    parser.add_argument("--source", type=str, help="Asset source directory")
+    parser.add_argument("--output", type=str, help="Build output directory")
+    args = parser.parse_args()
+
+    manifest = build(args.source, args.output)
+    print(f"Built {len(manifest)} assets into {args.output or ASSETS_CONFIG['build_dir']}")
+    if brotli is None:
+        print("brotli not installed - only gzip variants were written")
+
+if __name__ == "__main__":
+    main()
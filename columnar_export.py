@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Columnar export of stored validation results for cross-run analytics.
+Writes one column per validation score, per required element count and per
+extracted metric (match count and median numeric value) with a fixed schema
+per validator, as a compressed NumPy .npz or, when pyarrow is installed, a
+Parquet file. Aggregations over the full history then run on whole arrays.
+"""
+
+import argparse
+import json
+import re
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from result_store import ResultStore
+from table_parser import SCALES
+from tam_qwen_agent import TAMPromptValidator
+from dcf_agent import DCFPromptValidator
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Bump when columns are renamed or change type or meaning
+SCHEMA_VERSION = 2
+
+# Quality indicators produced by each validator, in column order
+QUALITY_INDICATORS = {
+    "tam": [
+        "section_coverage", "element_coverage", "response_length", "has_calculations",
+        "has_tables", "has_segmentation", "market_metrics_count"
+    ],
+    "dcf": [
+        "section_coverage", "element_coverage", "response_length", "has_financial_calculations",
+        "has_tables", "has_scenarios", "has_sensitivity", "has_historical_analysis",
+        "financial_metrics_count"
+    ]
+}
+
+TEXT_COLUMNS = ["test_id", "model", "company_context", "prompt_version", "run_id"]
+
+# Counts are -1 for results stored before they were recorded
+MISSING_COUNT = -1
+
+# A number not glued to a word (so "B2B" is not one), with a whole-word scale or a percent sign
+NUMBER_PATTERN = re.compile(
+    r"(?<![A-Za-z\d.])(\d[\d,]*(?:\.\d+)?)\s*"
+    r"(?:(%)|(thousands?|millions?|billions?|trillions?|mm|mn|bn|[kmbt])\b)?",
+    re.IGNORECASE
+)
+
+def parse_number(text: str) -> Optional[float]:
+    """Numeric value of an extracted metric such as "$1.2B", "15%" or "2,000 customers"
+
+    Units follow table_parser: scales in absolute units and percentages as fractions.
+    """
+    match = NUMBER_PATTERN.search(text)
+    if not match:
+        return None
+    try:
+        value = float(match.group(1).replace(",", ""))
+    except ValueError:
+        return None
+    if match.group(2):
+        return value / 100
+    return value * SCALES.get((match.group(3) or "").lower(), 1.0)
+
+def schema(kind: str) -> Dict[str, List[str]]:
+    """Indicator, element and metric names of a validator"""
+    if kind == "tam":
+        validator = TAMPromptValidator()
+        metrics = list(validator.market_metrics)
+    elif kind == "dcf":
+        validator = DCFPromptValidator()
+        metrics = list(validator.financial_metrics)
+    else:
+        raise ValueError(f"Unknown kind: {kind}")
+    return {
+        "indicators": QUALITY_INDICATORS[kind],
+        "elements": list(validator.required_elements),
+        "metrics": metrics
+    }
+
+def build_columns(store: ResultStore, kind: str) -> Dict[str, np.ndarray]:
+    """Pivot every stored result of a kind into fixed-schema columns"""
+    names = schema(kind)
+    rows = list(store.summary_rows(kind))
+    position = {row["test_id"]: i for i, row in enumerate(rows)}
+    n = len(rows)
+
+    columns: Dict[str, np.ndarray] = {
+        name: np.array([row[name] or "" for row in rows], dtype=str) for name in TEXT_COLUMNS
+    }
+    columns["timestamp"] = np.array(
+        [datetime.fromisoformat(row["timestamp"]) for row in rows], dtype="datetime64[us]"
+    )
+    columns["quality_score"] = np.array([row["quality_score"] for row in rows], dtype=np.float64)
+    if kind == "dcf":
+        columns["numeric_accuracy"] = np.array(
+            [np.nan if row["numeric_accuracy"] is None else row["numeric_accuracy"] for row in rows], dtype=np.float64
+        )
+
+    for name in names["indicators"]:
+        columns[f"score_{name}"] = np.full(n, np.nan)
+    for name in names["elements"]:
+        columns[f"element_{name}"] = np.full(n, MISSING_COUNT, dtype=np.int32)
+    for name in names["metrics"]:
+        columns[f"metric_{name}_count"] = np.full(n, MISSING_COUNT, dtype=np.int32)
+        columns[f"metric_{name}_value"] = np.full(n, np.nan)
+
+    for row in store.normalized_rows(kind, "test_scores"):
+        column = columns.get(f"score_{row['metric']}")
+        if column is not None:
+            column[position[row["test_id"]]] = row["score"]
+    for row in store.normalized_rows(kind, "test_elements"):
+        column = columns.get(f"element_{row['element']}")
+        if column is not None:
+            column[position[row["test_id"]]] = row["match_count"]
+    for row in store.normalized_rows(kind, "test_metrics"):
+        if f"metric_{row['name']}_count" not in columns:
+            continue
+        i = position[row["test_id"]]
+        columns[f"metric_{row['name']}_count"][i] = row["match_count"]
+        values = [parse_number(match) for match in _matches(row["matches"])]
+        values = [value for value in values if value is not None]
+        if values:
+            columns[f"metric_{row['name']}_value"][i] = float(np.median(values))
+
+    return columns
+
+def _matches(raw: Optional[str]) -> List[str]:
+    """Decode the stored matches of a metric"""
+    matches = json.loads(raw) if raw else []
+    return [match if isinstance(match, str) else " ".join(match) for match in matches]
+
+def write_columns(columns: Dict[str, np.ndarray], path: str) -> str:
+    """Write columns as Parquet (for .parquet paths, when pyarrow is available) or .npz"""
+    if path.endswith(".parquet"):
+        if pyarrow is None:
+            path = path[:-len(".parquet")] + ".npz"
+            print(f"pyarrow not installed - writing {path} instead")
+        else:
+            table = pyarrow.table(columns).replace_schema_metadata({"schema_version": str(SCHEMA_VERSION)})
+            pyarrow.parquet.write_table(table, path, compression="zstd")
+            return path
+    np.savez_compressed(path, __schema_version__=np.array(SCHEMA_VERSION), **columns)
+    return path if path.endswith(".npz") else path + ".npz"
+
+def load_columns(path: str) -> Dict[str, np.ndarray]:
+    """Read columns written by write_columns"""
+    if path.endswith(".parquet"):
+        if pyarrow is None:
+            raise RuntimeError("Reading Parquet exports requires pyarrow")
+        table = pyarrow.parquet.read_table(path)
+        return {name: table.column(name).to_numpy() for name in table.column_names}
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files if name != "__schema_version__"}
+
+def mean_by(columns: Dict[str, np.ndarray], group: str, value: str) -> Dict[str, float]:
+    """Mean of a column per distinct value of a grouping column, ignoring missing values"""
+    values = columns[value].astype(np.float64)
+    valid = ~np.isnan(values)
+    if np.issubdtype(columns[value].dtype, np.integer):
+        valid &= columns[value] != MISSING_COUNT
+    keys, inverse = np.unique(columns[group], return_inverse=True)
+    totals = np.bincount(inverse, weights=np.where(valid, values, 0), minlength=len(keys))
+    counts = np.bincount(inverse, weights=valid, minlength=len(keys))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = totals / counts
+    return {str(key): float(mean) for key, mean in zip(keys, means)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Export stored validation results in a columnar format")
+    parser.add_argument("--kind", choices=["tam", "dcf"], default="tam", help="Kind of results")
+    parser.add_argument("--output", type=str, help="Output file (.npz, or .parquet with pyarrow)")
+    parser.add_argument("--db", type=str, help="Result store database (default from STORE_CONFIG)")
+    parser.add_argument("--summary", action="store_true", help="Print mean scores per model and element")
+    args = parser.parse_args()
+
+    columns = build_columns(ResultStore(args.db), args.kind)
+    path = write_columns(columns, args.output or f"{args.kind}_columns.npz")
+    print(f"Exported {len(columns['test_id'])} results ({len(columns)} columns) to {path}")
+
+    if args.summary and len(columns["test_id"]):
+        print("\nMean quality score per model:")
+        for model, mean in mean_by(columns, "model", "quality_score").items():
+            print(f"  {model}: {mean:.2f}")
+        print("\nMean matches per element and model:")
+        for name in schema(args.kind)["elements"]:
+            means = mean_by(columns, "model", f"element_{name}")
+            print(f"  {name}: " + ", ".join(f"{model} {mean:.1f}" for model, mean in means.items()))
+
+if __name__ == "__main__":
+    main()
@@ -60,3 +60,79 @@ VALIDATION_THRESHOLDS = {
     "min_response_length": 1000,
     "max_missing_requirements": 3
 }
+
+# Export endpoint configuration
+EXPORT_CONFIG = {
+    "max_page_size": 1000  # without a limit, exports stream the whole history
+}
+
+# Response payload configuration
+RESPONSE_CONFIG = {
+    "preview_chars": 1500,
+    "gzip_minimum_size": 1000,
+    "gzip_level": 6
+}
+
+# Shared result store (SQLite in WAL mode, safe across uvicorn workers)
+STORE_CONFIG = {
+    "path": "results.db",
+    "busy_timeout_ms": 5000
+}
+
+# Dedicated executor for blocking LLM calls
+EXECUTOR_CONFIG = {
+    "max_workers": 4,
+    "max_queue_depth": 8,
+    "retry_after_seconds": 30,
+    "max_sweeps": 1  # concurrent /sweeps, on their own executor
+}
+
+# Web UI asset pipeline
+ASSETS_CONFIG = {
+    "source_dir": "assets",
+    "build_dir": "static",
+    "manifest": "manifest.json",
+    "immutable_max_age": 31536000
+}
+
+# Live progress events pushed to the dashboard
+PROGRESS_CONFIG = {
+    "flush_interval_seconds": 0.5,
+    "max_batch_size": 500,
+    "max_pending_events": 10000,
+    "history_size": 1000
+}
+
+# Crash-safe journal of completed tests (see run_journal.py)
+JOURNAL_CONFIG = {
+    "path": "sweep_journal.jsonl"
+}
+
+# Monte Carlo valuation (see monte_carlo.py)
+MONTE_CARLO_CONFIG = {
+    "paths": 1000000,
+    "chunk_size": 50000,
+    "seed": 20240601
+}
+
+# Numeric consistency checks of DCF tables in responses (see dcf_consistency.py)
+DCF_CONSISTENCY_CONFIG = {
+    "pv_tolerance": 0.03,
+    "terminal_tolerance": 0.05,
+    "total_tolerance": 0.01
+}
+
+# Bootstrap confidence intervals of the TAM engine (see tam_engine.py)
+TAM_ENGINE_CONFIG = {
+    "resamples": 10000,
+    "confidence": 0.9,
+    "seed": 20240601
+}
+
+# Market inputs for WACC/CAPM (see wacc.py); tables are CSV files in this directory
+MARKET_DATA_CONFIG = {
+    "directory": "data",
+    "currency": "USD",
+    "country": "United States",
+    "tenor_years": 10
+}
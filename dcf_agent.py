@@ -4,14 +4,24 @@ DCF Model Prompt Testing Agent
 Advanced validation system for DCF (Discounted Cash Flow) model prompts
 """
 
+import io
 import json
-import requests
 import time
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+import uuid
+from typing import Callable, Dict, Generator, Iterable, List, Any, Optional, TextIO
+from dataclasses import dataclass, field
 from datetime import datetime
 import re
 
+from result_store import ResultStore, prompt_version
+from run_journal import RunJournal
+from report_writer import ReportStats, iter_report, write_chunks
+from dcf_consistency import check as check_consistency
+from metrics import (
+    UPSTREAM_LATENCY, UPSTREAM_RESPONSES, UPSTREAM_RETRIES, UPSTREAM_TIMEOUTS,
+    VALIDATION_DURATION, REPORT_DURATION, provider_for
+)
+
 @dataclass
 class DCFTestResult:
     """Data class to store DCF test results"""
@@ -24,6 +34,15 @@ class DCFTestResult:
     quality_score: float
     recommendations: List[str]
     financial_metrics: Dict[str, Any]
+    model: str = ""
+    company_context: str = ""
+    prompt_version: str = ""
+    elements_found: Dict[str, int] = field(default_factory=dict)
+    numeric_accuracy: Optional[float] = None  # share of DCF table figures that follow from the stated inputs
+    
+    @property
+    def response_length(self) -> int:
+        return len(self.response)
 
 class DCFPromptValidator:
     """Advanced validator for DCF prompt responses"""
@@ -83,6 +102,8 @@ class DCFPromptValidator:
             "financial_metrics": {},
             "missing_requirements": [],
             "quality_indicators": {},
+            "numeric_accuracy": None,
+            "numeric_issues": [],
             "overall_score": 0.0
         }
         
@@ -107,6 +128,11 @@ class DCFPromptValidator:
             matches = re.findall(pattern, response, re.IGNORECASE)
             validation_results["financial_metrics"][metric] = matches
         
+        # Recompute the DCF table's discounting from its own figures
+        consistency = check_consistency(response)
+        validation_results["numeric_accuracy"] = consistency.accuracy
+        validation_results["numeric_issues"] = consistency.issues
+        
         # Calculate quality indicators
         validation_results["quality_indicators"] = {
             "section_coverage": len(validation_results["sections_found"]) / len(self.required_sections),
@@ -137,12 +163,14 @@ class DCFPromptValidator:
 class DCFAgent:
     """Main agent for testing DCF prompts with AI models"""
     
-    def __init__(self, api_key: str = None, base_url: str = "https://openrouter.ai/api/v1", model: str = "qwen/qwen2.5-vl-32b-instruct:free"):
+    def __init__(self, api_key: str = None, base_url: str = "https://openrouter.ai/api/v1", model: str = "qwen/qwen2.5-vl-32b-instruct:free", keep_history: bool = True):
         self.api_key = api_key
         self.base_url = base_url
         self.model = model
         self.validator = DCFPromptValidator()
+        self.keep_history = keep_history
         self.test_results = []
+        self.progress_callback: Optional[Callable[..., None]] = None
         
     def load_dcf_prompt(self) -> str:
         """Load the DCF model prompt from file"""
@@ -155,6 +183,10 @@ class DCFAgent:
     
     def send_to_ai(self, prompt: str, company_context: str = "", max_retries: int = 3) -> str:
         """Send prompt to AI model and get response"""
+        # Deferred so importing the agent (e.g. at app startup) stays cheap
+        import requests
+
+        provider = provider_for(self.base_url)
         for attempt in range(max_retries):
             try:
                 print(f"Attempt {attempt + 1}/{max_retries}...")
@@ -190,18 +222,25 @@ Provide a comprehensive, professional DCF valuation suitable for institutional i
                 }
                 
                 print("Sending request to AI model...")
+                self._emit("sent", company_context, attempt=attempt + 1)
+                start = time.perf_counter()
                 response = requests.post(
                     f"{self.base_url}/chat/completions",
                     headers=headers,
                     json=payload,
                     timeout=45
                 )
+                latency = time.perf_counter() - start
+                UPSTREAM_LATENCY.labels(provider, self.model).observe(latency)
+                self._emit("first_token", company_context, ttfb_seconds=response.elapsed.total_seconds())
+                UPSTREAM_RESPONSES.labels(provider, self.model, response.status_code).inc()
                 
                 print(f"Response status: {response.status_code}")
                 
                 if response.status_code == 200:
                     result = response.json()
                     content = result["choices"][0]["message"]["content"]
+                    self._emit("completed", company_context, latency_seconds=latency, response_length=len(content))
                     print(f"Success! Response length: {len(content)} characters")
                     return content
                 else:
@@ -216,15 +255,18 @@ Provide a comprehensive, professional DCF valuation suitable for institutional i
                     
                     if attempt < max_retries - 1:
                         print(f"Retrying in 2 seconds...")
+                        UPSTREAM_RETRIES.labels(provider, self.model).inc()
                         time.sleep(2)
                         continue
                     else:
                         return f"Error: {response.status_code} - {error_detail}"
                     
             except requests.exceptions.Timeout:
+                UPSTREAM_TIMEOUTS.labels(provider, self.model).inc()
                 print(f"Timeout on attempt {attempt + 1}")
                 if attempt < max_retries - 1:
                     print("Retrying...")
+                    UPSTREAM_RETRIES.labels(provider, self.model).inc()
                     time.sleep(2)
                     continue
                 else:
@@ -234,6 +276,7 @@ Provide a comprehensive, professional DCF valuation suitable for institutional i
                 print(f"Connection error on attempt {attempt + 1}")
                 if attempt < max_retries - 1:
                     print("Retrying...")
+                    UPSTREAM_RETRIES.labels(provider, self.model).inc()
                     time.sleep(2)
                     continue
                 else:
@@ -243,6 +286,7 @@ Provide a comprehensive, professional DCF valuation suitable for institutional i
                 print(f"Unexpected error: {str(e)}")
                 if attempt < max_retries - 1:
                     print("Retrying...")
+                    UPSTREAM_RETRIES.labels(provider, self.model).inc()
                     time.sleep(2)
                     continue
                 else:
@@ -261,15 +305,20 @@ Provide a comprehensive, professional DCF valuation suitable for institutional i
         print("Sending prompt to AI model...")
         response = self.send_to_ai(prompt, company_context)
         
+        if response.startswith("Error:"):
+            raise ValueError(f"API Error: {response}")
+        
         print("Validating response...")
+        start = time.perf_counter()
         validation = self.validator.validate_response(response)
+        VALIDATION_DURATION.labels("dcf").observe(time.perf_counter() - start)
         
         # Generate recommendations
         recommendations = self._generate_recommendations(validation)
         
         # Create test result
         test_result = DCFTestResult(
-            test_id=f"dcf_test_{int(time.time())}",
+            test_id=f"dcf_test_{int(time.time())}_{uuid.uuid4().hex[:8]}",
             timestamp=datetime.now(),
             prompt_used=prompt[:200] + "..." if len(prompt) > 200 else prompt,
             response=response,
@@ -277,12 +326,28 @@ Provide a comprehensive, professional DCF valuation suitable for institutional i
             missing_requirements=validation["missing_requirements"],
             quality_score=validation["overall_score"],
             recommendations=recommendations,
-            financial_metrics=validation["financial_metrics"]
+            financial_metrics=validation["financial_metrics"],
+            model=self.model,
+            company_context=company_context,
+            prompt_version=prompt_version(prompt),
+            elements_found=validation["elements_found"],
+            numeric_accuracy=validation["numeric_accuracy"]
         )
         
-        self.test_results.append(test_result)
+        self._emit(
+            "validated", company_context,
+            test_id=test_result.test_id, quality_score=test_result.quality_score
+        )
+        
+        if self.keep_history:
+            self.test_results.append(test_result)
         return test_result
     
+    def _emit(self, event: str, company_context: str, **data: Any):
+        """Report a test lifecycle event to the progress callback, if any"""
+        if self.progress_callback is not None:
+            self.progress_callback(event, company=company_context, model=self.model, **data)
+    
     def _generate_recommendations(self, validation: Dict[str, Any]) -> List[str]:
         """Generate recommendations based on validation results"""
         recommendations = []
@@ -311,10 +376,22 @@ Provide a comprehensive, professional DCF valuation suitable for institutional i
         if len(validation["missing_requirements"]) > 5:
             recommendations.append("DCF prompt may be too complex - consider breaking into focused sections")
         
+        if validation["numeric_accuracy"] is not None and validation["numeric_accuracy"] < 0.8:
+            recommendations.append("DCF table figures do not follow from the stated WACC and growth - ask for discount factors per year")
+        
         return recommendations
     
-    def run_comprehensive_test(self, companies: List[str] = None) -> List[DCFTestResult]:
-        """Run DCF tests with multiple company contexts"""
+    def run_comprehensive_test(self, companies: List[str] = None, journal: RunJournal = None,
+                               resume: bool = False,
+                               on_result: Callable[[DCFTestResult], None] = None) -> List[DCFTestResult]:
+        """Run DCF tests with multiple company contexts
+        
+        Each completed test is appended to the journal when one is given; with
+        resume, companies already journaled for this model and prompt version
+        are skipped and their journaled results returned instead. on_result is
+        called with each new result as soon as its test completes (e.g. to
+        persist it while the rest of the run is still going).
+        """
         if companies is None:
             companies = [
                 "A SaaS company with recurring revenue model and high customer retention",
@@ -325,75 +402,147 @@ Provide a comprehensive, professional DCF valuation suitable for institutional i
             ]
         
         results = []
+        if journal is not None and resume:
+            version = prompt_version(self.load_dcf_prompt())
+            journaled = {
+                result.company_context: result
+                for result in journal.results("dcf", DCFTestResult)
+                if result.model == self.model and result.prompt_version == version
+            }
+            for company in companies:
+                if company in journaled:
+                    results.append(journaled[company])
+                    if self.keep_history:
+                        self.test_results.append(journaled[company])
+            print(f"Resuming: {len(results)} of {len(companies)} companies already journaled")
+            companies = [company for company in companies if company not in journaled]
+        
+        for company in companies:
+            self._emit("queued", company)
+        
         for company in companies:
             print(f"\nTesting DCF with company: {company}")
             try:
                 result = self.test_prompt(company)
+                if journal is not None:
+                    journal.append("dcf", result)
+                if on_result is not None:
+                    on_result(result)
                 results.append(result)
                 print(f"DCF Quality Score: {result.quality_score:.2f}")
             except Exception as e:
                 print(f"Error testing {company}: {e}")
+                self._emit("failed", company, error=str(e))
         
         return results
     
-    def generate_report(self, results: List[DCFTestResult] = None) -> str:
+    def generate_report(self, results: Iterable[DCFTestResult] = None, store: ResultStore = None,
+                        percentiles: bool = False, by_model: bool = False) -> str:
         """Generate a comprehensive DCF test report"""
-        if results is None:
-            results = self.test_results
-        
-        if not results:
-            return "No DCF test results available"
-        
-        report = f"""
+        report = io.StringIO()
+        self.write_report(report, results, store, percentiles, by_model)
+        return report.getvalue()
+    
+    def write_report(self, out: TextIO, results: Iterable[DCFTestResult] = None, store: ResultStore = None,
+                     percentiles: bool = False, by_model: bool = False) -> ReportStats:
+        """Stream the report to a text file in a single pass over the results"""
+        return write_chunks(self.iter_report(results, store, percentiles, by_model), out)
+    
+    def iter_report(self, results: Iterable[DCFTestResult] = None, store: ResultStore = None,
+                    percentiles: bool = False, by_model: bool = False) -> Generator[str, None, ReportStats]:
+        """The report in chunks, e.g. for a streaming response, in a single pass over the results"""
+        start = time.perf_counter()
+        stats = yield from iter_report(
+            self.test_results if results is None else results,
+            summary=self._report_summary,
+            section=self._report_section,
+            counters={
+                "high_quality": lambda r: r.quality_score >= 0.8,
+                "financial_calculations": lambda r: bool(r.validation_scores.get("has_financial_calculations", False))
+            },
+            empty="No DCF test results available",
+            footer=(lambda: self._history_section(store)) if store is not None else None,
+            percentiles=percentiles,
+            by_model=by_model
+        )
+        REPORT_DURATION.labels("dcf").observe(time.perf_counter() - start)
+        return stats
+    
+    def _report_summary(self, stats: ReportStats) -> str:
+        """Report title and summary statistics"""
+        return f"""
 # DCF Model Prompt Testing Report
 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 ## Executive Summary
-- Total DCF Tests: {len(results)}
-- Average Quality Score: {sum(r.quality_score for r in results) / len(results):.2f}
-- Tests with High Quality (≥80%): {len([r for r in results if r.quality_score >= 0.8])}
-- Tests with Financial Calculations: {len([r for r in results if r.validation_scores.get('has_financial_calculations', False)])}
-
-## Detailed Results
+- Total DCF Tests: {stats.count}
+- Average Quality Score: {stats.average:.2f}
+- Tests with High Quality (≥80%): {stats.counts["high_quality"]}
+- Tests with Financial Calculations: {stats.counts["financial_calculations"]}
 """
-        
-        for i, result in enumerate(results, 1):
-            report += f"""
+    
+    def _report_section(self, i: int, result: DCFTestResult) -> str:
+        """Report section for one test result"""
+        numeric = ""
+        if result.numeric_accuracy is not None:
+            numeric = f"- Numeric Accuracy: {result.numeric_accuracy:.2f}\n"
+        lines = [f"""
 ### DCF Test {i} - {result.test_id}
 - Quality Score: {result.quality_score:.2f}
-- Response Length: {len(result.response)} characters
+- Response Length: {result.response_length} characters
 - Missing Requirements: {len(result.missing_requirements)}
-
+{numeric}
 #### Validation Scores:
-"""
-            for metric, score in result.validation_scores.items():
-                report += f"- {metric}: {score:.2f}\n"
-            
-            if result.financial_metrics:
-                report += "\n#### Financial Metrics Found:\n"
-                for metric, values in result.financial_metrics.items():
-                    if values:
-                        report += f"- {metric}: {len(values)} instances\n"
-            
-            if result.missing_requirements:
-                report += "\n#### Missing Requirements:\n"
-                for req in result.missing_requirements:
-                    report += f"- {req}\n"
-            
-            if result.recommendations:
-                report += "\n#### Recommendations:\n"
-                for rec in result.recommendations:
-                    report += f"- {rec}\n"
-            
-            report += "\n---\n"
-        
-        return report
+"""]
+        lines.extend(f"- {metric}: {score:.2f}\n" for metric, score in result.validation_scores.items())
+        
+        if result.financial_metrics:
+            lines.append("\n#### Financial Metrics Found:\n")
+            lines.extend(
+                f"- {metric}: {len(values)} instances\n"
+                for metric, values in result.financial_metrics.items() if values
+            )
+        
+        if result.missing_requirements:
+            lines.append("\n#### Missing Requirements:\n")
+            lines.extend(f"- {req}\n" for req in result.missing_requirements)
+        
+        if result.recommendations:
+            lines.append("\n#### Recommendations:\n")
+            lines.extend(f"- {rec}\n" for rec in result.recommendations)
+        
+        lines.append("\n---\n")
+        return "".join(lines)
+    
+    def _history_section(self, store: ResultStore) -> str:
+        """Report section comparing prompt versions for the current model across stored runs"""
+        summary = store.score_summary(group_by="prompt_version", kind="dcf", model=self.model)
+        if not summary:
+            return ""
+        section = f"\n## Historical Comparison ({self.model})\n"
+        section += "| Prompt Version | Tests | Average | Min | Max | Last Test |\n"
+        section += "|---|---|---|---|---|---|\n"
+        for row in summary:
+            section += (
+                f"| {row['prompt_version'] or '-'} | {row['tests']} | {row['avg_quality_score']:.2f} "
+                f"| {row['min_quality_score']:.2f} | {row['max_quality_score']:.2f} | {row['last_test'][:16]} |\n"
+            )
+        return section
     
-    def save_results(self, filename: str = None):
-        """Save DCF test results to JSON file"""
+    def save_results(self, filename: str = None, store: ResultStore = None, source: str = "cli") -> str:
+        """Save DCF test results to the result store, and to a JSON file when a filename is given"""
+        store = store or ResultStore()
+        versions = {result.prompt_version for result in self.test_results}
+        run_id = store.start_run(
+            "dcf", self.model, versions.pop() if len(versions) == 1 else "", source
+        )
+        store.save_results("dcf", self.test_results, run_id)
+        store.finish_run(run_id)
+        print(f"DCF results stored in {store.path} (run {run_id})")
+
         if filename is None:
-            filename = f"dcf_test_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        
+            return run_id
+
         data = []
         for result in self.test_results:
             data.append({
@@ -411,6 +560,7 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             json.dump(data, f, indent=2)
         
         print(f"DCF results saved to {filename}")
+        return run_id
 
 def main():
     """Main function to run the DCF prompt testing agent"""
@@ -430,12 +580,13 @@ def main():
     print(f"Recommendations: {len(result.recommendations)}")
     print(f"Financial Metrics: {sum(len(m) for m in result.financial_metrics.values())}")
     
+    # Save results
+    store = ResultStore()
+    agent.save_results(store=store)
+    
     # Generate and display report
-    report = agent.generate_report()
+    report = agent.generate_report(store=store)
     print("\n" + report)
-    
-    # Save results
-    agent.save_results()
 
 if __name__ == "__main__":
     main()
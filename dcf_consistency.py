@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Numeric consistency checks for DCF tables produced by a model.
+Finds the summary table with free cash flow and present value columns, reads
+the stated WACC and terminal growth, and recomputes the discounting, the
+Gordon terminal value and the enterprise value total. Tables come from
+table_parser; a batch of responses is padded into (responses x years) arrays
+and checked with one set of array operations, so scoring stays cheap next to
+keyword validation.
+"""
+
+import argparse
+import re
+import warnings
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from config import DCF_CONSISTENCY_CONFIG
+from dcf_engine import gordon_terminal_value
+from table_parser import iter_tables
+
+FCF_HEADER = r"free cash flow|\bu?fcf\b"
+PV_HEADER = r"present value|\bpv\b|discounted"
+TERMINAL_HEADER = r"terminal value"
+TERMINAL_LABEL = r"terminal"
+TOTAL_LABEL = r"enterprise value|\btotal\b"
+
+# Each match captures the text around a mention; its first plausible percentage is the stated rate
+WACC_PATTERNS = (re.compile(r"(?:WACC|discount rate)([^\n]{0,60})", re.IGNORECASE),)
+GROWTH_PATTERNS = (
+    re.compile(r"terminal growth(?: rate)?([^\n]{0,40})", re.IGNORECASE),
+    re.compile(r"(\d+(?:\.\d+)?\s*%)\s*(?:long-term |perpetual |terminal )growth", re.IGNORECASE)
+)
+PERCENTAGE = re.compile(r"(\d+(?:\.\d+)?)\s*%")
+
+@dataclass
+class DCFTable:
+    """Figures read from one response"""
+    labels: List[str]
+    free_cash_flow: np.ndarray
+    present_value: np.ndarray
+    precision: np.ndarray              # half a unit of the last quoted digit of each present value
+    terminal_value: Optional[float] = None
+    pv_terminal_value: Optional[float] = None
+    enterprise_value: Optional[float] = None
+    wacc: List[float] = field(default_factory=list)
+    terminal_growth: List[float] = field(default_factory=list)
+
+@dataclass
+class ConsistencyResult:
+    """Outcome of the numeric checks on one response"""
+    accuracy: Optional[float] = None   # share of checks passed; None when no DCF table was found
+    checks: int = 0
+    passed: int = 0
+    wacc: Optional[float] = None
+    wacc_source: str = ""              # "stated" or "implied" (from the table itself)
+    terminal_growth: Optional[float] = None
+    convention: str = ""               # "end" or "mid" year discounting
+    issues: List[str] = field(default_factory=list)
+
+def _percentages(text: str, patterns: Iterable[re.Pattern], low: float, high: float) -> List[float]:
+    """Distinct plausible rates quoted in the text, in order of appearance"""
+    rates = []
+    for pattern in patterns:
+        for match in pattern.finditer(text):
+            for percentage in PERCENTAGE.finditer(match.group(1)):
+                rate = float(percentage.group(1)) / 100
+                if low < rate < high:
+                    if rate not in rates:
+                        rates.append(rate)
+                    break
+    return rates
+
+def parse(text: str) -> Optional[DCFTable]:
+    """The first table with free cash flow and present value columns, plus stated rates"""
+    for table in iter_tables(text):
+        fcf_column = table.find_column(FCF_HEADER, exclude=PV_HEADER)
+        pv_column = table.find_column(PV_HEADER)
+        if fcf_column is None or pv_column is None:
+            continue
+        fcf, pv = table[fcf_column], table[pv_column]
+        terminal_rows, total_rows = table.find_rows(TERMINAL_LABEL), table.find_rows(TOTAL_LABEL)
+        projection = ~np.isnan(fcf) & ~np.isnan(pv)
+        projection[terminal_rows] = projection[total_rows] = False
+        if not projection.any():
+            continue
+
+        dcf = DCFTable(
+            labels=[label for label, selected in zip(table.labels, projection) if selected],
+            free_cash_flow=fcf[projection],
+            present_value=pv[projection],
+            precision=0.5 * table.resolution[pv_column][projection],
+            wacc=_percentages(text, WACC_PATTERNS, 0.0, 0.5),
+            terminal_growth=_percentages(text, GROWTH_PATTERNS, 0.0, 0.1)
+        )
+        # The terminal value is either its own row (value and PV) or a column next to the final year
+        terminal_column = table.find_column(TERMINAL_HEADER)
+        if len(terminal_rows):
+            dcf.terminal_value = _scalar(fcf[terminal_rows[0]])
+            dcf.pv_terminal_value = _scalar(pv[terminal_rows[0]])
+        elif terminal_column is not None:
+            stated = table[terminal_column][projection]
+            stated = stated[~np.isnan(stated)]
+            dcf.terminal_value = float(stated[-1]) if len(stated) else None
+        if len(total_rows):
+            dcf.enterprise_value = _scalar(pv[total_rows[0]])
+        return dcf
+    return None
+
+def _scalar(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+def _amount(value: float) -> str:
+    """Compact figure for messages, e.g. 43.19M"""
+    for scale, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if abs(value) >= scale:
+            return f"{value / scale:,.2f}{suffix}"
+    return f"{value:,.2f}"
+
+def _pad(rows: List[List[float]], width: int) -> np.ndarray:
+    padded = np.full((len(rows), max(width, 1)), np.nan)
+    for i, row in enumerate(rows):
+        padded[i, :len(row)] = row
+    return padded
+
+def check_batch(texts: Iterable[str], pv_tolerance: float = DCF_CONSISTENCY_CONFIG["pv_tolerance"],
+                terminal_tolerance: float = DCF_CONSISTENCY_CONFIG["terminal_tolerance"],
+                total_tolerance: float = DCF_CONSISTENCY_CONFIG["total_tolerance"]) -> List[ConsistencyResult]:
+    """Check many responses at once; the recomputation runs on padded arrays for the whole batch"""
+    tables = [parse(text) for text in texts]
+    results = [ConsistencyResult() for _ in tables]
+    parsed = [i for i, table in enumerate(tables) if table is not None]
+    if not parsed:
+        return results
+    tables = [tables[i] for i in parsed]
+
+    years = max(len(table.free_cash_flow) for table in tables)
+    fcf = _pad([table.free_cash_flow for table in tables], years)                 # (n, years)
+    pv = _pad([table.present_value for table in tables], years)
+    precision = _pad([table.precision for table in tables], years)
+    rows = ~np.isnan(fcf)
+    count = rows.sum(axis=1)
+    periods = np.arange(1, years + 1, dtype=np.float64)
+
+    # The table's own discount rate, for responses that never state their WACC
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # tables without positive rows have no implied rate
+        implied = np.nanmedian(np.where(rows & (pv > 0) & (fcf > 0), (fcf / pv) ** (1 / periods) - 1, np.nan), axis=1)
+    stated = [table.wacc for table in tables]
+    candidates = _pad([rates or [rate] for rates, rate in zip(stated, implied)], max(len(rates) for rates in stated))
+
+    # Discount every row at every candidate WACC under both conventions: (n, candidates, 2, years)
+    offsets = np.array([0.0, 0.5])[:, None]
+    factors = (1 + candidates[:, :, None, None]) ** -(periods - offsets)
+    computed = fcf[:, None, None, :] * factors
+    with np.errstate(divide="ignore", invalid="ignore"):
+        errors = np.abs(pv[:, None, None, :] - computed)
+        relative = errors / np.abs(computed)
+    # Mean relative error per candidate; padded (NaN) candidates never win
+    known = ~np.isnan(relative)
+    relative = np.where(
+        known.any(axis=3), np.where(known, relative, 0).sum(axis=3) / np.maximum(known.sum(axis=3), 1), np.inf
+    ).reshape(len(tables), -1)
+    best = relative.argmin(axis=1)
+    candidate, convention = np.divmod(best, 2)
+    index = np.arange(len(tables))
+    wacc = candidates[index, candidate]
+    computed = computed[index, candidate, convention]                                # (n, years)
+    errors = errors[index, candidate, convention]
+    row_passed = rows & (errors <= np.maximum(pv_tolerance * np.abs(computed), precision))
+
+    # Terminal value, its present value and the enterprise value total, where the table states them
+    last = fcf[index, np.maximum(count - 1, 0)]
+    growth = np.array([table.terminal_growth[0] if table.terminal_growth else np.nan for table in tables])
+    terminal = np.array([np.nan if table.terminal_value is None else table.terminal_value for table in tables])
+    pv_terminal = np.array([np.nan if table.pv_terminal_value is None else table.pv_terminal_value for table in tables])
+    total = np.array([np.nan if table.enterprise_value is None else table.enterprise_value for table in tables])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected_terminal = np.where(wacc > growth, gordon_terminal_value(last, wacc, growth), np.nan)
+        # As in dcf_engine and excel_export, the terminal value is discounted from the end of the
+        # horizon under either convention
+        expected_pv_terminal = terminal * (1 + wacc) ** -count.astype(np.float64)
+        # Tables that give the terminal value only as a column have no PV row; discount the stated value
+        included_terminal = np.where(np.isnan(pv_terminal), expected_pv_terminal, pv_terminal)
+        expected_total = np.nansum(pv, axis=1) + np.nan_to_num(included_terminal)
+        checks = {
+            "terminal value": (terminal, expected_terminal, terminal_tolerance),
+            "PV of terminal value": (pv_terminal, expected_pv_terminal, terminal_tolerance),
+            "enterprise value": (total, expected_total, total_tolerance)
+        }
+        outcomes = {
+            name: (~np.isnan(stated_values) & ~np.isnan(expected),
+                   np.abs(stated_values - expected) <= tolerance * np.abs(expected))
+            for name, (stated_values, expected, tolerance) in checks.items()
+        }
+
+    for j, i in enumerate(parsed):
+        table, result = tables[j], results[i]
+        result.checks = int(count[j]) + sum(int(applies[j]) for applies, _ in outcomes.values())
+        result.passed = int(row_passed[j].sum()) + sum(int(applies[j] and ok[j]) for applies, ok in outcomes.values())
+        result.accuracy = result.passed / result.checks
+        result.wacc = float(wacc[j])
+        result.wacc_source = "stated" if table.wacc else "implied"
+        result.terminal_growth = None if np.isnan(growth[j]) else float(growth[j])
+        result.convention = "mid" if convention[j] else "end"
+        for k in np.flatnonzero(rows[j] & ~row_passed[j]):
+            result.issues.append(
+                f"{table.labels[k]}: present value {_amount(pv[j, k])} does not follow from free cash flow "
+                f"{_amount(fcf[j, k])} at {wacc[j]:.2%} (expected {_amount(computed[j, k])})"
+            )
+        for name, (stated_values, expected, _) in checks.items():
+            applies, ok = outcomes[name]
+            if applies[j] and not ok[j]:
+                result.issues.append(
+                    f"Stated {name} {_amount(stated_values[j])} differs from recomputed {_amount(expected[j])}"
+                )
+    return results
+
+def check(text: str) -> ConsistencyResult:
+    """Check the DCF table of a single response"""
+    return check_batch([text])[0]
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the arithmetic of DCF tables in response files")
+    parser.add_argument("files", nargs="+", help="Response files (markdown or text)")
+    args = parser.parse_args()
+
+    texts = []
+    for path in args.files:
+        with open(path, "r", encoding="utf-8") as f:
+            texts.append(f.read())
+    for path, result in zip(args.files, check_batch(texts)):
+        if result.accuracy is None:
+            print(f"{path}: no DCF table found")
+            continue
+        growth = f", terminal growth {result.terminal_growth:.2%}" if result.terminal_growth is not None else ""
+        print(
+            f"{path}: {result.passed}/{result.checks} checks passed (accuracy {result.accuracy:.2f}); "
+            f"WACC {result.wacc:.2%} ({result.wacc_source}), {result.convention}-year discounting{growth}"
+        )
+        for issue in result.issues:
+            print(f"  - {issue}")
+
+if __name__ == "__main__":
+    main()
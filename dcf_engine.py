@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Vectorized DCF engine.
+Projects revenue, free cash flow, discount factors, terminal value and
+enterprise/equity value for whole batches of assumption sets at once with
+NumPy, so DCF answers from the LLM can be checked numerically rather than
+only by keyword.
+
+Every assumption may be a scalar, one value per assumption set (shape (n,))
+or, for the operating drivers, one value per set and year (shape (n, years)).
+"""
+
+import argparse
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+ArrayLike = Union[float, np.ndarray]
+
+DEFAULT_YEARS = 10
+
+@dataclass
+class DCFAssumptions:
+    """Inputs of a DCF; rates and percentages are fractions (0.25 for 25%)"""
+    revenue: ArrayLike                # base (year 0) revenue
+    revenue_growth: ArrayLike         # per year
+    ebit_margin: ArrayLike            # operating margin, per year
+    capex_pct: ArrayLike              # capital expenditure as a share of revenue
+    nwc_pct: ArrayLike                # net working capital as a share of revenue
+    tax_rate: ArrayLike
+    wacc: ArrayLike
+    terminal_growth: ArrayLike
+    depreciation_pct: ArrayLike = 0.0  # D&A as a share of revenue
+    net_debt: ArrayLike = 0.0
+    shares_outstanding: Optional[ArrayLike] = None
+
+@dataclass
+class DCFValuation:
+    """Results for n assumption sets over the projection horizon"""
+    revenue: np.ndarray               # (n, years)
+    ebit: np.ndarray                  # (n, years)
+    free_cash_flow: np.ndarray        # (n, years)
+    discount_factors: np.ndarray      # (n, years)
+    present_values: np.ndarray        # (n, years)
+    terminal_value: np.ndarray        # (n,)
+    pv_terminal_value: np.ndarray     # (n,)
+    enterprise_value: np.ndarray      # (n,)
+    equity_value: np.ndarray          # (n,)
+    value_per_share: Optional[np.ndarray] = None  # (n,)
+
+    def __len__(self) -> int:
+        return len(self.enterprise_value)
+
+def _per_set(value: ArrayLike, n: int) -> np.ndarray:
+    """Broadcast a per-set assumption to shape (n,)"""
+    return np.broadcast_to(np.asarray(value, dtype=np.float64), (n,))
+
+def _per_year(value: ArrayLike, n: int, years: int) -> np.ndarray:
+    """Broadcast a driver to shape (n, years); 1-D values are one per set"""
+    array = np.asarray(value, dtype=np.float64)
+    if array.ndim == 1:
+        array = array[:, None]
+    return np.broadcast_to(array, (n, years))
+
+def batch_size(assumptions: DCFAssumptions) -> int:
+    """Number of assumption sets described by the (broadcast) inputs"""
+    sizes = [
+        np.asarray(value).shape[0]
+        for value in vars(assumptions).values()
+        if value is not None and np.ndim(value) >= 1
+    ]
+    return max(sizes, default=1)
+
+def gordon_terminal_value(final_cash_flow: ArrayLike, wacc: ArrayLike, terminal_growth: ArrayLike) -> np.ndarray:
+    """Terminal value at the end of the horizon under perpetual growth"""
+    final_cash_flow = np.asarray(final_cash_flow, dtype=np.float64)
+    wacc = np.asarray(wacc, dtype=np.float64)
+    terminal_growth = np.asarray(terminal_growth, dtype=np.float64)
+    return final_cash_flow * (1 + terminal_growth) / (wacc - terminal_growth)
+
+def relative_error(stated: ArrayLike, computed: ArrayLike) -> np.ndarray:
+    """|stated - computed| / |computed|, for cross-checking figures quoted by a model"""
+    stated, computed = np.asarray(stated, dtype=np.float64), np.asarray(computed, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.abs(stated - computed) / np.abs(computed)
+
+def _project(assumptions: DCFAssumptions, n: int, years: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Revenue, EBIT and unlevered free cash flow of n assumption sets, each (n, years)"""
+    growth = _per_year(assumptions.revenue_growth, n, years)
+    margin = _per_year(assumptions.ebit_margin, n, years)
+    capex_pct = _per_year(assumptions.capex_pct, n, years)
+    nwc_pct = _per_year(assumptions.nwc_pct, n, years)
+    depreciation_pct = _per_year(assumptions.depreciation_pct, n, years)
+    base_revenue = _per_set(assumptions.revenue, n)
+    tax_rate = _per_set(assumptions.tax_rate, n)
+
+    revenue = base_revenue[:, None] * np.cumprod(1 + growth, axis=1)
+    ebit = revenue * margin
+    # Working capital investment is the change in NWC, starting from the base year's level
+    nwc = revenue * nwc_pct
+    base_nwc = base_revenue * nwc_pct[:, 0]
+    delta_nwc = np.diff(nwc, axis=1, prepend=base_nwc[:, None])
+    free_cash_flow = (
+        ebit * (1 - tax_rate[:, None])
+        + revenue * depreciation_pct
+        - revenue * capex_pct
+        - delta_nwc
+    )
+    return revenue, ebit, free_cash_flow
+
+def free_cash_flows(assumptions: DCFAssumptions, years: int = DEFAULT_YEARS) -> np.ndarray:
+    """Projected free cash flows, (n, years); discounting inputs are not needed or checked"""
+    return _project(assumptions, batch_size(assumptions), years)[2]
+
+def value(assumptions: DCFAssumptions, years: int = DEFAULT_YEARS, mid_year: bool = False) -> DCFValuation:
+    """Value every assumption set with a Gordon growth terminal value"""
+    n = batch_size(assumptions)
+    wacc = _per_set(assumptions.wacc, n)
+    terminal_growth = _per_set(assumptions.terminal_growth, n)
+
+    invalid = wacc <= terminal_growth
+    if invalid.any():
+        raise ValueError(f"WACC must exceed terminal growth ({int(invalid.sum())} of {n} assumption sets do not)")
+
+    revenue, ebit, free_cash_flow = _project(assumptions, n, years)
+
+    periods = np.arange(1, years + 1, dtype=np.float64) - (0.5 if mid_year else 0.0)
+    discount_factors = (1 + wacc[:, None]) ** -periods
+    present_values = free_cash_flow * discount_factors
+
+    terminal_value = gordon_terminal_value(free_cash_flow[:, -1], wacc, terminal_growth)
+    pv_terminal_value = terminal_value * (1 + wacc) ** -float(years)
+    enterprise_value = present_values.sum(axis=1) + pv_terminal_value
+    equity_value = enterprise_value - _per_set(assumptions.net_debt, n)
+
+    value_per_share = None
+    if assumptions.shares_outstanding is not None:
+        value_per_share = equity_value / _per_set(assumptions.shares_outstanding, n)
+
+    return DCFValuation(
+        revenue=revenue,
+        ebit=ebit,
+        free_cash_flow=free_cash_flow,
+        discount_factors=discount_factors,
+        present_values=present_values,
+        terminal_value=terminal_value,
+        pv_terminal_value=pv_terminal_value,
+        enterprise_value=enterprise_value,
+        equity_value=equity_value,
+        value_per_share=value_per_share
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Value a company with the vectorized DCF engine")
+    parser.add_argument("--revenue", type=float, required=True, help="Base year revenue")
+    parser.add_argument("--growth", type=float, default=0.10, help="Annual revenue growth")
+    parser.add_argument("--margin", type=float, default=0.20, help="EBIT margin")
+    parser.add_argument("--capex", type=float, default=0.05, help="CapEx as a share of revenue")
+    parser.add_argument("--depreciation", type=float, default=0.04, help="D&A as a share of revenue")
+    parser.add_argument("--nwc", type=float, default=0.10, help="Net working capital as a share of revenue")
+    parser.add_argument("--tax-rate", type=float, default=0.25, help="Tax rate")
+    parser.add_argument("--wacc", type=float, default=0.09, help="Discount rate")
+    parser.add_argument("--terminal-growth", type=float, default=0.025, help="Terminal growth rate")
+    parser.add_argument("--net-debt", type=float, default=0.0, help="Net debt")
+    parser.add_argument("--shares", type=float, help="Shares outstanding")
+    parser.add_argument("--years", type=int, default=DEFAULT_YEARS, help="Projection horizon")
+    parser.add_argument("--mid-year", action="store_true", help="Discount with the mid-year convention")
+    args = parser.parse_args()
+
+    valuation = value(DCFAssumptions(
+        revenue=args.revenue,
+        revenue_growth=args.growth,
+        ebit_margin=args.margin,
+        capex_pct=args.capex,
+        nwc_pct=args.nwc,
+        tax_rate=args.tax_rate,
+        wacc=args.wacc,
+        terminal_growth=args.terminal_growth,
+        depreciation_pct=args.depreciation,
+        net_debt=args.net_debt,
+        shares_outstanding=args.shares
+    ), years=args.years, mid_year=args.mid_year)
+
+    print(f"{'Year':>4}  {'Revenue':>14}  {'EBIT':>14}  {'FCF':>14}  {'Discount':>8}  {'PV of FCF':>14}")
+    for year in range(args.years):
+        print(
+            f"{year + 1:>4}  {valuation.revenue[0, year]:>14,.0f}  {valuation.ebit[0, year]:>14,.0f}  "
+            f"{valuation.free_cash_flow[0, year]:>14,.0f}  {valuation.discount_factors[0, year]:>8.4f}  "
+            f"{valuation.present_values[0, year]:>14,.0f}"
+        )
+    print(f"\nTerminal value:    {valuation.terminal_value[0]:,.0f} (PV {valuation.pv_terminal_value[0]:,.0f})")
+    print(f"Enterprise value:  {valuation.enterprise_value[0]:,.0f}")
+    print(f"Equity value:      {valuation.equity_value[0]:,.0f}")
+    if valuation.value_per_share is not None:
+        print(f"Value per share:   {valuation.value_per_share[0]:,.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Dependency graph of named cells for incremental recalculation.
+Cells are either inputs or formulas over earlier cells, so the graph is
+acyclic by construction. Setting an input only marks its transitive
+dependents stale; stale cells are recomputed lazily the next time they (or a
+cell depending on them) are read. Everything else keeps its cached value.
+Scenarios can also be evaluated as input overrides without touching the cache.
+"""
+
+from collections import defaultdict
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Iterable, List, Optional, Set, Tuple
+
+class DependencyGraph:
+    """Inputs and formulas with cached values and targeted invalidation"""
+
+    def __init__(self):
+        self._formulas: Dict[str, Callable[..., Any]] = {}
+        self._dependencies: Dict[str, Tuple[str, ...]] = {}
+        self._dependents: Dict[str, Set[str]] = defaultdict(set)
+        self._order: Dict[str, int] = {}
+        self._values: Dict[str, Any] = {}
+        self._stale: Set[str] = set()
+        self._downstream: Dict[str, FrozenSet[str]] = {}
+        self.evaluations = 0  # formula evaluations so far, to observe how much an edit recomputes
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._order
+
+    def __getitem__(self, name: str) -> Any:
+        return self.get(name)
+
+    @property
+    def names(self) -> List[str]:
+        """Every cell, in definition (topological) order"""
+        return list(self._order)
+
+    @property
+    def inputs(self) -> List[str]:
+        return [name for name in self._order if name not in self._formulas]
+
+    def dependencies(self, name: str) -> Tuple[str, ...]:
+        return self._dependencies.get(name, ())
+
+    def add_input(self, name: str, value: Any):
+        self._define(name, ())
+        self._values[name] = value
+
+    def add_formula(self, name: str, dependencies: Iterable[str], function: Callable[..., Any]):
+        """Define a cell computed by function(*values of dependencies)"""
+        dependencies = tuple(dependencies)
+        for dependency in dependencies:
+            if dependency not in self._order:
+                raise ValueError(f"{name} depends on undefined cell {dependency}")
+        self._define(name, dependencies)
+        self._formulas[name] = function
+        self._stale.add(name)
+
+    def formula(self, *dependencies: str) -> Callable:
+        """Decorator form of add_formula, named after the function"""
+        def define(function: Callable[..., Any]) -> Callable[..., Any]:
+            self.add_formula(function.__name__, dependencies, function)
+            return function
+        return define
+
+    def _define(self, name: str, dependencies: Tuple[str, ...]):
+        if name in self._order:
+            raise ValueError(f"Cell {name} is already defined")
+        self._order[name] = len(self._order)
+        self._dependencies[name] = dependencies
+        for dependency in dependencies:
+            self._dependents[dependency].add(name)
+        self._downstream.clear()
+
+    def downstream(self, name: str) -> FrozenSet[str]:
+        """Every cell that (transitively) depends on a cell"""
+        if name not in self._order:
+            raise KeyError(f"Unknown cell: {name}")
+        if name not in self._downstream:
+            seen: Set[str] = set()
+            pending = [name]
+            while pending:
+                for dependent in self._dependents.get(pending.pop(), ()):
+                    if dependent not in seen:
+                        seen.add(dependent)
+                        pending.append(dependent)
+            self._downstream[name] = frozenset(seen)
+        return self._downstream[name]
+
+    def set(self, name: str, value: Any):
+        """Change an input and invalidate its dependents"""
+        if name not in self._order:
+            raise KeyError(f"Unknown cell: {name}")
+        if name in self._formulas:
+            raise ValueError(f"{name} is computed and cannot be set")
+        self._values[name] = value
+        self._stale |= self.downstream(name)
+
+    def update(self, values: Dict[str, Any]):
+        for name, value in values.items():
+            self.set(name, value)
+
+    def get(self, name: str) -> Any:
+        """Value of a cell, recomputing it (and stale dependencies) if needed"""
+        if name in self._stale:
+            arguments = [self.get(dependency) for dependency in self._dependencies[name]]
+            self._values[name] = self._formulas[name](*arguments)
+            self._stale.discard(name)
+            self.evaluations += 1
+        elif name not in self._order:
+            raise KeyError(f"Unknown cell: {name}")
+        return self._values[name]
+
+    def evaluate(self, names: Iterable[str], overrides: Dict[str, Any],
+                 memo: Optional[Dict[tuple, Any]] = None, keys: Dict[str, Hashable] = None) -> Dict[str, Any]:
+        """Values of cells with some inputs overridden, leaving the graph's own values untouched
+
+        Only cells downstream of the overrides are computed; every other cell is read from
+        the graph's cache. With a memo, computed cells are shared between evaluations: an
+        entry is keyed by the cell and the keys (e.g. fingerprints) of just the overridden
+        inputs upstream of it, so evaluations agreeing on those inputs reuse the value.
+        """
+        for name in overrides:
+            if name not in self._order:
+                raise KeyError(f"Unknown cell: {name}")
+            if name in self._formulas:
+                raise ValueError(f"{name} is computed and cannot be overridden")
+        if memo is not None and keys is None:
+            raise ValueError("A memo needs keys identifying the override values")
+        affected = set().union(*(self.downstream(name) for name in overrides))
+        values = dict(overrides)
+
+        def get(name: str) -> Any:
+            if name in values:
+                return values[name]
+            if name not in affected:
+                return self.get(name)
+            key = None
+            if memo is not None:
+                key = (name,) + tuple(
+                    (source, keys[source]) for source in overrides if name in self._downstream[source]
+                )
+                if key in memo:
+                    values[name] = memo[key]
+                    return values[name]
+            values[name] = self._formulas[name](*[get(dependency) for dependency in self._dependencies[name]])
+            self.evaluations += 1
+            if memo is not None:
+                memo[key] = values[name]
+            return values[name]
+
+        return {name: get(name) for name in names}
+
+    def stale(self) -> List[str]:
+        """Cells that will be recomputed on their next read, in topological order"""
+        return sorted(self._stale, key=self._order.__getitem__)
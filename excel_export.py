@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Streaming Excel export of computed models.
+Writes DCF, sensitivity and three-statement models to .xlsx with live
+formulas: drivers are input cells and every line item, subtotal and valuation
+output is an Excel formula over them, so the workbook recalculates when a
+driver is edited. Monte Carlo results are exported as summaries (statistics,
+percentiles, convergence and a histogram).
+
+Workbooks are written with openpyxl's write-only mode, which streams rows to
+disk as they are appended, so very large sensitivity grids or path exports are
+written in constant memory. Requires openpyxl.
+"""
+
+import argparse
+import re
+from typing import BinaryIO, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from dcf_engine import DEFAULT_YEARS, DCFAssumptions
+from monte_carlo import MonteCarloResult
+from sensitivity import SensitivityGrid
+from three_statement import PER_YEAR_DRIVERS, ThreeStatementModel
+
+try:
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
+except ImportError:
+    openpyxl = None
+
+# Excel's sheet limits
+MAX_ROWS = 1048576
+MAX_COLUMNS = 16384
+
+AMOUNT = "#,##0.0;(#,##0.0)"
+PERCENT = "0.0%"
+NUMBER = "0.00"
+FACTOR = "0.0000"
+
+# {name} is the cell of a line item in the same column, {name@prev} / {name@next} the neighbouring
+# year, {name@last} the final year and {name@all} the whole projection; scalars are absolute references
+TOKEN = re.compile(r"\{(\w+)(?:@(prev|next|last|all))?\}")
+
+def _require_openpyxl():
+    if openpyxl is None:
+        raise RuntimeError("Excel export requires openpyxl (pip install openpyxl)")
+
+def new_workbook():
+    """An empty write-only workbook; add sheets with the write_* functions, then save it"""
+    _require_openpyxl()
+    return openpyxl.Workbook(write_only=True)
+
+class ModelSheet:
+    """A sheet of labelled rows over the projection years, written once all rows are declared
+
+    Column A holds labels, column B year 0 (opening balances and single-value rows) and
+    columns C onwards the projection years. Formulas may reference rows declared later.
+    """
+
+    def __init__(self, title: str, years: int):
+        self.title = title
+        self.years = years
+        self._rows: List[tuple] = []
+        self._row_of: Dict[str, int] = {}
+        self._scalars = set()
+
+    def _add(self, kind: str, name: Optional[str], label: str, content, opening=None, number_format: str = AMOUNT):
+        if name is not None:
+            if name in self._row_of:
+                raise ValueError(f"Row {name} is already defined")
+            self._row_of[name] = len(self._rows) + 2  # below the header row
+            if kind in ("scalar", "total"):
+                self._scalars.add(name)
+        self._rows.append((kind, label, content, opening, number_format))
+
+    def section(self, label: str):
+        self._add("section", None, label, None)
+
+    def driver(self, name: str, label: str, values: Sequence[float], number_format: str = PERCENT):
+        """Input row with one value per projection year"""
+        self._add("driver", name, label, np.broadcast_to(np.asarray(values, dtype=np.float64), (self.years,)),
+                  number_format=number_format)
+
+    def scalar(self, name: str, label: str, value: float, number_format: str = PERCENT):
+        """Single input value in the year 0 column"""
+        self._add("scalar", name, label, value, number_format=number_format)
+
+    def line(self, name: str, label: str, formula: str, opening: Union[str, float, None] = None,
+             number_format: str = AMOUNT):
+        """Line item computed by the same formula in every projection year, with an optional year 0 value"""
+        self._add("line", name, label, formula, opening, number_format)
+
+    def total(self, name: str, label: str, formula: str, number_format: str = AMOUNT):
+        """Single formula in the year 0 column, e.g. a valuation output"""
+        self._add("total", name, label, formula, number_format=number_format)
+
+    def reference(self, name: str, at: str = None, external: bool = False) -> str:
+        """Cell reference of a row, as used in formulas (absolute when external)"""
+        row = self._row_of[name]
+        prefix = f"'{self.title}'!" if external else ""
+        if name in self._scalars:
+            return f"{prefix}$B${row}"
+        if at == "all":
+            return f"{prefix}$C${row}:${get_column_letter(self.years + 2)}${row}"
+        if at == "last":
+            return f"{prefix}${get_column_letter(self.years + 2)}${row}"
+        raise ValueError("External references to per-year rows need at='all' or at='last'")
+
+    def _resolve(self, template: str, column: int) -> str:
+        def cell(match):
+            name, at = match.group(1), match.group(2)
+            if name not in self._row_of:
+                raise KeyError(f"Formula references undefined row {name}")
+            if name in self._scalars or at in ("last", "all"):
+                return self.reference(name, at)
+            offset = {"prev": -1, "next": 1}.get(at, 0)
+            return f"{get_column_letter(column + offset)}{self._row_of[name]}"
+        return "=" + TOKEN.sub(cell, template)
+
+    def write(self, workbook):
+        sheet = workbook.create_sheet(self.title)
+        sheet.column_dimensions["A"].width = 32
+        bold = Font(bold=True)
+
+        def styled(value, number_format=None, font=None):
+            cell = WriteOnlyCell(sheet, value=value)
+            if number_format:
+                cell.number_format = number_format
+            if font:
+                cell.font = font
+            return cell
+
+        sheet.append([styled("", font=bold)] + [styled(f"Year {year}", font=bold) for year in range(self.years + 1)])
+        for kind, label, content, opening, number_format in self._rows:
+            if kind == "section":
+                sheet.append([styled(label, font=bold)])
+                continue
+            row = [label]
+            if kind == "driver":
+                row += [None] + [styled(float(value), number_format) for value in content]
+            elif kind == "scalar":
+                row.append(styled(content, number_format))
+            elif kind == "total":
+                row.append(styled(self._resolve(content, 2), number_format, bold))
+            else:
+                if isinstance(opening, str):
+                    row.append(styled(self._resolve(opening, 2), number_format))
+                else:
+                    row.append(None if opening is None else styled(float(opening), number_format))
+                row += [styled(self._resolve(content, column), number_format) for column in range(3, self.years + 3)]
+            sheet.append(row)
+        return sheet
+
+def _assumption(value, index: int) -> np.ndarray:
+    """One assumption set's value (a scalar, or one value per year) out of a batch"""
+    array = np.asarray(value, dtype=np.float64)
+    if array.ndim:
+        array = array[index if array.shape[0] > 1 else 0]
+    return array
+
+def write_dcf(workbook, assumptions: DCFAssumptions, years: int = DEFAULT_YEARS, mid_year: bool = False,
+              index: int = 0, title: str = "DCF") -> ModelSheet:
+    """Linked DCF of one assumption set (out of a batch) mirroring dcf_engine.value"""
+    _require_openpyxl()
+    sheet = ModelSheet(title, years)
+    per_year = {name: _assumption(getattr(assumptions, name), index)
+                for name in ("revenue_growth", "ebit_margin", "depreciation_pct", "capex_pct", "nwc_pct")}
+    scalar = {name: float(_assumption(getattr(assumptions, name), index))
+              for name in ("revenue", "tax_rate", "wacc", "terminal_growth", "net_debt")}
+
+    sheet.section("Drivers")
+    sheet.driver("period", "Discount period" + (" (mid-year)" if mid_year else ""),
+                 np.arange(1, years + 1) - (0.5 if mid_year else 0.0), NUMBER)
+    sheet.driver("revenue_growth", "Revenue growth", per_year["revenue_growth"])
+    sheet.driver("ebit_margin", "EBIT margin", per_year["ebit_margin"])
+    sheet.driver("depreciation_pct", "D&A (% of revenue)", per_year["depreciation_pct"])
+    sheet.driver("capex_pct", "Capex (% of revenue)", per_year["capex_pct"])
+    sheet.driver("nwc_pct", "Net working capital (% of revenue)", per_year["nwc_pct"])
+    sheet.scalar("tax_rate", "Tax rate", scalar["tax_rate"])
+    sheet.scalar("wacc", "WACC", scalar["wacc"])
+    sheet.scalar("terminal_growth", "Terminal growth", scalar["terminal_growth"])
+    sheet.scalar("net_debt", "Net debt", scalar["net_debt"], AMOUNT)
+    if assumptions.shares_outstanding is not None:
+        sheet.scalar("shares_outstanding", "Shares outstanding",
+                     float(_assumption(assumptions.shares_outstanding, index)), AMOUNT)
+
+    sheet.section("Free cash flow")
+    sheet.line("revenue", "Revenue", "{revenue@prev}*(1+{revenue_growth})", opening=scalar["revenue"])
+    sheet.line("ebit", "EBIT", "{revenue}*{ebit_margin}")
+    sheet.line("nopat", "NOPAT", "{ebit}*(1-{tax_rate})")
+    sheet.line("depreciation", "D&A", "{revenue}*{depreciation_pct}")
+    sheet.line("capex", "Capex", "{revenue}*{capex_pct}")
+    sheet.line("nwc", "Net working capital", "{revenue}*{nwc_pct}", opening="{revenue}*{nwc_pct@next}")
+    sheet.line("change_in_nwc", "Change in NWC", "{nwc}-{nwc@prev}")
+    sheet.line("free_cash_flow", "Free cash flow", "{nopat}+{depreciation}-{capex}-{change_in_nwc}")
+    sheet.line("discount_factor", "Discount factor", "(1+{wacc})^-{period}", number_format=FACTOR)
+    sheet.line("present_value", "Present value", "{free_cash_flow}*{discount_factor}")
+
+    # As in dcf_engine, the terminal value is discounted from the end of the horizon
+    sheet.section("Valuation")
+    sheet.total("sum_of_present_values", "Sum of present values", "SUM({present_value@all})")
+    sheet.total("terminal_value", "Terminal value (Gordon)",
+                "{free_cash_flow@last}*(1+{terminal_growth})/({wacc}-{terminal_growth})")
+    sheet.total("pv_terminal_value", "PV of terminal value", f"{{terminal_value}}*(1+{{wacc}})^-{years}")
+    sheet.total("enterprise_value", "Enterprise value", "{sum_of_present_values}+{pv_terminal_value}")
+    sheet.total("equity_value", "Equity value", "{enterprise_value}-{net_debt}")
+    if assumptions.shares_outstanding is not None:
+        sheet.total("value_per_share", "Value per share", "{equity_value}/{shares_outstanding}", NUMBER)
+
+    sheet.write(workbook)
+    return sheet
+
+def write_three_statement(workbook, model: ThreeStatementModel, title: str = "Three Statement") -> ModelSheet:
+    """Linked income statement, balance sheet, cash flow statement and DCF of a three-statement model"""
+    _require_openpyxl()
+    sheet = ModelSheet(title, model.years)
+    labels = {
+        "revenue_growth": "Revenue growth", "cogs_pct": "COGS (% of revenue)", "opex_pct": "Opex (% of revenue)",
+        "capex_pct": "Capex (% of revenue)", "tax_rate": "Tax rate", "receivable_days": "Receivable days",
+        "inventory_days": "Inventory days", "payable_days": "Payable days", "debt_repayment": "Debt repayment",
+        "dividend_payout": "Dividend payout", "base_revenue": "Base revenue", "useful_life": "Useful life (years)",
+        "interest_rate": "Interest rate", "opening_cash": "Opening cash", "opening_ppe": "Opening PP&E",
+        "opening_debt": "Opening debt", "wacc": "WACC", "terminal_growth": "Terminal growth"
+    }
+    amounts = {"receivable_days", "inventory_days", "payable_days", "debt_repayment", "base_revenue",
+               "useful_life", "opening_cash", "opening_ppe", "opening_debt"}
+
+    sheet.section("Drivers")
+    sheet.driver("year", "Year", np.arange(1, model.years + 1), "0")
+    for name in model.graph.inputs:
+        number_format = AMOUNT if name in amounts else PERCENT
+        if name in PER_YEAR_DRIVERS:
+            sheet.driver(name, labels[name], model[name], number_format)
+        else:
+            sheet.scalar(name, labels[name], float(model[name]), number_format)
+
+    sheet.section("Income statement")
+    sheet.line("revenue", "Revenue", "{revenue@prev}*(1+{revenue_growth})", opening="{base_revenue}")
+    sheet.line("cogs", "COGS", "{revenue}*{cogs_pct}")
+    sheet.line("gross_profit", "Gross profit", "{revenue}-{cogs}")
+    sheet.line("opex", "Operating expenses", "{revenue}*{opex_pct}")
+    sheet.line("ebitda", "EBITDA", "{gross_profit}-{opex}")
+    # Straight-line depreciation of the capex of the last useful_life years plus the opening PP&E
+    sheet.line("depreciation", "Depreciation",
+               "(SUMPRODUCT({capex@all},({year@all}<={year})*({year@all}>{year}-{useful_life}))"
+               "+IF({year}<={useful_life},{opening_ppe},0))/{useful_life}")
+    sheet.line("ebit", "EBIT", "{ebitda}-{depreciation}")
+    sheet.line("interest", "Interest", "{debt@prev}*{interest_rate}")
+    sheet.line("pretax_income", "Pre-tax income", "{ebit}-{interest}")
+    sheet.line("taxes", "Taxes", "MAX({pretax_income},0)*{tax_rate}")
+    sheet.line("net_income", "Net income", "{pretax_income}-{taxes}")
+
+    sheet.section("Balance sheet")
+    sheet.line("cash", "Cash", "{cash@prev}+{change_in_cash}", opening="{opening_cash}")
+    sheet.line("receivables", "Receivables", "{revenue}*{receivable_days}/365")
+    sheet.line("inventory", "Inventory", "{cogs}*{inventory_days}/365")
+    sheet.line("ppe", "PP&E", "{ppe@prev}+{capex}-{depreciation}", opening="{opening_ppe}")
+    sheet.line("total_assets", "Total assets", "{cash}+{receivables}+{inventory}+{ppe}")
+    sheet.line("payables", "Payables", "{cogs}*{payable_days}/365")
+    sheet.line("debt", "Debt", "MAX({debt@prev}-{debt_repayment},0)", opening="{opening_debt}")
+    # Opening equity balances the opening balance sheet
+    sheet.line("equity", "Equity", "{equity@prev}+{net_income}-{dividends}",
+               opening="{opening_cash}+{working_capital}+{opening_ppe}-{opening_debt}")
+    sheet.line("total_liabilities_and_equity", "Total liabilities and equity", "{payables}+{debt}+{equity}")
+    sheet.line("balance_check", "Balance check", "{total_assets}-{total_liabilities_and_equity}")
+
+    sheet.section("Cash flow statement")
+    sheet.line("cf_net_income", "Net income", "{net_income}")
+    sheet.line("cf_depreciation", "Depreciation", "{depreciation}")
+    sheet.line("working_capital", "Working capital", "{receivables}+{inventory}-{payables}",
+               opening="{base_revenue}*({receivable_days@next}+{cogs_pct@next}"
+                       "*({inventory_days@next}-{payable_days@next}))/365")
+    sheet.line("change_in_working_capital", "Change in working capital", "{working_capital}-{working_capital@prev}")
+    sheet.line("cash_from_operations", "Cash from operations",
+               "{cf_net_income}+{cf_depreciation}-{change_in_working_capital}")
+    sheet.line("capex", "Capex", "{revenue}*{capex_pct}")
+    sheet.line("cash_from_investing", "Cash from investing", "-{capex}")
+    sheet.line("debt_repaid", "Debt repaid", "{debt@prev}-{debt}")
+    sheet.line("dividends", "Dividends", "MAX({net_income},0)*{dividend_payout}")
+    sheet.line("cash_from_financing", "Cash from financing", "-{debt_repaid}-{dividends}")
+    sheet.line("change_in_cash", "Change in cash",
+               "{cash_from_operations}+{cash_from_investing}+{cash_from_financing}")
+
+    sheet.section("Valuation")
+    sheet.line("nopat", "NOPAT", "{ebit}*(1-{tax_rate})")
+    sheet.line("free_cash_flow", "Unlevered free cash flow",
+               "{nopat}+{depreciation}-{capex}-{change_in_working_capital}")
+    sheet.line("discount_factor", "Discount factor", "(1+{wacc})^-{year}", number_format=FACTOR)
+    sheet.line("present_value", "Present value", "{free_cash_flow}*{discount_factor}")
+    sheet.total("terminal_value", "Terminal value (Gordon)",
+                "{free_cash_flow@last}*(1+{terminal_growth})/({wacc}-{terminal_growth})")
+    sheet.total("enterprise_value", "Enterprise value",
+                "SUM({present_value@all})+{terminal_value}*{discount_factor@last}")
+
+    sheet.write(workbook)
+    return sheet
+
+def _grid_formula(dcf: ModelSheet, output: str) -> str:
+    """Formula template ({wacc}, {terminal_growth}) of a grid point over the DCF sheet's cash flows"""
+    ref = lambda name, at=None: dcf.reference(name, at, external=True)
+    value = (
+        f"SUMPRODUCT({ref('free_cash_flow', 'all')},(1+{{wacc}})^-{ref('period', 'all')})"
+        f"+{ref('free_cash_flow', 'last')}*(1+{{terminal_growth}})/({{wacc}}-{{terminal_growth}})"
+        f"*(1+{{wacc}})^-{dcf.years}"
+    )
+    if output != "enterprise_value":
+        value = f"{value}-{ref('net_debt')}"
+    if output == "value_per_share":
+        value = f"({value})/{ref('shares_outstanding')}"
+    return f"=IF({{wacc}}>{{terminal_growth}},{value},NA())"
+
+def write_sensitivity(workbook, grid: SensitivityGrid, dcf: ModelSheet = None, title: str = "Sensitivity"):
+    """Sensitivity grid as a table (two axes) or one row per grid point (any number of axes)
+
+    A WACC x terminal growth table is written as live formulas over the cash flows of a DCF
+    sheet from write_dcf (of the same base case) when one is given; other grids hold values.
+    """
+    _require_openpyxl()
+    sheet = workbook.create_sheet(title)
+    bold = Font(bold=True)
+    names = list(grid.axes)
+
+    if grid.values.ndim != 2 or len(grid.axes[names[1]]) + 1 > MAX_COLUMNS:
+        if grid.values.size + 1 > MAX_ROWS:
+            raise ValueError(f"A grid of {grid.values.size:,} points does not fit on one sheet")
+        sheet.append([WriteOnlyCell(sheet, value=name) for name in names + [grid.output]])
+        for point in np.ndindex(grid.values.shape):
+            value = grid.values[point]
+            sheet.append([float(grid.axes[name][i]) for name, i in zip(names, point)]
+                         + [None if np.isnan(value) else float(value)])
+        return sheet
+
+    row_name, column_name = names
+    rows, columns = grid.axes[row_name], grid.axes[column_name]
+    live = dcf is not None and set(names) == {"wacc", "terminal_growth"}
+    corner = WriteOnlyCell(sheet, value=f"{grid.output}: {row_name} \\ {column_name}")
+    corner.font = bold
+    header = [corner]
+    for column in columns:
+        cell = WriteOnlyCell(sheet, value=float(column))
+        cell.font = bold
+        header.append(cell)
+    sheet.append(header)
+
+    # Body cells are plain values or formula strings; per-cell styles would double the write time
+    template = _grid_formula(dcf, grid.output) if live else None
+    letters = [get_column_letter(j + 2) for j in range(len(columns))]
+    for i, row in enumerate(rows):
+        label = WriteOnlyCell(sheet, value=float(row))
+        label.font = bold
+        if live:
+            # Row axis values are in column A, column axis values in row 1
+            cells = [
+                template.format(**{row_name: f"$A{i + 2}", column_name: f"{letter}$1"})
+                for letter in letters
+            ]
+        else:
+            cells = [None if np.isnan(value) else float(value) for value in grid.values[i]]
+        sheet.append([label] + cells)
+    return sheet
+
+def write_monte_carlo(workbook, result: MonteCarloResult, bins: int = 50, include_paths: bool = False,
+                      title: str = "Monte Carlo"):
+    """Summary statistics, percentiles, convergence and histogram of a simulation
+
+    With include_paths every path value is also written (up to Excel's row limit) to its own sheet.
+    """
+    _require_openpyxl()
+    sheet = workbook.create_sheet(title)
+    bold = Font(bold=True)
+
+    def heading(*labels):
+        cells = []
+        for label in labels:
+            cell = WriteOnlyCell(sheet, value=label)
+            cell.font = bold
+            cells.append(cell)
+        sheet.append(cells)
+
+    heading("Statistic", "Value")
+    for name in ("paths", "rejected", "mean", "std", "standard_error"):
+        sheet.append([name, float(getattr(result, name))])
+    for level, value in result.percentiles.items():
+        sheet.append([f"p{level:g}", float(value)])
+
+    sheet.append([])
+    if result.convergence:
+        heading("Chunk", *result.convergence[0])
+    for i, point in enumerate(result.convergence, start=1):
+        sheet.append([i] + [float(value) for value in point.values()])
+
+    sheet.append([])
+    heading("Bin low", "Bin high", "Paths", "Share")
+    if len(result.values):
+        counts, edges = np.histogram(result.values, bins=bins)
+        for low, high, count in zip(edges[:-1], edges[1:], counts):
+            sheet.append([float(low), float(high), int(count), float(count) / len(result.values)])
+
+    if include_paths:
+        paths = workbook.create_sheet(f"{title} paths")
+        paths.append(["enterprise_value"])
+        for value in result.values[:MAX_ROWS - 1]:
+            paths.append([float(value)])
+    return sheet
+
+def save(workbook, target: Union[str, BinaryIO]):
+    """Write a workbook to a path or binary file object"""
+    workbook.save(target)
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a sample DCF, sensitivity, three-statement and Monte Carlo workbook")
+    parser.add_argument("--output", type=str, default="models.xlsx", help="Workbook path")
+    parser.add_argument("--grid-steps", type=int, default=21, help="Points per sensitivity axis")
+    parser.add_argument("--paths", type=int, default=100000, help="Monte Carlo paths")
+    args = parser.parse_args()
+
+    from monte_carlo import simulate
+    from sensitivity import sensitivity_grid
+    from three_statement import ThreeStatementAssumptions
+
+    base = DCFAssumptions(
+        revenue=1000.0, revenue_growth=0.10, ebit_margin=0.20, capex_pct=0.05, nwc_pct=0.10,
+        tax_rate=0.25, wacc=0.09, terminal_growth=0.025, depreciation_pct=0.04, net_debt=200.0
+    )
+    workbook = new_workbook()
+    dcf = write_dcf(workbook, base)
+    write_sensitivity(workbook, sensitivity_grid(base, {
+        "wacc": np.linspace(0.07, 0.11, args.grid_steps),
+        "terminal_growth": np.linspace(0.015, 0.035, args.grid_steps)
+    }), dcf)
+    write_three_statement(workbook, ThreeStatementModel(ThreeStatementAssumptions(
+        base_revenue=1000.0, opening_ppe=200.0, opening_debt=300.0, debt_repayment=50.0,
+        opening_cash=50.0, dividend_payout=0.2
+    ), years=5))
+    write_monte_carlo(workbook, simulate(base, {
+        "revenue_growth": ("normal", 0.10, 0.03),
+        "ebit_margin": ("triangular", 0.14, 0.20, 0.24),
+        "wacc": ("uniform", 0.08, 0.10)
+    }, paths=args.paths, workers=1))
+    save(workbook, args.output)
+    print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Bounded executor for blocking LLM work.
+Limits concurrent upstream calls and the number of requests allowed to wait,
+so bursts are shed immediately instead of queueing until they time out.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from config import EXECUTOR_CONFIG
+
+class ExecutorSaturated(Exception):
+    """Raised when the executor has no free worker or queue slot"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("LLM executor is saturated")
+        self.retry_after = retry_after
+
+class BoundedExecutor:
+    """Thread pool with a fixed worker count and a maximum queue depth"""
+
+    def __init__(self, max_workers: int = None, max_queue_depth: int = None, retry_after: int = None):
+        self.max_workers = max_workers or EXECUTOR_CONFIG["max_workers"]
+        self.max_queue_depth = EXECUTOR_CONFIG["max_queue_depth"] if max_queue_depth is None else max_queue_depth
+        self.retry_after = retry_after or EXECUTOR_CONFIG["retry_after_seconds"]
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="llm")
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue_depth)
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._running = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of tasks currently running on a worker"""
+        return self._running
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of accepted tasks still waiting for a worker"""
+        return self._submitted - self._running
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of executor load"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue_depth": self.max_queue_depth,
+                "in_flight": self._running,
+                "queue_depth": self._submitted - self._running
+            }
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Submit work, raising ExecutorSaturated instead of queueing without limit"""
+        if not self._slots.acquire(blocking=False):
+            raise ExecutorSaturated(self.retry_after)
+
+        def run() -> Any:
+            with self._lock:
+                self._running += 1
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        with self._lock:
+            self._submitted += 1
+        try:
+            future = self._executor.submit(run)
+        except Exception:
+            self._release(None)
+            raise
+        # Release the slot when the task finishes or is cancelled before starting
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future: Any):
+        """Free the worker/queue slot held by a task"""
+        with self._lock:
+            self._submitted -= 1
+        self._slots.release()
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run blocking work on the executor and await its result"""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work and release the worker threads"""
+        self._executor.shutdown(wait=wait)
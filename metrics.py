@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Minimal Prometheus-compatible metrics registry.
+Counters, gauges and histograms are kept in process memory and rendered in
+the Prometheus text exposition format by the /metrics endpoint. Each web
+worker process exposes its own series.
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+def _escape(value: str) -> str:
+    """Escape a label value for the exposition format"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Render a {name="value",...} label set"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    """Render a sample value"""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric(ABC):
+    """Base class for a labelled metric family"""
+
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str, **kwargs: str):
+        """Get the child series for a set of label values"""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(v) for v in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = self._new_child()
+            return child
+
+    def _default(self):
+        """Child series for a metric without labels"""
+        return self.labels()
+
+    @abstractmethod
+    def _new_child(self):
+        """A new child series"""
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Sample lines of every child series"""
+
+    def render(self) -> str:
+        """Render HELP, TYPE and all samples"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+class _CounterChild:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+
+    metric_type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            children = list(self._children.items())
+        return [f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+                for key, child in children]
+
+class _GaugeChild:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]):
+        """Compute the value at scrape time instead of storing it"""
+        self.function = function
+
+    def get(self) -> float:
+        return self.function() if self.function else self.value
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    metric_type = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default().dec(amount)
+
+    def set_function(self, function: Callable[[], float]):
+        self._default().set_function(function)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            children = list(self._children.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.get())}"
+                for key, child in children]
+
+class _HistogramChild:
+    def __init__(self, buckets: Sequence[float]):
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            children = list(self._children.items())
+        lines = []
+        for key, child in children:
+            with child._lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class Registry:
+    """Collection of metric families rendered together"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render every registered metric in the text exposition format"""
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def provider_for(base_url: str) -> str:
+    """Provider label for an upstream base URL (its host name)"""
+    return urlparse(base_url).hostname or base_url
+
+# Upstream LLM calls
+UPSTREAM_LATENCY = REGISTRY.register(Histogram(
+    "llm_upstream_latency_seconds", "Latency of upstream LLM API calls", ["provider", "model"]))
+UPSTREAM_RESPONSES = REGISTRY.register(Counter(
+    "llm_upstream_responses", "Upstream LLM responses by HTTP status code", ["provider", "model", "status"]))
+UPSTREAM_RETRIES = REGISTRY.register(Counter(
+    "llm_upstream_retries", "Retried upstream LLM calls", ["provider", "model"]))
+UPSTREAM_TIMEOUTS = REGISTRY.register(Counter(
+    "llm_upstream_timeouts", "Upstream LLM calls that timed out", ["provider", "model"]))
+
+# Processing stages
+VALIDATION_DURATION = REGISTRY.register(Histogram(
+    "validation_duration_seconds", "Time spent validating a response", ["kind"]))
+REPORT_DURATION = REGISTRY.register(Histogram(
+    "report_generation_duration_seconds", "Time spent generating a report", ["kind"]))
+
+# Web tier
+REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "End-to-end HTTP request time", ["method", "path", "status"]))
+REQUEST_TIMEOUTS = REGISTRY.register(Counter(
+    "request_timeouts", "Requests that exceeded their analysis timeout", ["endpoint"]))
+EXECUTOR_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "llm_executor_queue_depth", "Accepted LLM tasks waiting for a worker"))
+EXECUTOR_IN_FLIGHT = REGISTRY.register(Gauge(
+    "llm_executor_in_flight", "LLM tasks currently running"))
+EXECUTOR_REJECTED = REGISTRY.register(Counter(
+    "llm_executor_rejected", "LLM tasks rejected because the executor was saturated"))
+
+# Caches
+CACHE_HITS = REGISTRY.register(Counter(
+    "cache_hits", "Cache hits by cache name", ["cache"]))
+CACHE_MISSES = REGISTRY.register(Counter(
+    "cache_misses", "Cache misses by cache name", ["cache"]))
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo valuation on top of the vectorized DCF engine.
+Samples assumption distributions in fixed-size chunks, so memory is bounded by
+the chunk size rather than the number of paths, and values each chunk in one
+batch. Chunks run on a process pool; each gets its own child of a single
+SeedSequence, so a simulation is reproducible for a given seed and chunk size
+regardless of how many workers run it.
+"""
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import MONTE_CARLO_CONFIG
+from dcf_engine import DCFAssumptions, DEFAULT_YEARS, value
+
+# Distribution name -> number of parameters
+#   normal (mean, std), lognormal (mean, sigma of the underlying normal),
+#   uniform (low, high), triangular (low, mode, high)
+DISTRIBUTIONS = {"normal": 2, "lognormal": 2, "uniform": 2, "triangular": 3}
+
+PERCENTILES = (1, 5, 10, 25, 50, 75, 90, 95, 99)
+
+Distribution = Tuple  # (name, *parameters)
+
+@dataclass
+class MonteCarloResult:
+    """Valuation distribution and diagnostics of a simulation"""
+    values: np.ndarray                  # enterprise value of every valid path
+    paths: int                          # paths sampled
+    rejected: int                       # paths dropped because WACC did not exceed terminal growth
+    mean: float
+    std: float
+    standard_error: float
+    percentiles: Dict[float, float]
+    convergence: List[Dict[str, float]]  # running estimate after each chunk
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "paths": self.paths,
+            "rejected": self.rejected,
+            "mean": self.mean,
+            "std": self.std,
+            "standard_error": self.standard_error,
+            "percentiles": {f"p{level:g}": v for level, v in self.percentiles.items()},
+            "convergence": self.convergence
+        }
+
+def _check(distributions: Dict[str, Distribution], base: DCFAssumptions):
+    for name, (kind, *parameters) in distributions.items():
+        if name not in vars(base):
+            raise ValueError(f"Unknown assumption: {name}")
+        if kind not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution {kind!r}; expected one of {', '.join(DISTRIBUTIONS)}")
+        if len(parameters) != DISTRIBUTIONS[kind]:
+            raise ValueError(f"{kind} distribution for {name} takes {DISTRIBUTIONS[kind]} parameters")
+
+def _sample(rng: np.random.Generator, distribution: Distribution, size: int) -> np.ndarray:
+    kind, *parameters = distribution
+    if kind == "normal":
+        return rng.normal(*parameters, size=size)
+    if kind == "lognormal":
+        return rng.lognormal(*parameters, size=size)
+    if kind == "uniform":
+        return rng.uniform(*parameters, size=size)
+    return rng.triangular(*parameters, size=size)
+
+def _simulate_chunk(args) -> np.ndarray:
+    """Sample and value one chunk of paths; returns the enterprise values of the valid paths"""
+    base, distributions, seed, size, years = args
+    rng = np.random.default_rng(seed)
+    samples = {name: _sample(rng, distribution, size) for name, distribution in distributions.items()}
+
+    # The Gordon terminal value needs WACC above terminal growth; other paths are rejected
+    valid = np.asarray(samples.get("wacc", base.wacc)) > np.asarray(samples.get("terminal_growth", base.terminal_growth))
+    valid = np.broadcast_to(valid, (size,))
+    if not valid.all():
+        samples = {name: column[valid] for name, column in samples.items()}
+    if not valid.any():
+        return np.empty(0)
+    return value(replace(base, **samples), years=years).enterprise_value
+
+def simulate(
+    base: DCFAssumptions,
+    distributions: Dict[str, Distribution],
+    paths: int = MONTE_CARLO_CONFIG["paths"],
+    chunk_size: int = MONTE_CARLO_CONFIG["chunk_size"],
+    seed: int = MONTE_CARLO_CONFIG["seed"],
+    workers: Optional[int] = None,
+    years: int = DEFAULT_YEARS
+) -> MonteCarloResult:
+    """Value `paths` draws of the assumption distributions around a base case
+
+    workers=1 runs in-process; otherwise chunks are spread over a process pool.
+    """
+    if paths < 1 or chunk_size < 1:
+        raise ValueError("paths and chunk_size must be at least 1")
+    _check(distributions, base)
+    sizes = [min(chunk_size, paths - start) for start in range(0, paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(base, distributions, child, size, years) for child, size in zip(seeds, sizes)]
+
+    if workers == 1:
+        collected = _collect(map(_simulate_chunk, tasks), paths)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            collected = _collect(pool.map(_simulate_chunk, tasks), paths)
+    return _result(*collected, paths=paths)
+
+def _collect(chunks, paths: int):
+    """Gather chunk values in seed order, tracking the running estimate after each chunk"""
+    values = np.empty(paths)
+    filled = 0
+    count, mean, m2 = 0, 0.0, 0.0
+    convergence = []
+    for chunk in chunks:
+        values[filled:filled + len(chunk)] = chunk
+        filled += len(chunk)
+        if len(chunk):
+            # Merge the chunk's moments into the running ones (Chan et al.)
+            chunk_mean = float(chunk.mean())
+            chunk_m2 = float(((chunk - chunk_mean) ** 2).sum())
+            total = count + len(chunk)
+            delta = chunk_mean - mean
+            mean += delta * len(chunk) / total
+            m2 += chunk_m2 + delta * delta * count * len(chunk) / total
+            count = total
+        standard_error = float(np.sqrt(m2 / (count - 1) / count)) if count > 1 else float("nan")
+        convergence.append({
+            "paths": count,
+            "mean": mean,
+            "standard_error": standard_error,
+            "relative_error": standard_error / abs(mean) if mean else float("nan")
+        })
+    return values[:filled], m2, convergence
+
+def _result(values: np.ndarray, m2: float, convergence: List[Dict[str, float]], paths: int) -> MonteCarloResult:
+    count = len(values)
+    percentiles = {}
+    if count:
+        percentiles = dict(zip(PERCENTILES, np.percentile(values, PERCENTILES).tolist()))
+    std = float(np.sqrt(m2 / (count - 1))) if count > 1 else float("nan")
+    return MonteCarloResult(
+        values=values,
+        paths=paths,
+        rejected=paths - count,
+        mean=float(values.mean()) if count else float("nan"),
+        std=std,
+        standard_error=std / np.sqrt(count) if count > 1 else float("nan"),
+        percentiles=percentiles,
+        convergence=convergence
+    )
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo DCF valuation of a sample company")
+    parser.add_argument("--paths", type=_positive_int, default=MONTE_CARLO_CONFIG["paths"], help="Number of paths")
+    parser.add_argument("--chunk-size", type=_positive_int, default=MONTE_CARLO_CONFIG["chunk_size"], help="Paths per chunk")
+    parser.add_argument("--seed", type=int, default=MONTE_CARLO_CONFIG["seed"], help="Root seed")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per core; 1 runs in-process)")
+    args = parser.parse_args()
+
+    base = DCFAssumptions(
+        revenue=1000.0, revenue_growth=0.10, ebit_margin=0.20, capex_pct=0.05, nwc_pct=0.10,
+        tax_rate=0.25, wacc=0.09, terminal_growth=0.025, depreciation_pct=0.04
+    )
+    distributions = {
+        "revenue_growth": ("normal", 0.10, 0.03),
+        "ebit_margin": ("triangular", 0.14, 0.20, 0.24),
+        "wacc": ("uniform", 0.08, 0.10),
+        "terminal_growth": ("uniform", 0.015, 0.03)
+    }
+
+    start = time.perf_counter()
+    result = simulate(base, distributions, args.paths, args.chunk_size, args.seed, args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"Simulated {result.paths:,} paths in {elapsed:.2f}s ({result.rejected:,} rejected)")
+    print(f"Mean enterprise value: {result.mean:,.0f} ± {result.standard_error:,.1f} (std {result.std:,.0f})")
+    for level, percentile in result.percentiles.items():
+        print(f"  p{level:<3g} {percentile:>12,.0f}")
+    final = result.convergence[-1]
+    print(f"Relative standard error after {final['paths']:,} paths: {final['relative_error']:.4%}")
+
+if __name__ == "__main__":
+    main()
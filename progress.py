@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Live progress events for running tests and sweeps.
+Agents publish lifecycle events from worker threads; the broker batches them
+and pushes each batch to connected WebSocket clients at a fixed interval so
+large sweeps do not flood the dashboard.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set
+
+from config import PROGRESS_CONFIG
+
+if TYPE_CHECKING:
+    from fastapi import WebSocket
+
+# Test lifecycle, in order
+LIFECYCLE_EVENTS = ["queued", "sent", "first_token", "completed", "validated", "failed"]
+
+class ProgressBroker:
+    """Collects progress events from any thread and broadcasts them in batches"""
+
+    def __init__(self, flush_interval: float = None, max_batch_size: int = None,
+                 max_pending: int = None, history_size: int = None):
+        self.flush_interval = flush_interval or PROGRESS_CONFIG["flush_interval_seconds"]
+        self.max_batch_size = max_batch_size or PROGRESS_CONFIG["max_batch_size"]
+        self._lock = threading.Lock()
+        self._pending = deque(maxlen=max_pending or PROGRESS_CONFIG["max_pending_events"])
+        self._history = deque(maxlen=history_size or PROGRESS_CONFIG["history_size"])
+        self._dropped = 0
+        self._clients: Set["WebSocket"] = set()
+        self._flusher: Optional[asyncio.Task] = None
+
+    def publish(self, event: str, **data: Any):
+        """Record an event; safe to call from worker threads"""
+        record = {"event": event, "time": time.time(), **data}
+        with self._lock:
+            if len(self._pending) == self._pending.maxlen:
+                self._dropped += 1
+            self._pending.append(record)
+            self._history.append(record)
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        """Take up to one batch of pending events"""
+        with self._lock:
+            count = min(len(self._pending), self.max_batch_size)
+            return [self._pending.popleft() for _ in range(count)]
+
+    async def connect(self, websocket: "WebSocket"):
+        """Accept a client and replay recent events so it starts with current state"""
+        await websocket.accept()
+        with self._lock:
+            history = list(self._history)
+            if not self._clients:
+                # Nobody was listening; the history replay already covers these
+                self._pending.clear()
+                self._dropped = 0
+        await websocket.send_json({"type": "batch", "events": history, "dropped": 0})
+        self._clients.add(websocket)
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    def disconnect(self, websocket: "WebSocket"):
+        """Forget a client"""
+        self._clients.discard(websocket)
+
+    async def _flush_loop(self):
+        """Broadcast pending events every flush interval while clients are connected"""
+        while self._clients:
+            await asyncio.sleep(self.flush_interval)
+            events = self._drain()
+            with self._lock:
+                dropped, self._dropped = self._dropped, 0
+            if not events and not dropped:
+                continue
+            message = {"type": "batch", "events": events, "dropped": dropped}
+            for websocket in list(self._clients):
+                try:
+                    await websocket.send_json(message)
+                except Exception:
+                    self.disconnect(websocket)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Streaming report writer shared by the TAM and DCF agents.
+Walks the results once: every summary statistic is accumulated while the
+per-test sections are written to a spool file, then the summary and the
+spooled sections are yielded in chunks (or written to an output file). Memory stays flat no matter how
+many results a report covers.
+"""
+
+import tempfile
+from array import array
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional, TextIO
+
+import numpy as np
+
+# Spooled sections stay in memory up to this size, then move to a temporary file
+SPOOL_MAX_SIZE = 1024 * 1024
+# Spooled sections are read back in chunks of this many characters
+CHUNK_SIZE = 64 * 1024
+
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90, 99)
+
+class ReportStats:
+    """Summary statistics accumulated in a single pass over test results"""
+
+    def __init__(self, counters: Dict[str, Callable[[Any], bool]] = None, keep_scores: bool = False):
+        self.count = 0
+        self.total = 0.0
+        self.minimum: Optional[float] = None
+        self.maximum: Optional[float] = None
+        self.counters = counters or {}
+        self.counts = {name: 0 for name in self.counters}
+        self.models: Dict[str, List[float]] = {}
+        # Compact doubles rather than a list of floats, only when percentiles are wanted
+        self.scores = array("d") if keep_scores else None
+
+    def add(self, result: Any):
+        score = result.quality_score
+        self.count += 1
+        self.total += score
+        self.minimum = score if self.minimum is None else min(self.minimum, score)
+        self.maximum = score if self.maximum is None else max(self.maximum, score)
+        for name, predicate in self.counters.items():
+            if predicate(result):
+                self.counts[name] += 1
+        model = self.models.setdefault(getattr(result, "model", "") or "unknown", [0, 0.0])
+        model[0] += 1
+        model[1] += score
+        if self.scores is not None:
+            self.scores.append(score)
+
+    @property
+    def average(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentiles(self, levels: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[float, float]:
+        """Quality score percentiles (requires keep_scores)"""
+        if not self.scores:
+            return {}
+        values = np.percentile(np.frombuffer(self.scores, dtype=np.float64), list(levels))
+        return dict(zip(levels, values.tolist()))
+
+def iter_report(
+    results: Iterable[Any],
+    summary: Callable[[ReportStats], str],
+    section: Callable[[int, Any], str],
+    counters: Dict[str, Callable[[Any], bool]] = None,
+    empty: str = "No test results available",
+    footer: Callable[[], str] = None,
+    percentiles: bool = False,
+    by_model: bool = False
+) -> Generator[str, None, ReportStats]:
+    """Report text in chunks, in one pass over the results; returns its statistics"""
+    stats = ReportStats(counters, keep_scores=percentiles)
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode="w+", encoding="utf-8") as spool:
+        for i, result in enumerate(results, 1):
+            stats.add(result)
+            spool.write(section(i, result))
+
+        if not stats.count:
+            yield empty
+            return stats
+
+        yield summary(stats)
+        if percentiles:
+            yield "\n## Score Percentiles\n" + "".join(
+                f"- p{level:g}: {value:.2f}\n" for level, value in stats.percentiles().items()
+            )
+        if by_model:
+            yield "\n## By Model\n| Model | Tests | Average |\n|---|---|---|\n" + "".join(
+                f"| {model} | {count} | {total / count:.2f} |\n" for model, (count, total) in sorted(stats.models.items())
+            )
+
+        yield "\n## Detailed Results\n"
+        spool.seek(0)
+        while True:
+            chunk = spool.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+    if footer is not None:
+        yield footer()
+    return stats
+
+def write_chunks(chunks: Generator[str, None, Any], out: TextIO) -> Any:
+    """Write every chunk of a report generator to a text file and return the generator's result"""
+    while True:
+        try:
+            out.write(next(chunks))
+        except StopIteration as done:
+            return done.value
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Content addressing and compression for archived response texts.
+Responses are keyed by the hash of their text, so identical texts are stored
+once, and compressed with zstd when the zstandard package is installed or
+zlib otherwise. The codec is stored with every blob, so archives written with
+either codec stay readable.
+"""
+
+import hashlib
+import zlib
+from typing import Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ZLIB_LEVEL = 9
+ZSTD_LEVEL = 10
+
+def content_hash(text: str) -> str:
+    """Address of a response text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def compress(text: str) -> Tuple[str, bytes]:
+    """Compress a response text, returning the codec used and the compressed bytes"""
+    data = text.encode("utf-8")
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return "zlib", zlib.compress(data, ZLIB_LEVEL)
+
+def decompress(codec: str, data: bytes) -> str:
+    """Restore a response text compressed by compress()"""
+    if codec == "zlib":
+        return zlib.decompress(data).decode("utf-8")
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Response was archived with zstd; install the zstandard package to read it")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    raise ValueError(f"Unknown response codec: {codec}")
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Packed, memory-mapped corpus of response texts for large-scale re-validation.
+A corpus is one data file of concatenated UTF-8 responses plus an offset index
+(<corpus>.idx.npz). Opening it maps the data file read-only, so responses are
+memoryview slices of the mapping and every worker process reading the same
+corpus shares the same page-cache pages instead of holding its own copies.
+count_matches scans the slices without copying; full re-validation still decodes
+each response into a str, one at a time, because the validators rely on str
+semantics (Unicode \d and case folding, non-ASCII patterns such as "±",
+lengths in characters) that bytes patterns would not reproduce.
+"""
+
+import argparse
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from result_store import ResultStore
+
+INDEX_SUFFIX = ".idx.npz"
+
+def build_corpus(store: ResultStore, path: str, kind: str = None) -> int:
+    """Pack stored responses into a corpus, streaming them one batch at a time"""
+    test_ids, kinds, offsets, lengths = [], [], [], []
+    offset = 0
+    with open(path, "wb") as f:
+        for test_id, result_kind, text in store.iter_responses(kind):
+            data = text.encode("utf-8")
+            f.write(data)
+            test_ids.append(test_id)
+            kinds.append(result_kind)
+            offsets.append(offset)
+            lengths.append(len(data))
+            offset += len(data)
+    np.savez(
+        path + INDEX_SUFFIX,
+        test_ids=np.array(test_ids, dtype=str),
+        kinds=np.array(kinds, dtype=str),
+        offsets=np.array(offsets, dtype=np.int64),
+        lengths=np.array(lengths, dtype=np.int64)
+    )
+    return len(test_ids)
+
+class ResponseCorpus:
+    """Read-only, memory-mapped view of a packed corpus"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with np.load(path + INDEX_SUFFIX) as index:
+            self.test_ids = index["test_ids"]
+            self.kinds = index["kinds"]
+            self.offsets = index["offsets"]
+            self.lengths = index["lengths"]
+        self._positions: Optional[Dict[str, int]] = None
+        self._file = open(path, "rb")
+        # mmap cannot map an empty file
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(path) else None
+        self._view = memoryview(self._mmap) if self._mmap is not None else memoryview(b"")
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def view(self, i: int) -> memoryview:
+        """Zero-copy bytes of the i-th response"""
+        start = int(self.offsets[i])
+        return self._view[start:start + int(self.lengths[i])]
+
+    def text(self, i: int) -> str:
+        """Decode the i-th response straight from the mapping"""
+        return str(self.view(i), "utf-8")
+
+    def position(self, test_id: str) -> Optional[int]:
+        """Index of a test's response in the corpus"""
+        if self._positions is None:
+            self._positions = {str(test_id): i for i, test_id in enumerate(self.test_ids)}
+        return self._positions.get(test_id)
+
+    def count_matches(self, pattern: str, flags: int = re.IGNORECASE) -> np.ndarray:
+        """Matches of a pattern in every response, scanning the mapping without copies"""
+        compiled = re.compile(pattern.encode("utf-8"), flags)
+        counts = np.zeros(len(self), dtype=np.int32)
+        for i in range(len(self)):
+            counts[i] = sum(1 for _ in compiled.finditer(self.view(i)))
+        return counts
+
+    def close(self):
+        self._view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+# Per-process state of re-validation workers
+_worker: Dict[str, object] = {}
+
+def _init_worker(path: str, kind: str):
+    """Open the corpus once per worker process; the pages are shared between processes"""
+    from tam_qwen_agent import TAMPromptValidator
+    from dcf_agent import DCFPromptValidator
+
+    _worker["corpus"] = ResponseCorpus(path)
+    _worker["validator"] = TAMPromptValidator() if kind == "tam" else DCFPromptValidator()
+
+def _validate_positions(positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Re-validate the responses at the given positions, one decoded text alive at a time
+
+    The validators work on str, so each response is decoded here (a copy); only the
+    reads from the mapping are shared between workers.
+    """
+    corpus = _worker["corpus"]
+    validator = _worker["validator"]
+    scores = np.empty(len(positions))
+    missing = np.empty(len(positions), dtype=np.int32)
+    for j, i in enumerate(positions):
+        validation = validator.validate_response(corpus.text(int(i)))
+        scores[j] = validation["overall_score"]
+        missing[j] = len(validation["missing_requirements"])
+    return scores, missing
+
+def revalidate(path: str, kind: str, workers: int = None, chunk_size: int = 500) -> Dict[str, np.ndarray]:
+    """Re-score every response of a kind in a corpus with the current validator"""
+    corpus = ResponseCorpus(path)
+    try:
+        selected = np.flatnonzero(corpus.kinds == kind)
+        test_ids = corpus.test_ids[selected]
+    finally:
+        corpus.close()
+
+    scores = np.full(len(selected), np.nan)
+    missing = np.zeros(len(selected), dtype=np.int32)
+    if len(selected):
+        # Workers receive only positions; the texts come from their own mapping of the corpus
+        chunks = [selected[i:i + chunk_size] for i in range(0, len(selected), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(path, kind)) as pool:
+            start = 0
+            for chunk_scores, chunk_missing in pool.map(_validate_positions, chunks):
+                scores[start:start + len(chunk_scores)] = chunk_scores
+                missing[start:start + len(chunk_missing)] = chunk_missing
+                start += len(chunk_scores)
+
+    return {"test_ids": test_ids, "quality_score": scores, "missing_requirements": missing}
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and re-validate a memory-mapped response corpus")
+    parser.add_argument("command", choices=["build", "revalidate"])
+    parser.add_argument("--corpus", type=str, default="responses.corpus", help="Corpus data file")
+    parser.add_argument("--db", type=str, help="Result store database (default from STORE_CONFIG)")
+    parser.add_argument("--kind", choices=["tam", "dcf"], default="tam", help="Kind of results")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per core)")
+    parser.add_argument("--output", type=str, help="Write re-validated scores to this .npz file")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        count = build_corpus(ResultStore(args.db), args.corpus)
+        print(f"Packed {count} responses into {args.corpus} ({os.path.getsize(args.corpus)} bytes)")
+        return
+
+    result = revalidate(args.corpus, args.kind, args.workers)
+    scores = result["quality_score"]
+    print(f"Re-validated {len(scores)} {args.kind.upper()} responses")
+    if len(scores):
+        print(f"Average quality score: {np.nanmean(scores):.2f}")
+    if args.output:
+        np.savez_compressed(args.output, **result)
+        print(f"Scores written to {args.output}")
+
+if __name__ == "__main__":
+    main()
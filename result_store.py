@@ -0,0 +1,643 @@
+#!/usr/bin/env python3
+"""
+SQLite-backed result store shared by every web worker process, the CLI and
+the report generators.
+Uses WAL mode so multiple uvicorn workers can read while one writes. Besides
+the full results, scores, missing requirements and extracted metrics are kept
+in their own indexed tables so history can be queried across runs. Response
+texts live in a deduplicated, compressed archive table keyed by content hash.
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import aggregates
+from config import STORE_CONFIG
+from response_archive import compress, content_hash, decompress
+
+# Name of the metrics field for each kind of test result
+METRICS_KEYS = {
+    "tam": "market_metrics",
+    "dcf": "financial_metrics"
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS test_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    test_id TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    model TEXT,
+    company_context TEXT,
+    quality_score REAL,
+    prompt_used TEXT,
+    response TEXT,
+    validation_scores TEXT,
+    missing_requirements TEXT,
+    recommendations TEXT,
+    metrics TEXT,
+    run_id TEXT,
+    prompt_version TEXT,
+    response_hash TEXT,
+    response_length INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_test_results_kind ON test_results (kind, id);
+
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    model TEXT,
+    prompt_version TEXT,
+    source TEXT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    test_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON runs (kind, started_at);
+
+CREATE TABLE IF NOT EXISTS test_scores (
+    test_id TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    score REAL,
+    PRIMARY KEY (test_id, metric)
+);
+CREATE INDEX IF NOT EXISTS idx_test_scores_metric ON test_scores (metric);
+
+CREATE TABLE IF NOT EXISTS test_elements (
+    test_id TEXT NOT NULL,
+    element TEXT NOT NULL,
+    match_count INTEGER NOT NULL,
+    PRIMARY KEY (test_id, element)
+);
+
+CREATE TABLE IF NOT EXISTS test_missing_requirements (
+    test_id TEXT NOT NULL,
+    requirement TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_missing_requirements_test ON test_missing_requirements (test_id);
+CREATE INDEX IF NOT EXISTS idx_missing_requirements_requirement ON test_missing_requirements (requirement);
+
+CREATE TABLE IF NOT EXISTS responses (
+    hash TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS test_metrics (
+    test_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    match_count INTEGER NOT NULL,
+    matches TEXT,
+    PRIMARY KEY (test_id, name)
+);
+"""
+
+# Columns added since the first release of the store, with their types
+ADDED_COLUMNS = {
+    "run_id": "TEXT",
+    "prompt_version": "TEXT",
+    "response_hash": "TEXT",
+    "response_length": "INTEGER",
+    "numeric_accuracy": "REAL"
+}
+
+# Created after migrating older databases, which lack the added columns
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_test_results_model ON test_results (model, timestamp);
+CREATE INDEX IF NOT EXISTS idx_test_results_company ON test_results (company_context);
+CREATE INDEX IF NOT EXISTS idx_test_results_prompt_version ON test_results (prompt_version);
+CREATE INDEX IF NOT EXISTS idx_test_results_timestamp ON test_results (timestamp);
+CREATE INDEX IF NOT EXISTS idx_test_results_run ON test_results (run_id);
+CREATE INDEX IF NOT EXISTS idx_test_results_response_hash ON test_results (response_hash);
+"""
+
+# Rows stored before the archive keep their text inline in test_results.response
+RESPONSE_LENGTH = "COALESCE(r.response_length, length(r.response))"
+
+# Per-test child tables, replaced whenever a result is saved again
+NORMALIZED_TABLES = ("test_scores", "test_elements", "test_missing_requirements", "test_metrics")
+
+# Columns a history query may group by
+GROUP_COLUMNS = ("model", "prompt_version", "company_context", "run_id", "kind")
+
+def prompt_version(prompt: str) -> str:
+    """Short content hash identifying a prompt template"""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12] if prompt else ""
+
+class ResultStore:
+    """Persists TAM and DCF test results in a shared SQLite database"""
+
+    def __init__(self, path: str = None, busy_timeout_ms: int = None):
+        self.path = path or STORE_CONFIG["path"]
+        self.busy_timeout_ms = busy_timeout_ms or STORE_CONFIG["busy_timeout_ms"]
+        self._local = threading.local()
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        """Create tables and indexes if they do not exist yet"""
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(test_results)")}
+        for column, column_type in ADDED_COLUMNS.items():
+            if column not in columns:
+                conn.execute(f"ALTER TABLE test_results ADD COLUMN {column} {column_type}")
+        conn.executescript(INDEXES)
+        conn.executescript(aggregates.SCHEMA)
+        self._backfill_aggregates()
+
+    def _backfill_aggregates(self):
+        """Build the running aggregates once for history stored before they existed"""
+        conn = self._connect()
+        if conn.execute("SELECT 1 FROM aggregate_scores LIMIT 1").fetchone():
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another worker may have built them while this one waited for the lock
+            has_results = conn.execute("SELECT 1 FROM test_results LIMIT 1").fetchone()
+            if has_results and not conn.execute("SELECT 1 FROM aggregate_scores LIMIT 1").fetchone():
+                aggregates.rebuild(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def start_run(self, kind: str, model: str = "", prompt_version: str = "", source: str = "") -> str:
+        """Register a run (a batch of tests) and return its ID"""
+        run_id = f"run_{int(time.time())}_{uuid.uuid4().hex[:8]}"
+        self._connect().execute(
+            "INSERT INTO runs (run_id, kind, model, prompt_version, source, started_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (run_id, kind, model, prompt_version, source, datetime.now().isoformat())
+        )
+        return run_id
+
+    def finish_run(self, run_id: str):
+        """Mark a run as finished and record how many tests it stored"""
+        self._connect().execute(
+            """
+            UPDATE runs SET finished_at = ?,
+                test_count = (SELECT COUNT(*) FROM test_results WHERE run_id = ?)
+            WHERE run_id = ?
+            """,
+            (datetime.now().isoformat(), run_id, run_id)
+        )
+
+    def save_result(self, kind: str, result: Any, run_id: str = None):
+        """Insert a test result; safe to call concurrently from several processes"""
+        self.save_results(kind, [result], run_id)
+
+    def save_results(self, kind: str, results: Iterable[Any], run_id: str = None):
+        """Insert a batch of test results in a single transaction
+
+        A result saved again is updated in place: it keeps its row ID (and so its place in
+        /history and export pages) and its original run unless a new one is given.
+        """
+        results = list(results)
+        if not results:
+            return
+        test_ids = [(result.test_id,) for result in results]
+        hashes = [content_hash(result.response) for result in results]
+        # Compress outside the write lock, once per distinct text
+        blobs = {}
+        for response_hash, result in zip(hashes, results):
+            if response_hash not in blobs:
+                blobs[response_hash] = (len(result.response), *compress(result.response))
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Results saved again (e.g. after resuming a sweep) are already in the aggregates:
+            # take their stored score out first, so only the change is applied
+            for test_id, in test_ids:
+                row = conn.execute(
+                    "SELECT kind, COALESCE(model, ''), quality_score FROM test_results "
+                    "WHERE test_id = ? AND quality_score IS NOT NULL",
+                    (test_id,)
+                ).fetchone()
+                if row:
+                    elements = dict(conn.execute(
+                        "SELECT element, match_count FROM test_elements WHERE test_id = ?", (test_id,)
+                    ).fetchall())
+                    aggregates.remove(conn, row[0], [(row[1], row[2], elements)])
+            aggregates.update(conn, kind, [
+                (result.model or "", result.quality_score, result.elements_found)
+                for result in results
+            ])
+            conn.executemany(
+                "INSERT OR IGNORE INTO responses (hash, codec, size, data) VALUES (?, ?, ?, ?)",
+                [(response_hash, codec, size, data) for response_hash, (size, codec, data) in blobs.items()]
+            )
+            conn.executemany(
+                """
+                INSERT INTO test_results (
+                    test_id, kind, timestamp, model, company_context, quality_score, prompt_used,
+                    response, validation_scores, missing_requirements, recommendations, metrics,
+                    run_id, prompt_version, response_hash, response_length, numeric_accuracy
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(test_id) DO UPDATE SET
+                    kind = excluded.kind, timestamp = excluded.timestamp, model = excluded.model,
+                    company_context = excluded.company_context, quality_score = excluded.quality_score,
+                    prompt_used = excluded.prompt_used, response = NULL,
+                    validation_scores = excluded.validation_scores,
+                    missing_requirements = excluded.missing_requirements,
+                    recommendations = excluded.recommendations, metrics = excluded.metrics,
+                    run_id = COALESCE(excluded.run_id, test_results.run_id),
+                    prompt_version = excluded.prompt_version, response_hash = excluded.response_hash,
+                    response_length = excluded.response_length, numeric_accuracy = excluded.numeric_accuracy
+                """,
+                [
+                    (
+                        result.test_id,
+                        kind,
+                        result.timestamp.isoformat(),
+                        result.model,
+                        result.company_context,
+                        result.quality_score,
+                        result.prompt_used,
+                        json.dumps(result.validation_scores),
+                        json.dumps(result.missing_requirements),
+                        json.dumps(result.recommendations),
+                        json.dumps(getattr(result, METRICS_KEYS[kind])),
+                        run_id,
+                        result.prompt_version,
+                        response_hash,
+                        len(result.response),
+                        getattr(result, "numeric_accuracy", None)
+                    )
+                    for response_hash, result in zip(hashes, results)
+                ]
+            )
+            # Replace the normalized rows too, so re-saving a result stays consistent
+            for table in NORMALIZED_TABLES:
+                conn.executemany(f"DELETE FROM {table} WHERE test_id = ?", test_ids)
+            conn.executemany(
+                "INSERT INTO test_scores (test_id, metric, score) VALUES (?, ?, ?)",
+                [
+                    (result.test_id, metric, float(score))
+                    for result in results
+                    for metric, score in result.validation_scores.items()
+                ]
+            )
+            conn.executemany(
+                "INSERT INTO test_elements (test_id, element, match_count) VALUES (?, ?, ?)",
+                [
+                    (result.test_id, element, count)
+                    for result in results
+                    for element, count in result.elements_found.items()
+                ]
+            )
+            conn.executemany(
+                "INSERT INTO test_missing_requirements (test_id, requirement) VALUES (?, ?)",
+                [
+                    (result.test_id, requirement)
+                    for result in results
+                    for requirement in result.missing_requirements
+                ]
+            )
+            conn.executemany(
+                "INSERT INTO test_metrics (test_id, name, match_count, matches) VALUES (?, ?, ?, ?)",
+                [
+                    (result.test_id, name, len(matches), json.dumps(matches))
+                    for result in results
+                    for name, matches in getattr(result, METRICS_KEYS[kind]).items()
+                ]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _row_to_record(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a summary row into an export record"""
+        return {
+            "test_id": row["test_id"],
+            "timestamp": row["timestamp"],
+            "model": row["model"],
+            "quality_score": row["quality_score"],
+            "validation_scores": json.loads(row["validation_scores"]),
+            "missing_requirements": json.loads(row["missing_requirements"]),
+            "recommendations": json.loads(row["recommendations"]),
+            METRICS_KEYS[row["kind"]]: json.loads(row["metrics"]),
+            "response_length": row["response_length"],
+            "numeric_accuracy": row["numeric_accuracy"]
+        }
+
+    def get_result(self, test_id: str) -> Optional[Dict[str, Any]]:
+        """Get a full test result (including prompt and response) by test ID"""
+        row = self._connect().execute(
+            f"""
+            SELECT r.test_id, r.kind, r.timestamp, r.model, r.quality_score, r.prompt_used,
+                r.validation_scores, r.missing_requirements, r.recommendations, r.metrics,
+                r.numeric_accuracy, {RESPONSE_LENGTH} AS response_length
+            FROM test_results r WHERE r.test_id = ?
+            """,
+            (test_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        record = self._row_to_record(row)
+        record["kind"] = row["kind"]
+        record["prompt_used"] = row["prompt_used"]
+        record["response"] = self.get_response(test_id)
+        return record
+
+    def get_response(self, test_id: str) -> Optional[str]:
+        """Get only the response text of a test, decompressed from the archive"""
+        row = self._connect().execute(
+            """
+            SELECT r.response, a.codec, a.data
+            FROM test_results r LEFT JOIN responses a ON a.hash = r.response_hash
+            WHERE r.test_id = ?
+            """,
+            (test_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row["data"] is None:
+            return row["response"]
+        return decompress(row["codec"], row["data"])
+
+    def iter_responses(self, kind: str = None, batch_size: int = 200) -> Iterator[Tuple[str, str, str]]:
+        """Iterate (test_id, kind, response) in storage order, one batch of texts at a time"""
+        where, params = ("AND r.kind = ?", [kind]) if kind else ("", [])
+        after = 0
+        while True:
+            rows = self._connect().execute(
+                f"""
+                SELECT r.id, r.test_id, r.kind, r.response, a.codec, a.data
+                FROM test_results r LEFT JOIN responses a ON a.hash = r.response_hash
+                WHERE r.id > ? {where} ORDER BY r.id LIMIT ?
+                """,
+                [after] + params + [batch_size]
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                text = row["response"] if row["data"] is None else decompress(row["codec"], row["data"])
+                yield row["test_id"], row["kind"], text or ""
+            after = rows[-1]["id"]
+
+    def archive_responses(self, batch_size: int = 200) -> int:
+        """Move response texts stored inline by older versions into the archive"""
+        conn = self._connect()
+        moved = 0
+        while True:
+            rows = conn.execute(
+                "SELECT test_id, response FROM test_results WHERE response IS NOT NULL LIMIT ?",
+                (batch_size,)
+            ).fetchall()
+            if not rows:
+                return moved
+            blobs = {}
+            updates = []
+            for row in rows:
+                response_hash = content_hash(row["response"])
+                if response_hash not in blobs:
+                    blobs[response_hash] = (len(row["response"]), *compress(row["response"]))
+                updates.append((response_hash, len(row["response"]), row["test_id"]))
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO responses (hash, codec, size, data) VALUES (?, ?, ?, ?)",
+                    [(response_hash, codec, size, data) for response_hash, (size, codec, data) in blobs.items()]
+                )
+                conn.executemany(
+                    "UPDATE test_results SET response = NULL, response_hash = ?, response_length = ? WHERE test_id = ?",
+                    updates
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            moved += len(rows)
+
+    def archive_stats(self) -> Dict[str, int]:
+        """Stored responses, distinct texts and their raw and compressed sizes in bytes"""
+        conn = self._connect()
+        tests = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(response_length), 0) FROM test_results WHERE response_hash IS NOT NULL"
+        ).fetchone()
+        archive = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(length(data)), 0) FROM responses"
+        ).fetchone()
+        return {
+            "responses": tests[0],
+            "distinct_responses": archive[0],
+            "response_chars": tests[1],
+            "distinct_chars": archive[1],
+            "archived_bytes": archive[2]
+        }
+
+    def count(self, kind: str) -> int:
+        """Number of stored results of a kind"""
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM test_results WHERE kind = ?", (kind,)
+        ).fetchone()[0]
+
+    def last_position(self, kind: str) -> int:
+        """Row ID of the most recent result of a kind (0 if there are none)"""
+        row = self._connect().execute(
+            "SELECT MAX(id) FROM test_results WHERE kind = ?", (kind,)
+        ).fetchone()
+        return row[0] or 0
+
+    def page_end(self, kind: str, after: int, limit: int) -> Optional[int]:
+        """Row ID of the last result in a page of `limit` results after `after`"""
+        row = self._connect().execute(
+            "SELECT id FROM test_results WHERE kind = ? AND id > ? ORDER BY id LIMIT 1 OFFSET ?",
+            (kind, after, limit - 1)
+        ).fetchone()
+        return row[0] if row else None
+
+    def iter_results(self, kind: str, after: int = 0, until: Optional[int] = None,
+                     batch_size: int = 200) -> Iterator[Dict[str, Any]]:
+        """Iterate export records with after < id <= until, fetching in small batches"""
+        columns = (
+            "r.id, r.test_id, r.kind, r.timestamp, r.model, r.quality_score, r.validation_scores, "
+            "r.missing_requirements, r.recommendations, r.metrics, r.numeric_accuracy, "
+            f"{RESPONSE_LENGTH} AS response_length"
+        )
+        if until is None:
+            until = self.last_position(kind)
+        while after < until:
+            rows = self._connect().execute(
+                f"SELECT {columns} FROM test_results r WHERE r.kind = ? AND r.id > ? AND r.id <= ? ORDER BY r.id LIMIT ?",
+                (kind, after, until, batch_size)
+            ).fetchall()
+            if not rows:
+                break
+            for row in rows:
+                yield self._row_to_record(row)
+            after = rows[-1]["id"]
+
+    def _filters(self, kind: str = None, model: str = None, company: str = None,
+                 prompt_version: str = None, run_id: str = None, since: str = None,
+                 until: str = None) -> Tuple[str, List[Any]]:
+        """WHERE clause (on test_results aliased as r) for the common history filters"""
+        clauses, params = [], []
+        for column, value in (("kind", kind), ("model", model), ("company_context", company),
+                              ("prompt_version", prompt_version), ("run_id", run_id)):
+            if value is not None:
+                clauses.append(f"r.{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("r.timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("r.timestamp < ?")
+            params.append(until)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query_results(self, limit: int = None, **filters: Any) -> List[Dict[str, Any]]:
+        """Stored results matching the filters, most recent first (without response texts)"""
+        where, params = self._filters(**filters)
+        rows = self._connect().execute(
+            f"""
+            SELECT r.id, r.test_id, r.kind, r.timestamp, r.model, r.company_context, r.quality_score,
+                r.validation_scores, r.missing_requirements, r.recommendations, r.metrics,
+                r.run_id, r.prompt_version, r.numeric_accuracy, {RESPONSE_LENGTH} AS response_length
+            FROM test_results r {where}
+            ORDER BY r.timestamp DESC, r.id DESC
+            LIMIT ?
+            """,
+            params + [limit if limit is not None else -1]
+        ).fetchall()
+        records = []
+        for row in rows:
+            record = self._row_to_record(row)
+            record["kind"] = row["kind"]
+            record["company_context"] = row["company_context"]
+            record["run_id"] = row["run_id"]
+            record["prompt_version"] = row["prompt_version"]
+            records.append(record)
+        return records
+
+    def score_summary(self, group_by: str = "model", **filters: Any) -> List[Dict[str, Any]]:
+        """Test count and quality score statistics per model, prompt version, company, run or kind"""
+        if group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Cannot group by {group_by!r}; expected one of {', '.join(GROUP_COLUMNS)}")
+        where, params = self._filters(**filters)
+        rows = self._connect().execute(
+            f"""
+            SELECT r.{group_by} AS grp, COUNT(*) AS tests, AVG(r.quality_score) AS avg_score,
+                MIN(r.quality_score) AS min_score, MAX(r.quality_score) AS max_score,
+                MIN(r.timestamp) AS first_test, MAX(r.timestamp) AS last_test
+            FROM test_results r {where}
+            GROUP BY r.{group_by}
+            ORDER BY avg_score DESC
+            """,
+            params
+        ).fetchall()
+        return [
+            {
+                group_by: row["grp"],
+                "tests": row["tests"],
+                "avg_quality_score": row["avg_score"],
+                "min_quality_score": row["min_score"],
+                "max_quality_score": row["max_score"],
+                "first_test": row["first_test"],
+                "last_test": row["last_test"]
+            }
+            for row in rows
+        ]
+
+    def metric_averages(self, group_by: str = "model", **filters: Any) -> Dict[str, Dict[str, float]]:
+        """Mean of every validation score, per group"""
+        if group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Cannot group by {group_by!r}; expected one of {', '.join(GROUP_COLUMNS)}")
+        where, params = self._filters(**filters)
+        rows = self._connect().execute(
+            f"""
+            SELECT r.{group_by} AS grp, s.metric, AVG(s.score) AS avg_score
+            FROM test_scores s JOIN test_results r ON r.test_id = s.test_id {where}
+            GROUP BY r.{group_by}, s.metric
+            """,
+            params
+        ).fetchall()
+        averages: Dict[str, Dict[str, float]] = {}
+        for row in rows:
+            averages.setdefault(row["grp"], {})[row["metric"]] = row["avg_score"]
+        return averages
+
+    def missing_requirement_counts(self, **filters: Any) -> List[Dict[str, Any]]:
+        """How often each requirement was missing, most frequent first"""
+        where, params = self._filters(**filters)
+        rows = self._connect().execute(
+            f"""
+            SELECT m.requirement, COUNT(*) AS occurrences
+            FROM test_missing_requirements m JOIN test_results r ON r.test_id = m.test_id {where}
+            GROUP BY m.requirement
+            ORDER BY occurrences DESC
+            """,
+            params
+        ).fetchall()
+        return [{"requirement": row["requirement"], "occurrences": row["occurrences"]} for row in rows]
+
+    def summary_rows(self, kind: str) -> Iterator[sqlite3.Row]:
+        """Scalar columns of every result of a kind, oldest first"""
+        yield from self._connect().execute(
+            """
+            SELECT test_id, timestamp, model, company_context, prompt_version, run_id, quality_score,
+                numeric_accuracy
+            FROM test_results WHERE kind = ? ORDER BY id
+            """,
+            (kind,)
+        )
+
+    def normalized_rows(self, kind: str, table: str) -> Iterator[sqlite3.Row]:
+        """All rows of a per-test child table for results of a kind (long format)"""
+        if table not in NORMALIZED_TABLES:
+            raise ValueError(f"Unknown table: {table}")
+        yield from self._connect().execute(
+            f"SELECT t.* FROM {table} t JOIN test_results r ON r.test_id = t.test_id WHERE r.kind = ?",
+            (kind,)
+        )
+
+    def stats(self, kind: str) -> Dict[str, Any]:
+        """Running aggregate statistics of a kind, read without scanning the history"""
+        return aggregates.read(self._connect(), kind)
+
+    def list_runs(self, kind: str = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent runs"""
+        where, params = ("WHERE kind = ?", [kind]) if kind else ("", [])
+        rows = self._connect().execute(
+            f"SELECT * FROM runs {where} ORDER BY started_at DESC LIMIT ?", params + [limit]
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the shared result store")
+    parser.add_argument("--db", type=str, help="Database path (default from STORE_CONFIG)")
+    parser.add_argument("--archive-responses", action="store_true",
+                        help="Move inline response texts from older versions into the compressed archive")
+    args = parser.parse_args()
+
+    store = ResultStore(args.db)
+    if args.archive_responses:
+        print(f"Archived {store.archive_responses()} responses")
+
+    stats = store.archive_stats()
+    ratio = stats["archived_bytes"] / stats["response_chars"] if stats["response_chars"] else 0
+    print(f"{stats['responses']} archived responses, {stats['distinct_responses']} distinct")
+    print(f"{stats['response_chars']} characters stored in {stats['archived_bytes']} bytes ({ratio:.1%})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Append-only JSONL journal of completed tests.
+Every result is written and fsync'd as soon as its test finishes, so a sweep
+that dies halfway loses at most the test that was running. Sweeps can resume
+by skipping (kind, company, model, prompt version) tuples already journaled;
+the last journaled result of a tuple is the one that counts.
+"""
+
+import dataclasses
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Type
+
+from config import JOURNAL_CONFIG
+
+class RunJournal:
+    """Durable, append-only record of completed tests"""
+
+    def __init__(self, path: str = None):
+        self.path = path or JOURNAL_CONFIG["path"]
+        self._lock = threading.Lock()
+        self._file = None
+
+    def _open(self):
+        """Open for appending, terminating a line left incomplete by a crash"""
+        if self._file is None:
+            self._file = open(self.path, "a+b")
+            if self._file.tell() > 0:
+                self._file.seek(-1, os.SEEK_END)
+                if self._file.read(1) != b"\n":
+                    self._file.write(b"\n")
+        return self._file
+
+    def append(self, kind: str, result: Any):
+        """Write a completed test result and make sure it reached the disk"""
+        record = dataclasses.asdict(result)
+        record["timestamp"] = result.timestamp.isoformat()
+        record["kind"] = kind
+        line = json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+        with self._lock:
+            f = self._open()
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """Journaled records, skipping a truncated or corrupt line"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def results(self, kind: str, result_class: Type) -> List[Any]:
+        """Rebuild journaled results of a kind as result dataclasses (last entry per test wins)"""
+        fields = {field.name for field in dataclasses.fields(result_class)}
+        results: Dict[str, Any] = {}
+        for record in self.records():
+            if record.get("kind") != kind:
+                continue
+            values = {name: value for name, value in record.items() if name in fields}
+            values["timestamp"] = datetime.fromisoformat(values["timestamp"])
+            results[values["test_id"]] = result_class(**values)
+        return list(results.values())
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -6,6 +6,8 @@ Simple command-line interface for running TAM prompt tests with Qwen
 import argparse
 import sys
 from tam_qwen_agent import QwenTAMAgent
+from result_store import ResultStore
+from run_journal import RunJournal
 from config import QWEN_CONFIG, TEST_COMPANIES, VALIDATION_THRESHOLDS
 
 def main():
@@ -15,8 +17,20 @@ def main():
                        help="Test with all predefined company contexts")
     parser.add_argument("--output", type=str, help="Output file for results")
     parser.add_argument("--verbose", action="store_true", help="Show detailed output")
+    parser.add_argument("--db", type=str, help="Result store database (default from STORE_CONFIG)")
+    parser.add_argument("--journal", type=str,
+                       help="Journal of completed tests for --all-companies (default from JOURNAL_CONFIG)")
+    parser.add_argument("--resume", action="store_true",
+                       help="Skip companies already journaled for this model and prompt version")
+    parser.add_argument("--history", action="store_true",
+                       help="Show stored TAM results by model and prompt version, then exit")
     
     args = parser.parse_args()
+    store = ResultStore(args.db)
+    
+    if args.history:
+        print_history(store, args.verbose)
+        return
     
     # Initialize agent with Qwen2.5 VL 32B configuration
     agent = QwenTAMAgent(
@@ -40,7 +54,21 @@ def main():
         elif args.all_companies:
             # Test with all companies
             print("Running comprehensive test with all companies...")
-            results = agent.run_comprehensive_test(TEST_COMPANIES)
+            journal = RunJournal(args.journal)
+            print(f"Journaling completed tests to {journal.path}")
+            # Each new result is stored as it completes; results resumed from the journal already are
+            run_id = store.start_run("tam", agent.model, source="cli")
+            try:
+                results = agent.run_comprehensive_test(
+                    TEST_COMPANIES, journal=journal, resume=args.resume,
+                    on_result=lambda result: store.save_result("tam", result, run_id)
+                )
+            finally:
+                journal.close()
+                store.finish_run(run_id)
+            print(f"Results stored in {store.path} (run {run_id})")
+            if not results:
+                raise ValueError("No tests completed")
             
             # Summary
             avg_score = sum(r.quality_score for r in results) / len(results)
@@ -61,17 +89,16 @@ def main():
             print_results(result, args.verbose)
         
         # Save results
-        if args.output:
-            agent.save_results(args.output)
-        else:
-            agent.save_results()
+        if not args.all_companies:
+            agent.save_results(args.output, store=store)
+        elif args.output:
+            agent.write_json(args.output)
         
-        # Generate report
-        report = agent.generate_report()
+        # Generate report, streamed straight to the file
         report_file = args.output.replace('.json', '.md') if args.output else None
         if report_file:
             with open(report_file, 'w') as f:
-                f.write(report)
+                agent.write_report(f, store=store, percentiles=args.verbose, by_model=args.verbose)
             print(f"Report saved to {report_file}")
         
     except Exception as e:
@@ -103,5 +130,27 @@ def print_results(result, verbose=False):
         print(f"\nResponse Preview (first 500 chars):")
         print(result.response[:500] + "..." if len(result.response) > 500 else result.response)
 
+def print_history(store, verbose=False):
+    """Print stored TAM results grouped by model and prompt version"""
+    for group_by in ("model", "prompt_version"):
+        summary = store.score_summary(group_by=group_by, kind="tam")
+        if not summary:
+            print("No stored TAM results")
+            return
+        print(f"\nBy {group_by.replace('_', ' ')}:")
+        for row in summary:
+            print(f"  {row[group_by] or '-'}: {row['tests']} tests, "
+                  f"average {row['avg_quality_score']:.2f} "
+                  f"(min {row['min_quality_score']:.2f}, max {row['max_quality_score']:.2f})")
+    
+    if verbose:
+        print(f"\nMost frequently missing requirements:")
+        for row in store.missing_requirement_counts(kind="tam")[:10]:
+            print(f"  {row['occurrences']:4d}  {row['requirement']}")
+        
+        print(f"\nRecent runs:")
+        for run in store.list_runs("tam"):
+            print(f"  {run['run_id']}  {run['started_at'][:16]}  {run['model']}  {run['test_count']} tests")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Sensitivity analysis on top of the vectorized DCF engine.
+Builds N-dimensional sensitivity grids (e.g. WACC x terminal growth x margin)
+by broadcasting each axis against the others and valuing every grid point in
+a single batch, and ranks value drivers by their swing for tornado charts.
+"""
+
+import argparse
+from dataclasses import dataclass, replace
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from dcf_engine import DCFAssumptions, DEFAULT_YEARS, free_cash_flows, gordon_terminal_value, value
+
+OUTPUTS = ("enterprise_value", "equity_value", "value_per_share")
+
+# Assumptions applied after the cash flow projection; grids over these project cash flows only once
+DISCOUNTING_INPUTS = frozenset({"wacc", "terminal_growth", "net_debt", "shares_outstanding"})
+
+# Drivers moved by default in a tornado analysis
+TORNADO_DRIVERS = (
+    "revenue_growth", "ebit_margin", "capex_pct", "nwc_pct", "tax_rate", "wacc", "terminal_growth"
+)
+
+@dataclass
+class SensitivityGrid:
+    """Output values over the cartesian product of the axes (one array dimension per axis)"""
+    axes: Dict[str, np.ndarray]
+    values: np.ndarray
+    output: str
+
+    def to_markdown(self, row_format: str = "{:.2%}", column_format: str = "{:.2%}",
+                    value_format: str = "{:,.0f}") -> str:
+        """Markdown table of a two-dimensional grid (rows: first axis, columns: second)"""
+        if self.values.ndim != 2:
+            raise ValueError("Only two-dimensional grids can be rendered as a table")
+        (row_name, rows), (column_name, columns) = self.axes.items()
+        lines = [
+            f"| {row_name} \\ {column_name} | " + " | ".join(column_format.format(c) for c in columns) + " |",
+            "|---" * (len(columns) + 1) + "|"
+        ]
+        for row, values in zip(rows, self.values):
+            lines.append(
+                f"| {row_format.format(row)} | " + " | ".join(value_format.format(v) for v in values) + " |"
+            )
+        return "\n".join(lines)
+
+def _select(valuation, output: str) -> np.ndarray:
+    if output not in OUTPUTS:
+        raise ValueError(f"Unknown output {output!r}; expected one of {', '.join(OUTPUTS)}")
+    result = getattr(valuation, output)
+    if result is None:
+        raise ValueError(f"{output} requires shares_outstanding")
+    return result
+
+def _discounting_grid(base: DCFAssumptions, views: Dict[str, np.ndarray], output: str, years: int) -> np.ndarray:
+    """Grid over discounting inputs only: broadcast the base case's cash flows against the axes"""
+    # The base case's own WACC and terminal growth do not matter here, so they are not checked
+    free_cash_flow = free_cash_flows(base, years)[0]
+    wacc = views.get("wacc", np.float64(base.wacc))
+    terminal_growth = views.get("terminal_growth", np.float64(base.terminal_growth))
+    # Discount factors only vary along the WACC axis, so they are computed once per WACC value
+    discount_factors = (1 + wacc[..., None]) ** -np.arange(1, years + 1, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        enterprise_value = (
+            (discount_factors * free_cash_flow).sum(axis=-1)
+            + gordon_terminal_value(free_cash_flow[-1], wacc, terminal_growth) * (1 + wacc) ** -float(years)
+        )
+    values = np.where(wacc > terminal_growth, enterprise_value, np.nan)
+    if output == "enterprise_value":
+        return values
+    values = values - views.get("net_debt", base.net_debt)
+    if output == "value_per_share":
+        shares = views.get("shares_outstanding", base.shares_outstanding)
+        if shares is None:
+            raise ValueError(f"{output} requires shares_outstanding")
+        values = values / shares
+    return values
+
+def sensitivity_grid(base: DCFAssumptions, axes: Dict[str, Sequence[float]],
+                     output: str = "enterprise_value", years: int = DEFAULT_YEARS) -> SensitivityGrid:
+    """Value the base case over every combination of the axis values"""
+    axes = {name: np.asarray(values, dtype=np.float64) for name, values in axes.items()}
+    for name in axes:
+        if name not in vars(base):
+            raise ValueError(f"Unknown assumption: {name}")
+    shape = tuple(len(values) for values in axes.values())
+
+    if output not in OUTPUTS:
+        raise ValueError(f"Unknown output {output!r}; expected one of {', '.join(OUTPUTS)}")
+
+    # Axis k varies along dimension k of the grid
+    views = {
+        name: values.reshape([-1 if i == k else 1 for i in range(len(shape))])
+        for k, (name, values) in enumerate(axes.items())
+    }
+    if set(axes) <= DISCOUNTING_INPUTS:
+        values = np.broadcast_to(_discounting_grid(base, views, output, years), shape)
+        return SensitivityGrid(axes=axes, values=np.array(values), output=output)
+
+    # Otherwise flatten the broadcast grid into one assumption set per point and value them in a batch
+    overrides = {name: np.broadcast_to(view, shape).ravel() for name, view in views.items()}
+    values = _batch(base, overrides, int(np.prod(shape)), output, years)
+    return SensitivityGrid(axes=axes, values=values.reshape(shape), output=output)
+
+def _batch(base: DCFAssumptions, overrides: Dict[str, np.ndarray], count: int, output: str,
+           years: int) -> np.ndarray:
+    """Output of `count` assumption sets overriding the base case, NaN where WACC <= terminal growth"""
+    # Those sets have no Gordon value; the others are valued in one batch
+    wacc = overrides.get("wacc", base.wacc)
+    terminal_growth = overrides.get("terminal_growth", base.terminal_growth)
+    valid = np.broadcast_to(np.asarray(wacc) > np.asarray(terminal_growth), (count,))
+    values = np.full(count, np.nan)
+    if valid.any():
+        if not valid.all():
+            overrides = {name: column[valid] for name, column in overrides.items()}
+        values[valid] = _select(value(replace(base, **overrides), years=years), output)
+    return values
+
+def tornado(base: DCFAssumptions, ranges: Dict[str, Tuple[float, float]] = None, relative: float = 0.1,
+            output: str = "enterprise_value", years: int = DEFAULT_YEARS) -> List[Dict[str, float]]:
+    """Rank value drivers by the output swing between their low and high values
+
+    Without explicit ranges, each default driver moves by +/- `relative` of its base value.
+    Cases where WACC does not exceed terminal growth are NaN, and so is their driver's swing
+    (ranked last).
+    """
+    if ranges is None:
+        ranges = {
+            name: (getattr(base, name) * (1 - relative), getattr(base, name) * (1 + relative))
+            for name in TORNADO_DRIVERS
+        }
+    names = list(ranges)
+
+    # One batch: the base case, then a low and a high case per driver
+    count = 1 + 2 * len(names)
+    overrides = {}
+    for i, name in enumerate(names):
+        column = np.full(count, float(getattr(base, name)))
+        column[1 + 2 * i], column[2 + 2 * i] = ranges[name]
+        overrides[name] = column
+    values = _batch(base, overrides, count, output, years)
+
+    drivers = []
+    for i, name in enumerate(names):
+        low, high = values[1 + 2 * i], values[2 + 2 * i]
+        drivers.append({
+            "driver": name,
+            "low_input": ranges[name][0],
+            "high_input": ranges[name][1],
+            "base_value": float(values[0]),
+            "low_value": float(low),
+            "high_value": float(high),
+            "swing": float(abs(high - low))
+        })
+    drivers.sort(key=lambda driver: (np.isnan(driver["swing"]), -driver["swing"]))
+    return drivers
+
+def main():
+    parser = argparse.ArgumentParser(description="WACC x terminal growth sensitivity table and tornado ranking")
+    parser.add_argument("--revenue", type=float, default=1000.0, help="Base year revenue")
+    parser.add_argument("--growth", type=float, default=0.10, help="Annual revenue growth")
+    parser.add_argument("--margin", type=float, default=0.20, help="EBIT margin")
+    parser.add_argument("--wacc", type=float, nargs=3, default=[0.07, 0.11, 5],
+                        metavar=("LOW", "HIGH", "STEPS"), help="WACC axis")
+    parser.add_argument("--terminal-growth", type=float, nargs=3, default=[0.015, 0.035, 5],
+                        metavar=("LOW", "HIGH", "STEPS"), help="Terminal growth axis")
+    args = parser.parse_args()
+
+    base = DCFAssumptions(
+        revenue=args.revenue, revenue_growth=args.growth, ebit_margin=args.margin, capex_pct=0.05,
+        nwc_pct=0.10, tax_rate=0.25, wacc=0.09, terminal_growth=0.025, depreciation_pct=0.04
+    )
+    grid = sensitivity_grid(base, {
+        "wacc": np.linspace(args.wacc[0], args.wacc[1], int(args.wacc[2])),
+        "terminal_growth": np.linspace(args.terminal_growth[0], args.terminal_growth[1], int(args.terminal_growth[2]))
+    })
+    print("Enterprise value sensitivity\n")
+    print(grid.to_markdown())
+
+    print("\nKey value drivers (+/-10%)\n")
+    for driver in tornado(base):
+        print(f"  {driver['driver']:<16} {driver['low_value']:>12,.0f} .. {driver['high_value']:>12,.0f}"
+              f"  swing {driver['swing']:,.0f}")
+
+if __name__ == "__main__":
+    main()
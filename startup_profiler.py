@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Cold-start profiler for the web app.
+Imports app.py in a fresh interpreter while timing every module import, then
+initializes the lazily created subsystems and reports where startup time goes.
+Use --max-import-ms in CI to fail when the import of app.py regresses.
+"""
+
+import argparse
+import builtins
+import json
+import sys
+import time
+from typing import Any, Dict, List
+
+def profile_startup(module: str = "app") -> Dict[str, Any]:
+    """Import a module with timed imports and warm up its lazy subsystems"""
+    timings: Dict[str, Dict[str, float]] = {}
+    stack: List[float] = []
+    original_import = builtins.__import__
+
+    def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+        # Only the first import of a module does any work
+        if level or name in sys.modules:
+            return original_import(name, globals, locals, fromlist, level)
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            if name not in timings:
+                timings[name] = {"cumulative": elapsed, "self": elapsed - children}
+
+    builtins.__import__ = timed_import
+    start = time.perf_counter()
+    try:
+        target = __import__(module)
+    finally:
+        builtins.__import__ = original_import
+    import_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if hasattr(target, "warm_up"):
+        target.warm_up()
+    warm_up_seconds = time.perf_counter() - start
+
+    return {
+        "module": module,
+        "import_seconds": import_seconds,
+        "warm_up_seconds": warm_up_seconds,
+        "subsystems": dict(getattr(target, "INIT_TIMINGS", {})),
+        "imports": timings
+    }
+
+def format_report(profile: Dict[str, Any], top: int = 25) -> str:
+    """Human readable summary of a startup profile"""
+    lines = [
+        f"Import of {profile['module']}: {profile['import_seconds'] * 1000:.1f} ms",
+        f"Lazy subsystem warm-up: {profile['warm_up_seconds'] * 1000:.1f} ms",
+        ""
+    ]
+    if profile["subsystems"]:
+        lines.append("Subsystems (ms):")
+        for name, seconds in sorted(profile["subsystems"].items(), key=lambda item: -item[1]):
+            lines.append(f"  {seconds * 1000:9.1f}  {name}")
+        lines.append("")
+
+    lines.append(f"Slowest imports (top {top}, ms):")
+    lines.append(f"  {'cumulative':>10}  {'self':>8}  module")
+    imports = sorted(profile["imports"].items(), key=lambda item: -item[1]["cumulative"])
+    for name, timing in imports[:top]:
+        lines.append(f"  {timing['cumulative'] * 1000:10.1f}  {timing['self'] * 1000:8.1f}  {name}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile cold start of the web app")
+    parser.add_argument("--module", type=str, default="app", help="Module to import")
+    parser.add_argument("--top", type=int, default=25, help="Number of imports to list")
+    parser.add_argument("--output", type=str, help="Write the full profile as JSON")
+    parser.add_argument("--max-import-ms", type=float,
+                        help="Exit with status 1 when importing the module takes longer")
+    args = parser.parse_args()
+
+    profile = profile_startup(args.module)
+    print(format_report(profile, args.top))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(profile, f, indent=2)
+        print(f"\nProfile written to {args.output}")
+
+    if args.max_import_ms is not None and profile["import_seconds"] * 1000 > args.max_import_ms:
+        print(f"\nImport time exceeds the {args.max_import_ms:.0f} ms budget")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Markdown and ASCII table extraction for model responses.
+Finds every pipe table (with or without outer pipes) and +---+ grid table in
+one pass over the lines and returns header-labelled float columns, so numeric
+checks and analytics work on arrays instead of re-scanning the text.
+
+Cells such as "$1,234.5", "(4.6)", "12%", "300M" or "$1.5B" parse to floats in
+absolute units (percentages as fractions); a unit in the header, e.g.
+"Free Cash Flow ($M)", scales the column's unsuffixed cells. Cells that are not
+numbers are NaN in the numeric columns and kept verbatim in `rows`.
+"""
+
+import argparse
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+SCALES = {
+    "k": 1e3, "thousand": 1e3, "thousands": 1e3,
+    "m": 1e6, "mm": 1e6, "mn": 1e6, "million": 1e6, "millions": 1e6,
+    "b": 1e9, "bn": 1e9, "billion": 1e9, "billions": 1e9,
+    "t": 1e12, "trillion": 1e12, "trillions": 1e12
+}
+
+CELL_NUMBER = re.compile(
+    r"^(?P<open>\()?(?P<sign>[-+−–])?[$€£]?(?P<sign_after>[-+])?"
+    r"(?P<number>\d[\d,]*(?:\.(?P<decimals>\d+))?|\.(?P<fraction>\d+))"
+    r"(?P<suffix>k|mm|mn|m|bn|b|t|thousands?|millions?|billions?|trillions?)?"
+    r"(?P<percent>%)?(?P<close>\))?$",
+    re.IGNORECASE
+)
+HEADER_UNIT = re.compile(
+    r"[(\[,]\s*(?:in\s+)?(?:[$€£]|usd|eur|gbp)?\s*"
+    r"(k|mm|mn|m|bn|b|thousands?|millions?|billions?)\b",
+    re.IGNORECASE
+)
+
+PIPE_ROW = re.compile(r"^\s*\|(.*?)\|?\s*$")
+GRID_BORDER = re.compile(r"^\s*\+[-=:+\s]*\+\s*$")
+SEPARATOR = re.compile(r"^\s*\|?\s*:?-{2,}:?\s*(\|\s*:?-{2,}:?\s*)*\|?\s*$")
+
+@dataclass
+class Table:
+    """One table: raw cells plus float columns keyed by header"""
+    header: List[str]
+    rows: List[List[str]]
+    line: int                                             # line number of the header, from 1
+    columns: Dict[str, np.ndarray] = field(default_factory=dict)
+    resolution: Dict[str, np.ndarray] = field(default_factory=dict)  # one unit of the last quoted digit
+
+    @property
+    def labels(self) -> List[str]:
+        """First cell of every body row"""
+        return [row[0] if row else "" for row in self.rows]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def find_column(self, pattern: str, exclude: str = None) -> Optional[str]:
+        """First header matching a pattern (case-insensitive), skipping headers matching exclude"""
+        for name in self.columns:
+            if re.search(pattern, name, re.IGNORECASE) and not (exclude and re.search(exclude, name, re.IGNORECASE)):
+                return name
+        return None
+
+    def find_rows(self, pattern: str) -> np.ndarray:
+        """Indices of body rows whose label matches a pattern (case-insensitive)"""
+        compiled = re.compile(pattern, re.IGNORECASE)
+        return np.array([i for i, label in enumerate(self.labels) if compiled.search(label)], dtype=np.intp)
+
+    def numeric_columns(self) -> List[str]:
+        """Headers of columns with at least one number"""
+        return [name for name, values in self.columns.items() if not np.isnan(values).all()]
+
+def parse_value(cell: str, scale: float = 1.0) -> Optional[Tuple[float, float]]:
+    """Value of a numeric cell and one unit of its last quoted digit, or None
+
+    `scale` applies to cells without their own suffix (e.g. from a "($M)" header).
+    """
+    match = CELL_NUMBER.match(cell.strip().strip("*_`~").replace(" ", ""))
+    if match is None:
+        return None
+    value = float(match.group("number").replace(",", ""))
+    decimals = len(match.group("decimals") or match.group("fraction") or "")
+    suffix = match.group("suffix")
+    if suffix:
+        scale = SCALES[suffix.lower()]
+    if match.group("percent"):
+        scale /= 100
+    negative = bool(match.group("sign") and match.group("sign") != "+") or match.group("sign_after") == "-"
+    if match.group("open") and match.group("close"):
+        negative = True
+    elif match.group("open") or match.group("close"):
+        return None
+    value *= scale
+    return (-value if negative else value), 10.0 ** -decimals * scale
+
+def _header_scale(name: str) -> float:
+    match = HEADER_UNIT.search(name)
+    return SCALES[match.group(1).lower()] if match else 1.0
+
+def _cells(line: str) -> List[str]:
+    match = PIPE_ROW.match(line)
+    body = match.group(1) if match else line.strip()
+    return [cell.strip() for cell in body.split("|")]
+
+def _build(header: List[str], rows: List[List[str]], line: int) -> Table:
+    names = []
+    for i, name in enumerate(header):
+        name = name.strip("*_` ") or f"column_{i + 1}"
+        unique, n = name, 2
+        while unique in names:
+            unique, n = f"{name} ({n})", n + 1
+        names.append(unique)
+
+    table = Table(header=names, rows=[row + [""] * (len(names) - len(row)) for row in rows], line=line)
+    for j, name in enumerate(names):
+        scale = _header_scale(name)
+        values = np.full(len(rows), np.nan)
+        resolution = np.full(len(rows), np.nan)
+        for i, row in enumerate(table.rows):
+            parsed = parse_value(row[j], scale) if j < len(row) else None
+            if parsed is not None:
+                values[i], resolution[i] = parsed
+        table.columns[name] = values
+        table.resolution[name] = resolution
+    return table
+
+def iter_tables(text: str) -> Iterator[Table]:
+    """Yield the tables of a text in order, in a single pass over its lines"""
+    lines = text.splitlines()
+    header: Optional[List[str]] = None
+    rows: List[List[str]] = []
+    start = 0
+    grid = False  # inside (or just above the header of) a +---+ grid table
+
+    for i, line in enumerate(lines):
+        following = lines[i + 1] if i + 1 < len(lines) else ""
+        if header is not None:
+            if SEPARATOR.match(line) or (grid and GRID_BORDER.match(line)):
+                continue
+            if PIPE_ROW.match(line) or (not grid and "|" in line):
+                rows.append(_cells(line))
+                continue
+            yield _build(header, rows, start)
+            header, rows = None, []
+
+        if GRID_BORDER.match(line):
+            grid = True
+        elif "|" in line and (grid or SEPARATOR.match(following) or GRID_BORDER.match(following)):
+            # A header needs a separator or border under it, so stray pipes in prose are not tables
+            header, start = _cells(line), i + 1
+        else:
+            grid = False
+
+    if header is not None:
+        yield _build(header, rows, start)
+
+def extract_tables(text: str) -> List[Table]:
+    """All tables of a text"""
+    return list(iter_tables(text))
+
+def main():
+    parser = argparse.ArgumentParser(description="List the tables and numeric columns of response files")
+    parser.add_argument("files", nargs="+", help="Response files (markdown or text)")
+    args = parser.parse_args()
+
+    for path in args.files:
+        with open(path, "r", encoding="utf-8") as f:
+            tables = extract_tables(f.read())
+        print(f"{path}: {len(tables)} tables")
+        for table in tables:
+            print(f"  line {table.line}: {len(table)} rows x {len(table.header)} columns")
+            for name in table.numeric_columns():
+                values = table[name]
+                print(f"    {name}: {np.count_nonzero(~np.isnan(values))} numbers, sum {np.nansum(values):,.4g}")
+
+if __name__ == "__main__":
+    main()
@@ -4,14 +4,23 @@ TAM Estimation Prompt Testing Agent with Qwen LLM Integration
 This agent tests the TAM estimation prompt by sending it to Qwen and analyzing the responses.
 """
 
+import io
 import json
-import requests
 import time
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+import uuid
+from typing import Callable, Dict, Generator, Iterable, List, Any, Optional, TextIO
+from dataclasses import dataclass, field
 from datetime import datetime
 import re
 
+from result_store import ResultStore, prompt_version
+from run_journal import RunJournal
+from report_writer import ReportStats, iter_report, write_chunks
+from metrics import (
+    UPSTREAM_LATENCY, UPSTREAM_RESPONSES, UPSTREAM_RETRIES, UPSTREAM_TIMEOUTS,
+    VALIDATION_DURATION, REPORT_DURATION, provider_for
+)
+
 @dataclass
 class PromptTestResult:
     """Data class to store test results"""
@@ -24,6 +33,14 @@ class PromptTestResult:
     quality_score: float
     recommendations: List[str]
     market_metrics: Dict[str, Any]
+    model: str = ""
+    company_context: str = ""
+    prompt_version: str = ""
+    elements_found: Dict[str, int] = field(default_factory=dict)
+    
+    @property
+    def response_length(self) -> int:
+        return len(self.response)
 
 class TAMPromptValidator:
     """Validates TAM prompt responses against requirements"""
@@ -50,6 +67,18 @@ class TAMPromptValidator:
             "revenue_projection": r"revenue|projection|3-year|5-year",
             "constraints_enablers": r"constraint|enabler|barrier|moat"
         }
+        
+        # Market metrics patterns
+        self.market_metrics = {
+            "market_size_numbers": r"\$[\d,]+(?:\.\d+)?[BMK]?",
+            "growth_percentages": r"\d+(?:\.\d+)?%",
+            "market_share": r"market share.*?(\d+(?:\.\d+)?%)",
+            "penetration_rates": r"penetration.*?(\d+(?:\.\d+)?%)",
+            "customer_numbers": r"[\d,]+(?:\.\d+)?\s*(?:customers|users|subscribers)",
+            "revenue_projections": r"revenue.*?\$[\d,]+(?:\.\d+)?[BMK]?",
+            "market_cagr": r"CAGR.*?(\d+(?:\.\d+)?%)",
+            "geographic_coverage": r"(?:global|regional|national|international)"
+        }
     
     def validate_response(self, response: str) -> Dict[str, Any]:
         """Validate response against TAM prompt requirements"""
@@ -78,14 +107,8 @@ class TAMPromptValidator:
         
         # Extract market metrics
         market_metrics = {
-            "market_size_numbers": re.findall(r"\$[\d,]+(?:\.\d+)?[BMK]?", response, re.IGNORECASE),
-            "growth_percentages": re.findall(r"\d+(?:\.\d+)?%", response),
-            "market_share": re.findall(r"market share.*?(\d+(?:\.\d+)?%)", response, re.IGNORECASE),
-            "penetration_rates": re.findall(r"penetration.*?(\d+(?:\.\d+)?%)", response, re.IGNORECASE),
-            "customer_numbers": re.findall(r"[\d,]+(?:\.\d+)?\s*(?:customers|users|subscribers)", response, re.IGNORECASE),
-            "revenue_projections": re.findall(r"revenue.*?\$[\d,]+(?:\.\d+)?[BMK]?", response, re.IGNORECASE),
-            "market_cagr": re.findall(r"CAGR.*?(\d+(?:\.\d+)?%)", response, re.IGNORECASE),
-            "geographic_coverage": re.findall(r"(?:global|regional|national|international)", response, re.IGNORECASE)
+            metric: re.findall(pattern, response, re.IGNORECASE)
+            for metric, pattern in self.market_metrics.items()
         }
         
         # Calculate quality indicators
@@ -115,12 +138,14 @@ class TAMPromptValidator:
 class QwenTAMAgent:
     """Main agent for testing TAM prompts with Qwen LLM"""
     
-    def __init__(self, api_key: str = None, base_url: str = "https://openrouter.ai/api/v1", model: str = "qwen/qwen2.5-vl-32b-instruct:free"):
+    def __init__(self, api_key: str = None, base_url: str = "https://openrouter.ai/api/v1", model: str = "qwen/qwen2.5-vl-32b-instruct:free", keep_history: bool = True):
         self.api_key = api_key
         self.base_url = base_url
         self.model = model
         self.validator = TAMPromptValidator()
+        self.keep_history = keep_history
         self.test_results = []
+        self.progress_callback: Optional[Callable[..., None]] = None
         
     def load_tam_prompt(self) -> str:
         """Load the TAM estimation prompt from file"""
@@ -133,6 +158,10 @@ class QwenTAMAgent:
     
     def send_to_qwen(self, prompt: str, company_context: str = "") -> str:
         """Send prompt to Qwen LLM via OpenRouter and get response"""
+        # Deferred so importing the agent (e.g. at app startup) stays cheap
+        import requests
+
+        provider = provider_for(self.base_url)
         try:
             # Prepare the full prompt with company context
             full_prompt = f"""
@@ -164,16 +193,24 @@ Provide a detailed, professional analysis suitable for investment committee revi
                 "max_tokens": 2000
             }
             
+            self._emit("sent", company_context)
+            start = time.perf_counter()
             response = requests.post(
                 f"{self.base_url}/chat/completions",
                 headers=headers,
                 json=payload,
                 timeout=30
             )
+            latency = time.perf_counter() - start
+            UPSTREAM_LATENCY.labels(provider, self.model).observe(latency)
+            self._emit("first_token", company_context, ttfb_seconds=response.elapsed.total_seconds())
+            UPSTREAM_RESPONSES.labels(provider, self.model, response.status_code).inc()
             
             if response.status_code == 200:
                 result = response.json()
-                return result["choices"][0]["message"]["content"]
+                content = result["choices"][0]["message"]["content"]
+                self._emit("completed", company_context, latency_seconds=latency, response_length=len(content))
+                return content
             else:
                 error_detail = response.text
                 try:
@@ -184,6 +221,9 @@ Provide a detailed, professional analysis suitable for investment committee revi
                     pass
                 return f"Error: {response.status_code} - {error_detail}"
                 
+        except requests.exceptions.Timeout as e:
+            UPSTREAM_TIMEOUTS.labels(provider, self.model).inc()
+            return f"Error connecting to OpenRouter: {str(e)}"
         except Exception as e:
             return f"Error connecting to OpenRouter: {str(e)}"
     
@@ -208,14 +248,16 @@ Provide a detailed, professional analysis suitable for investment committee revi
                 raise ValueError(f"API Error: {response}")
             
             print("Validating response...")
+            start = time.perf_counter()
             validation = self.validator.validate_response(response)
+            VALIDATION_DURATION.labels("tam").observe(time.perf_counter() - start)
             
             # Generate recommendations
             recommendations = self._generate_recommendations(validation)
             
             # Create test result
             test_result = PromptTestResult(
-                test_id=f"test_{int(time.time())}",
+                test_id=f"test_{int(time.time())}_{uuid.uuid4().hex[:8]}",
                 timestamp=datetime.now(),
                 prompt_used=prompt[:200] + "..." if len(prompt) > 200 else prompt,
                 response=response,
@@ -223,10 +265,20 @@ Provide a detailed, professional analysis suitable for investment committee revi
                 missing_requirements=validation["missing_requirements"],
                 quality_score=validation["overall_score"],
                 recommendations=recommendations,
-                market_metrics=validation["market_metrics"]
+                market_metrics=validation["market_metrics"],
+                model=self.model,
+                company_context=company_context,
+                prompt_version=prompt_version(prompt),
+                elements_found=validation["elements_found"]
             )
             
-            self.test_results.append(test_result)
+            self._emit(
+                "validated", company_context,
+                test_id=test_result.test_id, quality_score=test_result.quality_score
+            )
+            
+            if self.keep_history:
+                self.test_results.append(test_result)
             return test_result
             
         except Exception as e:
@@ -235,6 +287,9 @@ Provide a detailed, professional analysis suitable for investment committee revi
     
     def send_to_gemini(self, prompt: str, company_context: str = "", max_retries: int = 3) -> str:
         """Send prompt to Gemini LLM and get response"""
+        import requests
+
+        provider = provider_for(self.base_url)
         for attempt in range(max_retries):
             try:
                 print(f"Attempt {attempt + 1}/{max_retries}...")
@@ -270,12 +325,18 @@ Provide a detailed, professional analysis suitable for investment committee revi
                 }
                 
                 print("Sending request to Gemini...")
+                self._emit("sent", company_context, attempt=attempt + 1)
+                start = time.perf_counter()
                 response = requests.post(
                     f"{self.base_url}/models/{self.model}:generateContent?key={self.api_key}",
                     headers=headers,
                     json=payload,
                     timeout=30
                 )
+                latency = time.perf_counter() - start
+                UPSTREAM_LATENCY.labels(provider, self.model).observe(latency)
+                self._emit("first_token", company_context, ttfb_seconds=response.elapsed.total_seconds())
+                UPSTREAM_RESPONSES.labels(provider, self.model, response.status_code).inc()
                 
                 print(f"Response status: {response.status_code}")
                 
@@ -283,6 +344,7 @@ Provide a detailed, professional analysis suitable for investment committee revi
                     result = response.json()
                     if "candidates" in result and len(result["candidates"]) > 0:
                         content = result["candidates"][0]["content"]["parts"][0]["text"]
+                        self._emit("completed", company_context, latency_seconds=latency, response_length=len(content))
                         print(f"Success! Response length: {len(content)} characters")
                         return content
                     else:
@@ -300,15 +362,18 @@ Provide a detailed, professional analysis suitable for investment committee revi
                     
                     if attempt < max_retries - 1:
                         print(f"Retrying in 2 seconds...")
+                        UPSTREAM_RETRIES.labels(provider, self.model).inc()
                         time.sleep(2)
                         continue
                     else:
                         return f"Error: {response.status_code} - {error_detail}"
                     
             except requests.exceptions.Timeout:
+                UPSTREAM_TIMEOUTS.labels(provider, self.model).inc()
                 print(f"Timeout on attempt {attempt + 1}")
                 if attempt < max_retries - 1:
                     print("Retrying...")
+                    UPSTREAM_RETRIES.labels(provider, self.model).inc()
                     time.sleep(2)
                     continue
                 else:
@@ -318,6 +383,7 @@ Provide a detailed, professional analysis suitable for investment committee revi
                 print(f"Connection error on attempt {attempt + 1}")
                 if attempt < max_retries - 1:
                     print("Retrying...")
+                    UPSTREAM_RETRIES.labels(provider, self.model).inc()
                     time.sleep(2)
                     continue
                 else:
@@ -327,6 +393,7 @@ Provide a detailed, professional analysis suitable for investment committee revi
                 print(f"Unexpected error: {str(e)}")
                 if attempt < max_retries - 1:
                     print("Retrying...")
+                    UPSTREAM_RETRIES.labels(provider, self.model).inc()
                     time.sleep(2)
                     continue
                 else:
@@ -334,6 +401,11 @@ Provide a detailed, professional analysis suitable for investment committee revi
         
         return "Error: All retry attempts failed"
     
+    def _emit(self, event: str, company_context: str, **data: Any):
+        """Report a test lifecycle event to the progress callback, if any"""
+        if self.progress_callback is not None:
+            self.progress_callback(event, company=company_context, model=self.model, **data)
+    
     def _generate_recommendations(self, validation: Dict[str, Any]) -> List[str]:
         """Generate recommendations based on validation results"""
         recommendations = []
@@ -355,8 +427,17 @@ Provide a detailed, professional analysis suitable for investment committee revi
         
         return recommendations
     
-    def run_comprehensive_test(self, companies: List[str] = None) -> List[PromptTestResult]:
-        """Run tests with multiple company contexts"""
+    def run_comprehensive_test(self, companies: List[str] = None, journal: RunJournal = None,
+                               resume: bool = False,
+                               on_result: Callable[[PromptTestResult], None] = None) -> List[PromptTestResult]:
+        """Run tests with multiple company contexts
+        
+        Each completed test is appended to the journal when one is given; with
+        resume, companies already journaled for this model and prompt version
+        are skipped and their journaled results returned instead. on_result is
+        called with each new result as soon as its test completes (e.g. to
+        persist it while the rest of the run is still going).
+        """
         if companies is None:
             companies = [
                 "A fintech startup offering digital banking services to millennials",
@@ -366,68 +447,136 @@ Provide a detailed, professional analysis suitable for investment committee revi
             ]
         
         results = []
+        if journal is not None and resume:
+            version = prompt_version(self.load_tam_prompt())
+            journaled = {
+                result.company_context: result
+                for result in journal.results("tam", PromptTestResult)
+                if result.model == self.model and result.prompt_version == version
+            }
+            for company in companies:
+                if company in journaled:
+                    results.append(journaled[company])
+                    if self.keep_history:
+                        self.test_results.append(journaled[company])
+            print(f"Resuming: {len(results)} of {len(companies)} companies already journaled")
+            companies = [company for company in companies if company not in journaled]
+        
+        for company in companies:
+            self._emit("queued", company)
+        
         for company in companies:
             print(f"\nTesting with company: {company}")
             try:
                 result = self.test_prompt(company)
+                if journal is not None:
+                    journal.append("tam", result)
+                if on_result is not None:
+                    on_result(result)
                 results.append(result)
                 print(f"Quality Score: {result.quality_score:.2f}")
             except Exception as e:
                 print(f"Error testing {company}: {e}")
+                self._emit("failed", company, error=str(e))
         
         return results
     
-    def generate_report(self, results: List[PromptTestResult] = None) -> str:
+    def generate_report(self, results: Iterable[PromptTestResult] = None, store: ResultStore = None,
+                        percentiles: bool = False, by_model: bool = False) -> str:
         """Generate a comprehensive test report"""
-        if results is None:
-            results = self.test_results
-        
-        if not results:
-            return "No test results available"
-        
-        report = f"""
+        report = io.StringIO()
+        self.write_report(report, results, store, percentiles, by_model)
+        return report.getvalue()
+    
+    def write_report(self, out: TextIO, results: Iterable[PromptTestResult] = None, store: ResultStore = None,
+                     percentiles: bool = False, by_model: bool = False) -> ReportStats:
+        """Stream the report to a text file in a single pass over the results"""
+        return write_chunks(self.iter_report(results, store, percentiles, by_model), out)
+    
+    def iter_report(self, results: Iterable[PromptTestResult] = None, store: ResultStore = None,
+                    percentiles: bool = False, by_model: bool = False) -> Generator[str, None, ReportStats]:
+        """The report in chunks, e.g. for a streaming response, in a single pass over the results"""
+        start = time.perf_counter()
+        stats = yield from iter_report(
+            self.test_results if results is None else results,
+            summary=self._report_summary,
+            section=self._report_section,
+            counters={"issues": lambda r: r.quality_score < 0.7},
+            empty="No test results available",
+            footer=(lambda: self._history_section(store)) if store is not None else None,
+            percentiles=percentiles,
+            by_model=by_model
+        )
+        REPORT_DURATION.labels("tam").observe(time.perf_counter() - start)
+        return stats
+    
+    def _report_summary(self, stats: ReportStats) -> str:
+        """Report title and summary statistics"""
+        return f"""
 # TAM Prompt Testing Report
 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 ## Summary
-- Total Tests: {len(results)}
-- Average Quality Score: {sum(r.quality_score for r in results) / len(results):.2f}
-- Tests with Issues: {len([r for r in results if r.quality_score < 0.7])}
-
-## Detailed Results
+- Total Tests: {stats.count}
+- Average Quality Score: {stats.average:.2f}
+- Tests with Issues: {stats.counts["issues"]}
 """
-        
-        for i, result in enumerate(results, 1):
-            report += f"""
+    
+    def _report_section(self, i: int, result: PromptTestResult) -> str:
+        """Report section for one test result"""
+        lines = [f"""
 ### Test {i} - {result.test_id}
 - Quality Score: {result.quality_score:.2f}
-- Response Length: {len(result.response)} characters
+- Response Length: {result.response_length} characters
 - Missing Requirements: {len(result.missing_requirements)}
 
 #### Validation Scores:
-"""
-            for metric, score in result.validation_scores.items():
-                report += f"- {metric}: {score:.2f}\n"
-            
-            if result.missing_requirements:
-                report += "\n#### Missing Requirements:\n"
-                for req in result.missing_requirements:
-                    report += f"- {req}\n"
-            
-            if result.recommendations:
-                report += "\n#### Recommendations:\n"
-                for rec in result.recommendations:
-                    report += f"- {rec}\n"
-            
-            report += "\n---\n"
+"""]
+        lines.extend(f"- {metric}: {score:.2f}\n" for metric, score in result.validation_scores.items())
         
-        return report
-    
-    def save_results(self, filename: str = None):
-        """Save test results to JSON file"""
-        if filename is None:
-            filename = f"tam_test_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        if result.missing_requirements:
+            lines.append("\n#### Missing Requirements:\n")
+            lines.extend(f"- {req}\n" for req in result.missing_requirements)
         
+        if result.recommendations:
+            lines.append("\n#### Recommendations:\n")
+            lines.extend(f"- {rec}\n" for rec in result.recommendations)
+        
+        lines.append("\n---\n")
+        return "".join(lines)
+    
+    def _history_section(self, store: ResultStore) -> str:
+        """Report section comparing prompt versions for the current model across stored runs"""
+        summary = store.score_summary(group_by="prompt_version", kind="tam", model=self.model)
+        if not summary:
+            return ""
+        section = f"\n## Historical Comparison ({self.model})\n"
+        section += "| Prompt Version | Tests | Average | Min | Max | Last Test |\n"
+        section += "|---|---|---|---|---|---|\n"
+        for row in summary:
+            section += (
+                f"| {row['prompt_version'] or '-'} | {row['tests']} | {row['avg_quality_score']:.2f} "
+                f"| {row['min_quality_score']:.2f} | {row['max_quality_score']:.2f} | {row['last_test'][:16]} |\n"
+            )
+        return section
+    
+    def save_results(self, filename: str = None, store: ResultStore = None, source: str = "cli") -> str:
+        """Save test results to the result store, and to a JSON file when a filename is given"""
+        store = store or ResultStore()
+        versions = {result.prompt_version for result in self.test_results}
+        run_id = store.start_run(
+            "tam", self.model, versions.pop() if len(versions) == 1 else "", source
+        )
+        store.save_results("tam", self.test_results, run_id)
+        store.finish_run(run_id)
+        print(f"Results stored in {store.path} (run {run_id})")
+
+        if filename is not None:
+            self.write_json(filename)
+        return run_id
+
+    def write_json(self, filename: str):
+        """Save a summary of the test results to a JSON file"""
         data = []
         for result in self.test_results:
             data.append({
@@ -466,13 +615,14 @@ def main():
     print("\nRunning comprehensive test...")
     comprehensive_results = agent.run_comprehensive_test()
     
+    # Save results
+    store = ResultStore()
+    agent.save_results(store=store)
+    
     # Generate and display report
-    report = agent.generate_report(comprehensive_results)
+    report = agent.generate_report(comprehensive_results, store=store)
     print("\n" + report)
     
-    # Save results
-    agent.save_results()
-    
     # Save full report
     report_filename = f"tam_test_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
     with open(report_filename, 'w') as f:
@@ -0,0 +1,53 @@
+"""
+Shared fixtures: a throwaway result store, a web app client backed by it and a
+factory for TAM test results.
+The modules live at the repository root, which is put on the import path here.
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from result_store import ResultStore  # noqa: E402
+from tam_qwen_agent import PromptTestResult  # noqa: E402
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(str(tmp_path / "results.db"))
+
+@pytest.fixture
+def client(store, monkeypatch):
+    """Test client of the web app, backed by the throwaway store"""
+    from fastapi.testclient import TestClient
+
+    # Templates and static assets are looked up relative to the repository root
+    monkeypatch.chdir(ROOT)
+    import app
+
+    monkeypatch.setattr(app, "get_store", lambda: store)
+    return TestClient(app.app)
+
+@pytest.fixture
+def make_result():
+    def make(test_id: str, quality_score: float, model: str = "model-a", **elements: int) -> PromptTestResult:
+        return PromptTestResult(
+            test_id=test_id,
+            timestamp=datetime(2026, 1, 1),
+            prompt_used="prompt",
+            response=f"response of {test_id}",
+            validation_scores={"section_coverage": quality_score},
+            missing_requirements=[] if quality_score >= 0.7 else ["Missing section: Final Deliverables"],
+            quality_score=quality_score,
+            recommendations=[],
+            market_metrics={},
+            model=model,
+            company_context=f"company of {test_id}",
+            prompt_version="v1",
+            elements_found=elements or {"market_size": 1}
+        )
+    return make
@@ -0,0 +1,92 @@
+"""DCF engine against a hand-computed valuation, and the analyses built on it"""
+
+import numpy as np
+import pytest
+
+from dcf_engine import DCFAssumptions, free_cash_flows, value
+from monte_carlo import simulate
+from sensitivity import sensitivity_grid, tornado
+
+def _assumptions(**overrides) -> DCFAssumptions:
+    inputs = dict(
+        revenue=100.0, revenue_growth=0.10, ebit_margin=0.20, capex_pct=0.05, nwc_pct=0.10,
+        tax_rate=0.25, wacc=0.10, terminal_growth=0.02, depreciation_pct=0.05, net_debt=50.0,
+        shares_outstanding=10.0
+    )
+    inputs.update(overrides)
+    return DCFAssumptions(**inputs)
+
+def test_two_year_valuation_matches_hand_computation():
+    valuation = value(_assumptions(), years=2)
+
+    # Revenue 110, 121; EBIT 22, 24.2; NOPAT 16.5, 18.15; D&A and capex cancel;
+    # NWC goes 10 -> 11 -> 12.1, so free cash flow is 16.5 - 1 and 18.15 - 1.1
+    np.testing.assert_allclose(valuation.revenue[0], [110.0, 121.0])
+    np.testing.assert_allclose(valuation.free_cash_flow[0], [15.5, 17.05])
+    np.testing.assert_allclose(valuation.present_values[0], [15.5 / 1.1, 17.05 / 1.21])
+    # Gordon: 17.05 x 1.02 / (0.10 - 0.02), discounted two years
+    assert valuation.terminal_value[0] == pytest.approx(217.3875)
+    assert valuation.pv_terminal_value[0] == pytest.approx(217.3875 / 1.21)
+    enterprise_value = 15.5 / 1.1 + 17.05 / 1.21 + 217.3875 / 1.21
+    assert valuation.enterprise_value[0] == pytest.approx(enterprise_value)
+    assert valuation.equity_value[0] == pytest.approx(enterprise_value - 50.0)
+    assert valuation.value_per_share[0] == pytest.approx((enterprise_value - 50.0) / 10.0)
+
+def test_mid_year_discounts_cash_flows_half_a_year_earlier_but_not_the_terminal_value():
+    valuation = value(_assumptions(), years=2, mid_year=True)
+
+    np.testing.assert_allclose(valuation.present_values[0], [15.5 / 1.1 ** 0.5, 17.05 / 1.1 ** 1.5])
+    assert valuation.pv_terminal_value[0] == pytest.approx(217.3875 / 1.21)
+
+def test_batches_value_each_assumption_set_independently():
+    batch = value(_assumptions(wacc=np.array([0.08, 0.10, 0.12])), years=2)
+
+    for i, wacc in enumerate([0.08, 0.10, 0.12]):
+        single = value(_assumptions(wacc=wacc), years=2)
+        assert batch.enterprise_value[i] == pytest.approx(single.enterprise_value[0])
+
+def test_wacc_must_exceed_terminal_growth():
+    with pytest.raises(ValueError):
+        value(_assumptions(wacc=0.02, terminal_growth=0.03))
+
+def test_cash_flows_do_not_depend_on_discounting_inputs():
+    np.testing.assert_allclose(free_cash_flows(_assumptions(wacc=0.02, terminal_growth=0.03), years=2)[0], [15.5, 17.05])
+
+def test_sensitivity_grid_agrees_with_the_engine():
+    waccs, growths = [0.08, 0.09, 0.10], [0.01, 0.02]
+    grid = sensitivity_grid(_assumptions(), {"wacc": waccs, "terminal_growth": growths}, output="value_per_share")
+
+    for i, wacc in enumerate(waccs):
+        for j, growth in enumerate(growths):
+            expected = value(_assumptions(wacc=wacc, terminal_growth=growth)).value_per_share[0]
+            assert grid.values[i, j] == pytest.approx(expected)
+
+def test_invalid_grid_points_and_tornado_ends_are_nan():
+    # The base case itself has no Gordon value, but every grid point does
+    grid = sensitivity_grid(_assumptions(wacc=0.02, terminal_growth=0.03), {"wacc": [0.08, 0.10], "terminal_growth": [0.02]})
+    assert not np.isnan(grid.values).any()
+
+    grid = sensitivity_grid(_assumptions(), {"wacc": [0.01, 0.10], "ebit_margin": [0.2]})
+    assert np.isnan(grid.values[0, 0]) and not np.isnan(grid.values[1, 0])
+
+    drivers = tornado(_assumptions(), {"wacc": (0.01, 0.12), "ebit_margin": (0.15, 0.25)})
+    assert [driver["driver"] for driver in drivers] == ["ebit_margin", "wacc"]
+    assert np.isnan(drivers[1]["low_value"]) and np.isnan(drivers[1]["swing"])
+    assert drivers[1]["high_value"] == pytest.approx(value(_assumptions(wacc=0.12)).enterprise_value[0])
+
+DISTRIBUTIONS = {"revenue_growth": ("normal", 0.10, 0.03), "wacc": ("uniform", 0.08, 0.12)}
+
+def test_monte_carlo_is_reproducible_for_a_seed():
+    first = simulate(_assumptions(), DISTRIBUTIONS, paths=5000, chunk_size=1000, seed=7, workers=1)
+    again = simulate(_assumptions(), DISTRIBUTIONS, paths=5000, chunk_size=1000, seed=7, workers=1)
+    pooled = simulate(_assumptions(), DISTRIBUTIONS, paths=5000, chunk_size=1000, seed=7, workers=2)
+    other = simulate(_assumptions(), DISTRIBUTIONS, paths=5000, chunk_size=1000, seed=8, workers=1)
+
+    np.testing.assert_array_equal(first.values, again.values)
+    np.testing.assert_array_equal(first.values, pooled.values)
+    assert first.mean != other.mean
+    assert first.paths == 5000 and len(first.values) == 5000 - first.rejected
+
+def test_monte_carlo_rejects_empty_runs():
+    with pytest.raises(ValueError):
+        simulate(_assumptions(), DISTRIBUTIONS, paths=0, workers=1)
@@ -0,0 +1,61 @@
+"""Cursor-paginated result exports and their ETags"""
+
+import json
+
+def _pages(client, limit, between_pages=None):
+    """Every NDJSON page of the TAM export, following X-Next-Cursor"""
+    pages, cursor = [], None
+    while True:
+        params = {"format": "ndjson", "limit": limit}
+        if cursor is not None:
+            params["cursor"] = cursor
+        response = client.get("/export-results", params=params)
+        assert response.status_code == 200
+        pages.append([json.loads(line)["test_id"] for line in response.text.splitlines()])
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            return pages
+        if between_pages is not None:
+            between_pages()
+
+def test_pages_cover_every_result_once_in_order(client, store, make_result):
+    test_ids = [f"t{i:02d}" for i in range(7)]
+    store.save_results("tam", [make_result(test_id, 0.8) for test_id in test_ids])
+
+    pages = _pages(client, limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [test_id for page in pages for test_id in page] == test_ids
+
+def test_results_saved_again_between_pages_keep_their_place(client, store, make_result):
+    test_ids = [f"t{i:02d}" for i in range(6)]
+    store.save_results("tam", [make_result(test_id, 0.8) for test_id in test_ids])
+    resaved = iter(test_ids)
+
+    pages = _pages(client, limit=2, between_pages=lambda: store.save_result("tam", make_result(next(resaved), 0.5)))
+
+    assert [test_id for page in pages for test_id in page] == test_ids
+
+def test_json_export_matches_the_store(client, store, make_result):
+    store.save_results("tam", [make_result("t1", 0.6), make_result("t2", 0.9)])
+
+    body = client.get("/export-results").json()
+
+    assert body["total_tests"] == 2
+    assert body["next_cursor"] is None
+    assert [(record["test_id"], record["quality_score"]) for record in body["results"]] == [("t1", 0.6), ("t2", 0.9)]
+
+def test_etag_revalidates_until_a_new_result_is_saved(client, store, make_result):
+    store.save_result("tam", make_result("t1", 0.6))
+    etag = client.get("/export-results").headers["etag"]
+
+    assert client.get("/export-results", headers={"If-None-Match": etag}).status_code == 304
+
+    store.save_result("tam", make_result("t2", 0.7))
+    response = client.get("/export-results", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/export-results", params={"cursor": "-1"}).status_code == 400
+    assert client.get("/export-results", params={"cursor": "abc"}).status_code == 400
@@ -0,0 +1,56 @@
+"""Load shedding of the bounded LLM executor"""
+
+import threading
+
+import pytest
+
+from llm_executor import BoundedExecutor, ExecutorSaturated
+
+def test_work_beyond_workers_and_queue_is_rejected():
+    executor = BoundedExecutor(max_workers=1, max_queue_depth=1, retry_after=7)
+    release = threading.Event()
+    try:
+        running = executor.submit(release.wait)
+        queued = executor.submit(release.wait)
+        with pytest.raises(ExecutorSaturated) as raised:
+            executor.submit(release.wait)
+        assert raised.value.retry_after == 7
+
+        release.set()
+        running.result(timeout=5)
+        queued.result(timeout=5)
+        # Finished work frees its slot
+        assert executor.submit(lambda: 42).result(timeout=5) == 42
+        assert executor.stats()["queue_depth"] == 0
+    finally:
+        release.set()
+        executor.shutdown()
+
+def test_saturated_executor_answers_503(client, monkeypatch):
+    import app
+    import tam_qwen_agent
+
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_test_prompt(self, company_context):
+        started.set()
+        release.wait(timeout=10)
+        raise RuntimeError("released")
+
+    executor = BoundedExecutor(max_workers=1, max_queue_depth=0, retry_after=3)
+    monkeypatch.setattr(app, "llm_executor", executor)
+    monkeypatch.setattr(tam_qwen_agent.QwenTAMAgent, "test_prompt", blocking_test_prompt)
+    try:
+        # Occupy the only worker, then ask for more
+        busy = executor.submit(blocking_test_prompt, None, "first company")
+        assert started.wait(timeout=5)
+
+        response = client.post("/test-single", data={"company_context": "second company", "model_choice": "qwen"})
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "3"
+    finally:
+        release.set()
+        with pytest.raises(RuntimeError):
+            busy.result(timeout=5)
+        executor.shutdown()
@@ -0,0 +1,85 @@
+"""Result store round-trips and the running aggregates kept next to it"""
+
+import numpy as np
+import pytest
+
+import aggregates
+
+SCORES = {"t1": 0.55, "t2": 0.72, "t3": 0.91, "t4": 0.64, "t5": 0.83}
+
+def _ids(store):
+    rows = store._connect().execute("SELECT test_id, id FROM test_results ORDER BY id").fetchall()
+    return {row["test_id"]: row["id"] for row in rows}
+
+def _flatten(stats, prefix=""):
+    """Nested statistics as one flat mapping, for approximate comparison"""
+    flat = {}
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            flat[prefix + key] = value
+    return flat
+
+def _rebuilt(store):
+    """Aggregates recomputed from scratch out of the stored results"""
+    conn = store._connect()
+    aggregates.rebuild(conn)
+    return aggregates.read(conn, "tam")
+
+def test_stats_match_the_saved_scores(store, make_result):
+    store.save_results("tam", [make_result(test_id, score) for test_id, score in SCORES.items()])
+
+    stats = store.stats("tam")
+    scores = np.array(list(SCORES.values()))
+    assert stats["tests"] == len(scores)
+    assert stats["average_quality_score"] == pytest.approx(scores.mean())
+    assert stats["std_quality_score"] == pytest.approx(scores.std(ddof=1))
+    assert stats["min_quality_score"] == pytest.approx(scores.min())
+    assert stats["max_quality_score"] == pytest.approx(scores.max())
+    assert stats["pass_rate"] == pytest.approx(3 / 5)
+    # The histogram sketch is exact to one bin width
+    assert stats["quantiles"]["p50"] == pytest.approx(np.median(scores), abs=1 / aggregates.SCORE_BINS)
+
+def test_models_merge_into_the_overall_statistics(store, make_result):
+    store.save_results("tam", [make_result("a1", 0.5, "model-a"), make_result("a2", 0.9, "model-a")])
+    store.save_results("tam", [make_result("b1", 0.8, "model-b")])
+
+    stats = store.stats("tam")
+    assert set(stats["models"]) == {"model-a", "model-b"}
+    assert stats["models"]["model-a"]["average_quality_score"] == pytest.approx(0.7)
+    assert stats["std_quality_score"] == pytest.approx(np.std([0.5, 0.9, 0.8], ddof=1))
+
+def test_quantiles_stay_within_the_observed_scores(store, make_result):
+    store.save_result("tam", make_result("t1", 0.733))
+
+    quantiles = store.stats("tam")["quantiles"]
+    assert list(quantiles.values()) == pytest.approx([0.733] * len(aggregates.QUANTILES))
+
+def test_saving_a_result_again_updates_it_in_place(store, make_result):
+    run_id = store.start_run("tam", "model-a")
+    store.save_results("tam", [make_result(test_id, score) for test_id, score in SCORES.items()], run_id)
+    ids = _ids(store)
+
+    store.save_result("tam", make_result("t2", 0.41, market_size=0, sources=2))
+
+    assert _ids(store) == ids
+    assert store.get_result("t2")["quality_score"] == pytest.approx(0.41)
+    assert store._connect().execute("SELECT run_id FROM test_results WHERE test_id = 't2'").fetchone()[0] == run_id
+    # Only the change of the score reached the aggregates
+    stats = store.stats("tam")
+    scores = np.array([0.41 if test_id == "t2" else score for test_id, score in SCORES.items()])
+    assert stats["tests"] == len(scores)
+    assert stats["average_quality_score"] == pytest.approx(scores.mean())
+    assert stats["std_quality_score"] == pytest.approx(scores.std(ddof=1))
+    assert _flatten(stats) == pytest.approx(_flatten(_rebuilt(store)))
+
+def test_saving_the_same_result_again_leaves_the_aggregates_unchanged(store, make_result):
+    results = [make_result(test_id, score) for test_id, score in SCORES.items()]
+    store.save_results("tam", results)
+    before = store.stats("tam")
+
+    store.save_results("tam", results)
+
+    assert store.count("tam") == len(results)
+    assert _flatten(store.stats("tam")) == pytest.approx(_flatten(before))
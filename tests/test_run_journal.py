@@ -0,0 +1,74 @@
+"""Journaling completed tests and resuming an interrupted sweep"""
+
+import pytest
+
+from result_store import prompt_version
+from run_journal import RunJournal
+from tam_qwen_agent import PromptTestResult, QwenTAMAgent
+
+COMPANIES = ["company A", "company B", "company C"]
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = RunJournal(str(tmp_path / "journal.jsonl"))
+    yield journal
+    journal.close()
+
+def _agent(make_result, tested, fail_on=None):
+    agent = QwenTAMAgent(model="model-a", keep_history=False)
+
+    def test_prompt(company_context):
+        if company_context == fail_on:
+            raise RuntimeError("sweep died")
+        tested.append(company_context)
+        result = make_result(f"test-{len(tested)}", 0.8)
+        result.company_context = company_context
+        result.prompt_version = prompt_version(agent.load_tam_prompt())
+        return result
+
+    agent.test_prompt = test_prompt
+    return agent
+
+def test_results_round_trip_through_the_journal(journal, make_result):
+    result = make_result("t1", 0.75, market_size=3)
+    journal.append("tam", result)
+    journal.append("dcf", make_result("t2", 0.5))
+
+    restored = journal.results("tam", PromptTestResult)
+
+    assert restored == [result]
+
+def test_a_truncated_last_line_is_skipped_and_terminated(journal, make_result):
+    journal.append("tam", make_result("t1", 0.75))
+    journal.close()
+    with open(journal.path, "ab") as f:
+        f.write(b'{"test_id": "t2", "kin')
+
+    journal.append("tam", make_result("t3", 0.8))
+
+    assert [result.test_id for result in journal.results("tam", PromptTestResult)] == ["t1", "t3"]
+
+def test_resume_skips_journaled_companies(journal, make_result):
+    tested = []
+    first = _agent(make_result, tested, fail_on="company C").run_comprehensive_test(COMPANIES, journal=journal)
+    assert [result.company_context for result in first] == ["company A", "company B"]
+
+    stored = []
+    resumed = _agent(make_result, tested).run_comprehensive_test(
+        COMPANIES, journal=journal, resume=True, on_result=stored.append
+    )
+
+    assert tested == ["company A", "company B", "company C"]
+    assert sorted(result.company_context for result in resumed) == COMPANIES
+    # Only the new result is handed on (e.g. to the store); journaled ones were saved already
+    assert [result.company_context for result in stored] == ["company C"]
+
+def test_resume_ignores_results_of_another_model(journal, make_result):
+    tested = []
+    _agent(make_result, tested).run_comprehensive_test(COMPANIES[:1], journal=journal)
+    agent = _agent(make_result, tested)
+    agent.model = "model-b"
+
+    agent.run_comprehensive_test(COMPANIES[:1], journal=journal, resume=True)
+
+    assert tested == ["company A", "company A"]
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Batch WACC/CAPM calculator.
+Cost of equity (CAPM), cost of debt, beta (un)levering and WACC are plain
+array expressions, so whole vectors of capital structures, betas and rates are
+priced in one call (e.g. for sensitivity grids or Monte Carlo paths).
+Reusable market inputs (risk-free rates, equity risk premiums and credit
+spreads) are read once from the CSV tables in MARKET_DATA_CONFIG["directory"]
+(relative to this module) and memoized; lookups count as cache hits or misses
+in /metrics.
+"""
+
+import argparse
+import csv
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Tuple, Union
+
+import numpy as np
+
+from config import MARKET_DATA_CONFIG
+from metrics import CACHE_HITS, CACHE_MISSES
+
+ArrayLike = Union[float, np.ndarray]
+
+TABLES = {
+    "risk_free_rates": ("currency", "tenor_years", "rate"),
+    "equity_risk_premiums": ("country", "premium"),
+    "credit_spreads": ("rating", "spread")
+}
+
+@dataclass(frozen=True)
+class MarketInputs:
+    risk_free_rate: float
+    equity_risk_premium: float
+    credit_spread: float
+
+@dataclass
+class WACCResult:
+    cost_of_equity: np.ndarray
+    pre_tax_cost_of_debt: np.ndarray
+    after_tax_cost_of_debt: np.ndarray
+    wacc: np.ndarray
+
+# Market data lives next to this module unless configured with an absolute path
+MODULE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+_tables: Dict[Tuple[str, str], Dict[Tuple[str, ...], float]] = {}
+_inputs: Dict[Tuple[str, str, str, int], MarketInputs] = {}
+_lock = threading.RLock()  # market_inputs loads tables while holding it
+
+def _memoized(cache: Dict, key: Hashable, label: str, load: Callable[[], Any]) -> Any:
+    """Value of a memoized key, loading it once; every lookup counts as a cache hit or miss"""
+    value = cache.get(key)
+    if value is None:
+        with _lock:
+            value = cache.get(key)
+            if value is None:
+                value = cache[key] = load()
+                CACHE_MISSES.labels(label).inc()
+                return value
+    CACHE_HITS.labels(label).inc()
+    return value
+
+def _read_table(directory: str, name: str) -> Dict[Tuple[str, ...], float]:
+    """Rows of a market data table keyed by all columns but the last"""
+    columns = TABLES[name]
+    with open(os.path.join(directory, f"{name}.csv"), "r", encoding="utf-8", newline="") as f:
+        return {
+            tuple(row[column].strip() for column in columns[:-1]): float(row[columns[-1]])
+            for row in csv.DictReader(f)
+        }
+
+def market_table(name: str, directory: str = None) -> Dict[Tuple[str, ...], float]:
+    """A market data table, read from disk on first use only"""
+    if name not in TABLES:
+        raise ValueError(f"Unknown market data table {name!r}; expected one of {', '.join(TABLES)}")
+    directory = os.path.join(MODULE_DIRECTORY, directory or MARKET_DATA_CONFIG["directory"])
+    return _memoized(_tables, (directory, name), "market_data", lambda: _read_table(directory, name))
+
+def reload_market_data():
+    """Forget memoized tables and inputs, e.g. after the CSV files were updated"""
+    with _lock:
+        _tables.clear()
+        _inputs.clear()
+
+def market_inputs(currency: str = MARKET_DATA_CONFIG["currency"], country: str = MARKET_DATA_CONFIG["country"],
+                  rating: str = "BBB", tenor_years: int = MARKET_DATA_CONFIG["tenor_years"]) -> MarketInputs:
+    """Risk-free rate, equity risk premium and credit spread for a currency, country and rating"""
+    return _memoized(_inputs, (currency, country, rating, tenor_years), "market_inputs",
+                     lambda: _lookup(currency, country, rating, tenor_years))
+
+def _lookup(currency: str, country: str, rating: str, tenor_years: int) -> MarketInputs:
+    rates = market_table("risk_free_rates")
+    tenors = sorted(int(tenor) for row_currency, tenor in rates if row_currency == currency)
+    if not tenors:
+        raise ValueError(f"No risk-free rates for currency {currency}")
+    # The closest tenor available stands in for missing ones
+    tenor = min(tenors, key=lambda available: abs(available - tenor_years))
+    premiums = market_table("equity_risk_premiums")
+    spreads = market_table("credit_spreads")
+    if (country,) not in premiums:
+        raise ValueError(f"No equity risk premium for {country}")
+    if (rating,) not in spreads:
+        raise ValueError(f"No credit spread for rating {rating}")
+    return MarketInputs(
+        risk_free_rate=rates[(currency, str(tenor))],
+        equity_risk_premium=premiums[(country,)],
+        credit_spread=spreads[(rating,)]
+    )
+
+def cost_of_equity(risk_free_rate: ArrayLike, beta: ArrayLike, equity_risk_premium: ArrayLike,
+                   size_premium: ArrayLike = 0.0) -> np.ndarray:
+    """CAPM: rf + beta x ERP (+ size or company-specific premium)"""
+    return np.asarray(risk_free_rate) + np.asarray(beta) * equity_risk_premium + size_premium
+
+def cost_of_debt(risk_free_rate: ArrayLike, credit_spread: ArrayLike) -> np.ndarray:
+    """Pre-tax cost of debt as the risk-free rate plus a credit spread"""
+    return np.asarray(risk_free_rate) + np.asarray(credit_spread)
+
+def unlever_beta(levered_beta: ArrayLike, debt_to_equity: ArrayLike, tax_rate: ArrayLike) -> np.ndarray:
+    """Hamada: asset beta of a levered equity beta"""
+    return np.asarray(levered_beta) / (1 + (1 - np.asarray(tax_rate)) * debt_to_equity)
+
+def relever_beta(unlevered_beta: ArrayLike, debt_to_equity: ArrayLike, tax_rate: ArrayLike) -> np.ndarray:
+    """Hamada: equity beta of an asset beta at a target capital structure"""
+    return np.asarray(unlevered_beta) * (1 + (1 - np.asarray(tax_rate)) * debt_to_equity)
+
+def weighted_average(debt_weight: ArrayLike, cost_of_equity: ArrayLike, pre_tax_cost_of_debt: ArrayLike,
+                     tax_rate: ArrayLike) -> np.ndarray:
+    """WACC = E/V x Ke + D/V x Kd x (1 - t)"""
+    debt_weight = np.asarray(debt_weight, dtype=np.float64)
+    return (1 - debt_weight) * cost_of_equity + debt_weight * np.asarray(pre_tax_cost_of_debt) * (1 - np.asarray(tax_rate))
+
+def compute(beta: ArrayLike, debt_weight: ArrayLike, tax_rate: ArrayLike, inputs: MarketInputs = None,
+            size_premium: ArrayLike = 0.0, credit_spread: ArrayLike = None) -> WACCResult:
+    """WACC for vectors of betas, capital structures and tax rates (broadcast together)
+
+    Market inputs default to the memoized ones for MARKET_DATA_CONFIG; a credit
+    spread vector overrides the table's spread, e.g. one per rating scenario.
+    """
+    if inputs is None:
+        inputs = market_inputs()
+    spread = inputs.credit_spread if credit_spread is None else credit_spread
+    equity = cost_of_equity(inputs.risk_free_rate, beta, inputs.equity_risk_premium, size_premium)
+    debt = cost_of_debt(inputs.risk_free_rate, spread)
+    return WACCResult(
+        cost_of_equity=equity,
+        pre_tax_cost_of_debt=debt,
+        after_tax_cost_of_debt=debt * (1 - np.asarray(tax_rate)),
+        wacc=weighted_average(debt_weight, equity, debt, tax_rate)
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="WACC over a grid of betas and capital structures")
+    parser.add_argument("--currency", type=str, default=MARKET_DATA_CONFIG["currency"], help="Currency of the risk-free rate")
+    parser.add_argument("--country", type=str, default=MARKET_DATA_CONFIG["country"], help="Country of the equity risk premium")
+    parser.add_argument("--rating", type=str, default="BBB", help="Credit rating for the debt spread")
+    parser.add_argument("--tax-rate", type=float, default=0.25, help="Marginal tax rate")
+    parser.add_argument("--unlevered-beta", type=float, default=1.0, help="Asset beta")
+    args = parser.parse_args()
+
+    inputs = market_inputs(args.currency, args.country, args.rating)
+    print(
+        f"Risk-free {inputs.risk_free_rate:.2%}, ERP {inputs.equity_risk_premium:.2%}, "
+        f"spread {inputs.credit_spread:.2%} ({args.currency}, {args.country}, {args.rating})\n"
+    )
+
+    debt_weights = np.linspace(0.0, 0.6, 7)
+    debt_to_equity = debt_weights / (1 - debt_weights)
+    betas = relever_beta(args.unlevered_beta, debt_to_equity, args.tax_rate)
+    result = compute(betas, debt_weights, args.tax_rate, inputs)
+    print(f"{'D/V':>6}  {'Beta':>6}  {'Ke':>7}  {'Kd (after tax)':>14}  {'WACC':>7}")
+    for row in zip(debt_weights, betas, result.cost_of_equity, np.broadcast_to(result.after_tax_cost_of_debt, debt_weights.shape), result.wacc):
+        print(f"{row[0]:>6.0%}  {row[1]:>6.2f}  {row[2]:>7.2%}  {row[3]:>14.2%}  {row[4]:>7.2%}")
+
+if __name__ == "__main__":
+    main()